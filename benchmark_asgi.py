@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+"""
+Load test the sync (WSGI) and async (ASGI) gunicorn deployment profiles.
+
+Usage:
+    python benchmark_asgi.py [--workers N] [--clients N] [--slow N] [--seconds N]
+
+Builds a scratch database from the CSV (the configured database is never
+touched) and, for each MOVIES_SERVER profile, starts gunicorn with
+gunicorn.conf.py on a local port. N clients then fetch list pages,
+top-rated pages and movie details as fast as they can, while ``--slow``
+clients each hold a connection open, sending their request headers one
+line a second (a slow mobile client, or anything without a buffering
+proxy in front). Reports the requests per second, latency and failed
+requests (errors or over 10 s) per profile.
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmark_concurrency import build_seed, percentile
+
+PROFILES = ('wsgi', 'asgi')
+PORT = 8765
+REQUEST_TIMEOUT = 10
+
+
+def start_server(profile, path, workers):
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='movie_api.settings',
+        MOVIES_SERVER=profile,
+        MOVIES_DB_PATH=path,
+        MOVIES_DB_PROFILE='production',
+        WEB_CONCURRENCY=str(workers),
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{PORT}', '--log-level', 'warning'],
+        env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', PORT, timeout=1)
+            connection.request('GET', '/api/movies/')
+            if connection.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f'{profile} server did not start')
+
+
+def slow_client(stop):
+    """
+    Send a request's headers one line a second until ``stop`` is set.
+    """
+    try:
+        sock = socket.create_connection(('127.0.0.1', PORT))
+        sock.sendall(b'GET /api/movies/ HTTP/1.1\r\nHost: localhost\r\n')
+        while not stop.wait(1):
+            sock.sendall(b'X-Padding: 1\r\n')
+        sock.close()
+    except OSError:
+        pass
+
+
+def client(ids, stop, timings, failures):
+    rng = random.Random()
+    while not stop.is_set():
+        path = rng.choice([
+            f'/api/movies/?page={rng.randint(1, 20)}',
+            f'/api/movies/top-rated/?page={rng.randint(1, 3)}',
+            f'/api/movies/{rng.choice(ids)}/',
+        ])
+        started = time.perf_counter()
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', PORT, timeout=REQUEST_TIMEOUT)
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            if response.status != 200:
+                raise OSError(response.status)
+        except OSError:
+            failures.append(path)
+            continue
+        timings.append(time.perf_counter() - started)
+
+
+def movie_ids(path):
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'movie_api.settings'
+    os.environ['MOVIES_DB_PATH'] = path
+    import django
+    django.setup()
+    from movies.models import Movie
+    return list(Movie.objects.values_list('id', flat=True)[:1000])
+
+
+def run_profile(profile, seed, workdir, ids, args):
+    path = os.path.join(workdir, f'{profile}.sqlite3')
+    shutil.copyfile(seed, path)
+    server = start_server(profile, path, args.workers)
+    stop = threading.Event()
+    timings, failures = [], []
+    try:
+        threads = [threading.Thread(target=slow_client, args=(stop,)) for _ in range(args.slow)]
+        threads += [
+            threading.Thread(target=client, args=(ids, stop, timings, failures))
+            for _ in range(args.clients)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    timings.sort()
+    print(f'{profile}')
+    print(f'  requests/s {len(timings) / args.seconds:8.0f}')
+    print(f'  p50        {percentile(timings, 0.5) * 1000:8.2f} ms')
+    print(f'  p99        {percentile(timings, 0.99) * 1000:8.2f} ms')
+    print(f'  max        {percentile(timings, 1.0) * 1000:8.2f} ms')
+    print(f'  failed     {len(failures):8d}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--slow', type=int, default=3)
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--csv', default='imdb_full.csv')
+    args = parser.parse_args()
+    args.csv = os.path.abspath(args.csv)
+
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as workdir:
+        seed = os.path.join(workdir, 'seed.sqlite3')
+        process = context.Process(target=build_seed, args=(seed, args.csv, 1))
+        process.start()
+        process.join()
+        ids = movie_ids(seed)
+        print(f'{args.workers} workers, {args.clients} clients, {args.slow} slow clients, '
+              f'{args.seconds:g}s per profile')
+        for profile in PROFILES:
+            run_profile(profile, seed, workdir, ids, args)
+
+
+if __name__ == '__main__':
+    main()
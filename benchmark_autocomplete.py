@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Benchmark the autocomplete prefix index on a synthetic catalog.
+
+Usage:
+    python benchmark_autocomplete.py [--movies N] [--lookups N]
+
+Generates N movies with word-based titles and directors in memory (no
+database needed). It reports the build time and the index's memory, then
+reports lookup latency for random 1-8 character prefixes taken from real
+keys.
+"""
+import argparse
+import os
+import random
+import time
+import resource
+import django
+
+# Setup Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movie_api.settings')
+django.setup()
+
+from movies.autocomplete import PrefixIndex, normalize
+
+WORDS = (
+    'dark night star love war city man woman girl boy king queen last first '
+    'lost secret blood fire ice shadow light dream road house river storm '
+    'ghost return rise fall empire kingdom legend story time world heart '
+    'black white red blue golden silent wild broken hidden final'
+).split()
+NAMES = (
+    'james john robert michael david maria anna sofia chris alex sam jean '
+    'lee kim park smith nolan scott lynch kubrick tarantino bigelow gerwig'
+).split()
+
+
+def synthetic_rows(count, seed=1):
+    rng = random.Random(seed)
+    for movie_id in range(1, count + 1):
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        title = f'{title.title()} {movie_id}'
+        director = f'{rng.choice(NAMES).title()} {rng.choice(NAMES).title()}'
+        yield movie_id, title, director, rng.randint(1920, 2024), round(rng.uniform(1, 10), 1)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--movies', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=20_000)
+    args = parser.parse_args()
+
+    # Peak RSS growth approximates the index size (Linux reports KiB)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    index = PrefixIndex().build(synthetic_rows(args.movies))
+    build_seconds = time.perf_counter() - started
+    current = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) * 1024
+
+    print(f'{len(index):,} movies, {len(index.keys):,} keys, {len(index.hot):,} hot prefixes')
+    print(f'  build      {build_seconds:8.2f} s')
+    print(f'  peak RSS   {current / 2 ** 20:8.1f} MiB ({current / len(index):,.0f} bytes/movie)')
+
+    rng = random.Random(2)
+    prefixes = []
+    for _ in range(args.lookups):
+        key = rng.choice(index.keys)
+        prefixes.append(key[:rng.randint(1, 8)])
+
+    timings = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        index.search(prefix, 10)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    print(f'Lookup latency over {args.lookups:,} random prefixes')
+    for label, fraction in [('p50', 0.5), ('p99', 0.99), ('max', 1.0)]:
+        print(f'  {label:<10} {percentile(timings, fraction) * 1_000_000:8.1f} µs')
+
+    # Sanity check against a brute-force scan on a sample
+    sample = list(synthetic_rows(min(args.movies, 5000)))
+    small = PrefixIndex(hot_prefix=50).build(sample)
+    for prefix in ['d', 'da', 'lee', 'sofia k']:
+        expected = sorted(
+            (row for row in sample
+             if normalize(row[1]).startswith(prefix) or normalize(row[2]).startswith(prefix)),
+            key=lambda row: -row[4],
+        )[:10]
+        assert [row[4] for row in small.search(prefix, 10)] == [row[4] for row in expected], prefix
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Benchmark read throughput while an import is running, per database profile.
+
+Usage:
+    python benchmark_concurrency.py [--readers N] [--seconds N] [--csv PATH] [--copies N]
+
+Builds a scratch database from the CSV (the configured database is never
+touched) and, for each MOVIES_DB_PROFILE, copies it and runs one process
+that re-imports the parsed CSV in replace mode in a loop, alongside N reader
+processes that fetch list pages and filtered counts. ``--copies`` repeats
+the CSV under renamed titles, for a catalog big enough that the import's
+page cache spills (which is when a rollback journal locks readers out).
+Reports the reads per
+second, read latency and lock errors seen while the writer was busy.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+PROFILES = ('development', 'production')
+
+
+def setup(profile, path):
+    # Runs in each (spawned) process before Django is imported
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'movie_api.settings'
+    os.environ['MOVIES_DB_PROFILE'] = profile
+    os.environ['MOVIES_DB_PATH'] = path
+    import django
+    django.setup()
+
+
+def catalog_rows(csv_path, copies):
+    from movies.importers import iter_csv_rows
+    with open(csv_path, encoding='utf-8', newline='') as file:
+        rows = list(iter_csv_rows(file))
+    return [
+        dict(row, title=f"{row['title']} #{copy}" if copy else row['title'])
+        for copy in range(copies)
+        for row in rows
+    ]
+
+
+def build_seed(path, csv_path, copies):
+    setup('development', path)
+    from django.core.management import call_command
+    from movies.importers import BulkImporter, REPLACE
+    call_command('migrate', verbosity=0)
+    BulkImporter().load(catalog_rows(csv_path, copies), mode=REPLACE)
+
+
+def writer(profile, path, csv_path, copies, start, stop, results):
+    setup(profile, path)
+    from movies.importers import BulkImporter, REPLACE
+    # Parse once so the loop is all database work
+    rows = catalog_rows(csv_path, copies)
+    importer = BulkImporter()
+    imports = 0
+    start.wait()
+    while not stop.is_set():
+        importer.load(rows, mode=REPLACE)
+        imports += 1
+    results.put(('writer', imports))
+
+
+def reader(profile, path, start, stop, results):
+    setup(profile, path)
+    from django.db import OperationalError
+    from movies.models import Movie
+    rng = random.Random(os.getpid())
+    timings = []
+    errors = 0
+    start.wait()
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            offset = rng.randrange(0, 1000)
+            list(Movie.objects.order_by('-year', '-rating').values_list(
+                'id', 'title', 'rating'
+            )[offset:offset + 20])
+            Movie.objects.filter(rating__gte=rng.choice([7.5, 8.0, 8.5])).count()
+        except OperationalError:
+            # "database is locked" once the busy timeout runs out
+            errors += 1
+            continue
+        timings.append(time.perf_counter() - started)
+    results.put(('reader', (timings, errors)))
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run_profile(context, profile, seed, workdir, args):
+    path = os.path.join(workdir, f'{profile}.sqlite3')
+    shutil.copyfile(seed, path)
+    start = context.Event()
+    stop = context.Event()
+    results = context.Queue()
+    processes = [context.Process(target=writer, args=(profile, path, args.csv, args.copies, start, stop, results))]
+    processes += [
+        context.Process(target=reader, args=(profile, path, start, stop, results))
+        for _ in range(args.readers)
+    ]
+    for process in processes:
+        process.start()
+    # Let every process finish django.setup() before the clock starts
+    time.sleep(2)
+    start.set()
+    time.sleep(args.seconds)
+    stop.set()
+
+    imports, timings, errors = 0, [], 0
+    for _ in processes:
+        kind, value = results.get()
+        if kind == 'writer':
+            imports = value
+        else:
+            timings.extend(value[0])
+            errors += value[1]
+    for process in processes:
+        process.join()
+
+    timings.sort()
+    print(f'{profile}')
+    print(f'  imports    {imports:8d}')
+    print(f'  reads/s    {len(timings) / args.seconds:8.0f}')
+    print(f'  p50        {percentile(timings, 0.5) * 1000:8.2f} ms')
+    print(f'  p99        {percentile(timings, 0.99) * 1000:8.2f} ms')
+    print(f'  max        {percentile(timings, 1.0) * 1000:8.2f} ms')
+    print(f'  lock errs  {errors:8d}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--readers', type=int, default=3)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--csv', default='imdb_full.csv')
+    parser.add_argument('--copies', type=int, default=20)
+    args = parser.parse_args()
+    args.csv = os.path.abspath(args.csv)
+
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as workdir:
+        seed = os.path.join(workdir, 'seed.sqlite3')
+        process = context.Process(target=build_seed, args=(seed, args.csv, args.copies))
+        process.start()
+        process.join()
+        print(f'{args.readers} readers, 1 replace-mode importer of {args.copies}x {os.path.basename(args.csv)}, '
+              f'{args.seconds:g}s per profile')
+        for profile in PROFILES:
+            run_profile(context, profile, seed, workdir, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Benchmark list serialization: MovieSerializer vs the values_list() fast path.
+
+Usage:
+    python benchmark_serialization.py [--page-size N] [--repeat N]
+
+Reads (never writes) the configured database, so load a catalog first
+(e.g. python manage.py import_imdb). Each round serializes and renders
+one page the way the list endpoint does, and the best time is reported.
+"""
+import argparse
+import os
+import sys
+import timeit
+import django
+
+# Setup Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movie_api.settings')
+django.setup()
+
+from rest_framework.renderers import JSONRenderer
+from movies.models import Movie
+from movies.renderers import FastJSONRenderer
+from movies.serializers import MovieRowSerializer, MovieSerializer
+
+
+def serializer_path(queryset):
+    data = MovieSerializer(list(queryset), many=True).data
+    return JSONRenderer().render(data)
+
+
+def fast_path(queryset):
+    rows = list(queryset.values_list(*MovieRowSerializer.fields, named=True))
+    return FastJSONRenderer().render(MovieRowSerializer().to_representation(rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    queryset = Movie.objects.order_by('-year', '-rating')[:args.page_size]
+    rows = queryset.count()
+    if not rows:
+        print('No movies in the database; import some first.')
+        sys.exit(1)
+    if serializer_path(queryset) != fast_path(queryset):
+        print('Fast path output differs from MovieSerializer!')
+        sys.exit(1)
+
+    print(f'Serializing {rows} movies, best of {args.repeat} rounds')
+    results = {}
+    for name, func in [('MovieSerializer', serializer_path), ('fast path', fast_path)]:
+        best = min(timeit.repeat(lambda: func(queryset), number=1, repeat=args.repeat))
+        results[name] = best
+        print(f'  {name:<16} {best * 1000:8.2f} ms  ({rows / best:,.0f} rows/s)')
+    print(f'  speedup          {results["MovieSerializer"] / results["fast path"]:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
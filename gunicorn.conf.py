@@ -0,0 +1,34 @@
+"""
+gunicorn configuration.
+
+MOVIES_SERVER selects the deployment profile:
+
+    wsgi (default)  sync workers running movie_api.wsgi; each worker
+                    serves one request at a time
+    asgi            uvicorn workers running movie_api.asgi; the movie read
+                    endpoints are async views, so a slow client or a slow
+                    query no longer holds a whole worker
+
+The worker count comes from WEB_CONCURRENCY in both profiles.
+
+Workers share their metrics through files in MOVIES_METRICS_DIR (see
+movies/metrics.py), which is emptied when the server starts.
+"""
+import os
+import shutil
+
+bind = '0.0.0.0:80'
+timeout = 120
+
+if os.environ.get('MOVIES_SERVER', 'wsgi') == 'asgi':
+    wsgi_app = 'movie_api.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'movie_api.wsgi:application'
+
+metrics_dir = os.environ.setdefault('MOVIES_METRICS_DIR', '/tmp/movie-api-metrics')
+
+
+def on_starting(server):
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
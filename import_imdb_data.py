@@ -4,75 +4,36 @@ Import IMDB Top 1000 Movies data into the database.
 import os
 import sys
 import django
-import csv
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movie_api.settings')
 django.setup()
 
+from movies.importers import BulkImporter
 from movies.models import Movie
 
-def import_movies():
+def import_movies(csv_file='imdb_full.csv', batch_size=None):
     """Import movies from IMDB CSV file."""
-    csv_file = 'imdb_full.csv'
-
     if not os.path.exists(csv_file):
         print(f"Error: {csv_file} not found!")
         return
 
-    # Clear existing movies
-    print("Clearing existing movies...")
-    Movie.objects.all().delete()
+    importer = BulkImporter(
+        batch_size=batch_size,
+        progress=lambda stats: print(
+            f"Imported {stats.created} movies... ({stats.rows_per_second:,.0f} rows/s)"
+        ),
+        on_error=lambda row_num, e: print(f"Skipped row {row_num} due to error: {e}"),
+    )
 
-    # Read and import CSV
+    # Existing movies are replaced inside the same transaction
     print(f"Reading {csv_file}...")
-    movies_created = 0
-    movies_skipped = 0
-
-    with open(csv_file, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-
-        for row in reader:
-            try:
-                # Extract data from CSV
-                title = row['Title'].strip()
-                director = row['Director'].strip() if row['Director'] else 'Unknown'
-                genre = row['Genre'].strip()
-                year = int(row['Year'])
-                rating = float(row['Rating'])
-
-                # Handle Revenue (Millions) - convert to budget equivalent
-                revenue = row.get('Revenue (Millions)', '').strip()
-                budget = None
-                if revenue and revenue != 'nan':
-                    try:
-                        # Convert millions to actual amount
-                        budget = int(float(revenue) * 1000000)
-                    except (ValueError, TypeError):
-                        budget = None
-
-                # Create movie
-                Movie.objects.create(
-                    title=title,
-                    director=director,
-                    genre=genre,
-                    year=year,
-                    rating=rating,
-                    budget=budget
-                )
-                movies_created += 1
-
-                if movies_created % 100 == 0:
-                    print(f"Imported {movies_created} movies...")
-
-            except (ValueError, KeyError) as e:
-                movies_skipped += 1
-                print(f"Skipped row due to error: {e}")
-                continue
+    stats = importer.load_csv(csv_file, mode='replace')
 
     print(f"\n✓ Import complete!")
-    print(f"  - Movies created: {movies_created}")
-    print(f"  - Movies skipped: {movies_skipped}")
+    print(f"  - Movies created: {stats.created}")
+    print(f"  - Movies skipped: {stats.skipped}")
+    print(f"  - Elapsed: {stats.elapsed:.2f}s ({stats.rows_per_second:,.0f} rows/s)")
     print(f"  - Total in database: {Movie.objects.count()}")
 
 if __name__ == '__main__':
-    import_movies()
+    import_movies(*sys.argv[1:2])
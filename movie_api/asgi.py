@@ -0,0 +1,25 @@
+"""
+ASGI config for movie_api project.
+
+Routes the movie read endpoints to async views (see movie_api/asgi_urls.py).
+Run it with an async worker class, e.g.
+``gunicorn -k uvicorn.workers.UvicornWorker movie_api.asgi:application``.
+"""
+
+import os
+import threading
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movie_api.settings')
+os.environ.setdefault('MOVIES_ASGI', '1')
+
+application = get_asgi_application()
+
+# Build the in-process autocomplete index before the first request. In a
+# thread: servers like uvicorn import this module inside their event loop,
+# where the sync ORM refuses to run.
+from movies.autocomplete import autocomplete  # noqa: E402
+warm = threading.Thread(target=autocomplete.warm)
+warm.start()
+warm.join()
@@ -0,0 +1,13 @@
+"""
+URL configuration for the ASGI application.
+
+The routes of movie_api.urls, with the movie read endpoints served by
+the async views (movies/async_views.py) first.
+"""
+from django.urls import path, include
+from movies import async_views
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path('api/', include(async_views.urlpatterns)),
+] + wsgi_urlpatterns
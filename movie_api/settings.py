@@ -2,6 +2,7 @@
 Django settings for movie_api project.
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -32,6 +33,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its total covers the other middleware too
+    'movies.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,6 +42,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'movies.middleware.ReadYourWritesMiddleware',
 ]
 
 ROOT_URLCONF = 'movie_api.urls'
@@ -60,14 +64,134 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'movie_api.wsgi.application'
+ASGI_APPLICATION = 'movie_api.asgi.application'
+
+# movie_api/asgi.py sets MOVIES_ASGI: the ASGI application serves the movie
+# read endpoints with async views (see movie_api/asgi_urls.py)
+if os.environ.get('MOVIES_ASGI'):
+    ROOT_URLCONF = 'movie_api.asgi_urls'
 
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite by default. MOVIES_DB_ENGINE=postgresql switches to PostgreSQL,
+# configured by POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST
+# and POSTGRES_PORT. Set POSTGRES_POOLER=pgbouncer when connecting through
+# PgBouncer in transaction pooling mode (see docker-compose.postgres.yml).
+#
+# For SQLite, MOVIES_DB_PATH moves the file. MOVIES_DB_PROFILE=production
+# keeps connections open between requests (checked before reuse) and tunes
+# each new connection: WAL so readers don't queue behind writers, relaxed
+# fsync, memory-mapped reads, a 64 MiB page cache and a lock wait timeout.
+DB_ENGINE = os.environ.get('MOVIES_DB_ENGINE', 'sqlite')
+DB_PROFILE = os.environ.get('MOVIES_DB_PROFILE', 'development')
+
+MOVIES = {}
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'movies'),
+            'USER': os.environ.get('POSTGRES_USER', 'movies'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # One connection per worker, reused; the pooler shares the
+            # server connections between workers
+            'CONN_MAX_AGE': int(os.environ.get('MOVIES_DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
+    if os.environ.get('POSTGRES_POOLER'):
+        # Transaction pooling hands each transaction to any server
+        # connection, so nothing may outlive one: no server-side cursors
+        # and no prepared statements
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+        DATABASES['default']['OPTIONS'] = {'prepare_threshold': None}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('MOVIES_DB_PATH', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+
+    if DB_PROFILE == 'production':
+        DATABASES['default'].update({
+            'CONN_MAX_AGE': int(os.environ.get('MOVIES_DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+        })
+        MOVIES['SQLITE_PRAGMAS'] = {
+            'journal_mode': 'wal',
+            'synchronous': 'normal',
+            'mmap_size': 256 * 2 ** 20,
+            'cache_size': -64 * 2 ** 10,
+            'busy_timeout': 5000,
+        }
+
+    # Read replicas: MOVIES_DB_REPLICAS is a comma-separated list of SQLite
+    # files, added as aliases replica1, replica2, ... Movie reads are routed
+    # to them (see movies/routers.py); refresh them with manage.py sync_replicas.
+    for index, path in enumerate(filter(None, os.environ.get('MOVIES_DB_REPLICAS', '').split(',')), 1):
+        DATABASES[f'replica{index}'] = {
+            **DATABASES['default'],
+            'NAME': path.strip(),
+            'TEST': {'MIRROR': 'default'},
+        }
+
+MOVIES['READ_REPLICAS'] = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['movies.routers.ReplicaRouter']
+
+
+# Caches
+# Local memory is per process. Set MOVIES_CACHE_DIR to share one
+# file-based cache (counts and API responses) between gunicorn workers.
+if os.environ.get('MOVIES_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['MOVIES_CACHE_DIR'],
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'movie-api',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+
+# Logging
+# RequestTimingMiddleware logs a WARNING for each slow request to
+# movies.timing and, with MOVIES_TIMING_LOG_LEVEL=INFO (set in the Docker
+# image), one JSON line per sampled request. MOVIES_TIMING_SAMPLE_RATE sets
+# the sampled fraction (0-1).
+if 'MOVIES_TIMING_SAMPLE_RATE' in os.environ:
+    MOVIES['TIMING_SAMPLE_RATE'] = float(os.environ['MOVIES_TIMING_SAMPLE_RATE'])
+
+# Metrics
+# Processes that share MOVIES_METRICS_DIR (gunicorn workers, import
+# commands) report their combined totals at /metrics.
+if 'MOVIES_METRICS_DIR' in os.environ:
+    MOVIES['METRICS_DIR'] = os.environ['MOVIES_METRICS_DIR']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'movies.timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('MOVIES_TIMING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
 }
 
 
@@ -1,6 +1,8 @@
 from django.shortcuts import render
 from django.http import HttpResponse
-from movies.models import Movie
+from movies import metrics as movie_metrics
+from movies.conf import get_setting
+from movies.summary import catalog_summary
 import sys
 import django
 import rest_framework
@@ -10,14 +12,23 @@ def api_home(request):
     """
     Beautiful landing page for the Movie API.
     Displays system information, admin credentials, and API endpoints.
+
+    Catalog numbers come from the cached summary and the rendered stats
+    block is fragment-cached per catalog generation, so a steady-state hit
+    makes no database queries.
     """
     context = {
-        'total_movies': Movie.objects.count(),
-        'highest_rated': Movie.objects.order_by('-rating').first(),
-        'latest_movie': Movie.objects.order_by('-year').first(),
-        'oldest_movie': Movie.objects.order_by('year').first(),
+        'summary': catalog_summary(),
+        'summary_timeout': get_setting('SUMMARY_CACHE_TIMEOUT'),
         'python_version': f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
         'django_version': django.get_version(),
         'drf_version': rest_framework.__version__,
     }
     return render(request, 'api_home.html', context)
+
+
+def metrics(request):
+    """
+    Prometheus metrics for all worker processes (see movies/metrics.py).
+    """
+    return HttpResponse(movie_metrics.render(), content_type=movie_metrics.CONTENT_TYPE)
@@ -9,3 +9,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movie_api.settings')
 
 application = get_wsgi_application()
+
+# Build the in-process autocomplete index before the first request
+from movies.autocomplete import autocomplete  # noqa: E402
+autocomplete.warm()
@@ -1,8 +1,8 @@
 """
-Admin configuration for Movie model.
+Admin configuration for Movie and Genre models.
 """
 from django.contrib import admin
-from .models import Movie
+from .models import Genre, Movie
 
 
 @admin.register(Movie)
@@ -11,7 +11,7 @@ class MovieAdmin(admin.ModelAdmin):
     Admin interface configuration for Movie model.
     """
     list_display = ['title', 'director', 'year', 'rating', 'genre']
-    list_filter = ['year', 'genre', 'rating']
+    list_filter = ['year', 'genres', 'rating']
     search_fields = ['title', 'director']
     ordering = ['-year']
 
@@ -29,3 +29,13 @@ class MovieAdmin(admin.ModelAdmin):
     )
 
     readonly_fields = ['created_at']
+
+
+@admin.register(Genre)
+class GenreAdmin(admin.ModelAdmin):
+    """
+    Admin interface configuration for Genre model.
+    """
+    list_display = ['name', 'key']
+    search_fields = ['name']
+    readonly_fields = ['key']
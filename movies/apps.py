@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MoviesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'movies'
+
+    def ready(self):
+        # Register signal receivers
+        from . import signals  # noqa: F401
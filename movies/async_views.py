@@ -0,0 +1,196 @@
+"""
+Async versions of the MovieViewSet read actions, for the ASGI application.
+
+movie_api/asgi_urls.py routes the list, retrieve, top-rated and export
+URLs here ahead of the DRF router. JSON reads (GET and HEAD) are served
+with the async ORM, so while a request waits on the database or on a
+slow client the worker's event loop serves others. Responses match the
+ViewSet's: same serializers, pagination, ETags and response cache
+entries.
+
+Anything else on those URLs (writes, OPTIONS, the browsable API) is
+passed to the ViewSet, run in a thread.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.urls import re_path
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+
+from .conditional import acatalog_condition, aexport_condition, amovie_condition
+from .conf import get_setting
+from .exports import EXPORT_FORMATS, accepts_gzip, astream_export, export_format
+from .models import Movie
+from .pagination import MoviePagination
+from .renderers import json_response
+from .response_cache import acached_response
+from .serializers import MovieRowSerializer, MovieSerializer
+from .views import EXPORT_RENDERERS, MovieViewSet, filter_movies
+
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+@functools.lru_cache(maxsize=None)
+def viewset_view(name):
+    """
+    Return the router's view for the URL named ``name``.
+    """
+    from .urls import router
+    return next(pattern.callback for pattern in router.urls if pattern.name == name)
+
+
+def serves(request):
+    """
+    Return True if the async view answers ``request`` itself: a read that
+    does not ask for the browsable API.
+    """
+    return (
+        request.method in READ_METHODS
+        and 'format' not in request.GET
+        and 'text/html' not in request.META.get('HTTP_ACCEPT', '')
+    )
+
+
+def error_response(exc):
+    """
+    Render an APIException the way DRF's exception handler does.
+    """
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(data, status=exc.status_code)
+
+
+def negotiate(request, renderer_classes):
+    """
+    Pick the renderer as DRF's content negotiation would, and set
+    ``accepted_renderer`` and ``accepted_media_type`` on ``request`` as
+    on a DRF Request (the ETag covers the media type).
+    """
+    renderer, media_type = DefaultContentNegotiation().select_renderer(
+        Request(request), [renderer() for renderer in renderer_classes]
+    )
+    request.accepted_renderer = renderer
+    request.accepted_media_type = media_type
+
+
+def read_view(name, renderer_classes=None):
+    """
+    Serve reads with the decorated async view and everything else with
+    the ViewSet view named ``name``. Reads are negotiated against
+    ``renderer_classes`` (the ViewSet's by default) first.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def inner(request, *args, **kwargs):
+            if not serves(request):
+                return await sync_to_async(viewset_view(name))(request, *args, **kwargs)
+            try:
+                negotiate(request, renderer_classes or MovieViewSet.renderer_classes)
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                return error_response(exc)
+        # As on the ViewSet views; DRF enforces CSRF for session auth
+        inner.csrf_exempt = True
+        return inner
+    return decorator
+
+
+def filter_queryset(request, action, queryset):
+    """
+    Apply the ViewSet's filter backends (``?ordering=``) to ``queryset``.
+    """
+    view = MovieViewSet(action=action, request=Request(request), format_kwarg=None)
+    return view.filter_queryset(queryset)
+
+
+async def list_response(request, action, queryset):
+    """
+    Async version of MovieViewSet.list_response().
+    """
+    paginator = MoviePagination()
+    fast = get_setting('FAST_SERIALIZATION')
+    if fast:
+        queryset = queryset.values_list(*MovieRowSerializer.fields, named=True)
+
+    page = await paginator.apaginate_queryset(queryset, Request(request), MovieViewSet(action=action))
+    rows = page if page is not None else [row async for row in queryset]
+    if fast:
+        data = MovieRowSerializer().to_representation(rows)
+    else:
+        data = MovieSerializer(rows, many=True).data
+    if page is None:
+        return json_response(data)
+    return json_response(paginator.get_paginated_response(data).data)
+
+
+@read_view('movie-list')
+@acatalog_condition
+@acached_response('list')
+async def movie_list(request):
+    """
+    List movies (cached per catalog version).
+    """
+    queryset = filter_queryset(request, 'list', Movie.objects.all())
+    return await list_response(request, 'list', queryset)
+
+
+@read_view('movie-detail')
+@amovie_condition
+@acached_response('retrieve')
+async def movie_detail(request, pk):
+    """
+    Retrieve a movie (cached per catalog version).
+    """
+    try:
+        movie = await Movie.objects.filter(pk=pk).afirst()
+    except (TypeError, ValueError):
+        movie = None
+    if movie is None:
+        raise NotFound()
+    return json_response(MovieSerializer(movie).data)
+
+
+@read_view('movie-top-rated')
+@acatalog_condition
+@acached_response('top_rated')
+async def top_rated(request):
+    """
+    Get top-rated movies with optional filters.
+    """
+    queryset, error = filter_movies(request.GET, default_min_rating=8.0)
+    if error is not None:
+        return json_response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    return await list_response(request, 'top_rated', queryset.order_by('-rating', '-year'))
+
+
+@read_view('movie-export', EXPORT_RENDERERS)
+@aexport_condition
+async def export(request):
+    """
+    Stream movies as NDJSON or CSV.
+    """
+    output = export_format(request.GET.get('output'), request.accepted_renderer.format)
+    if output is None:
+        return json_response(
+            {'error': f'output must be one of: {", ".join(EXPORT_FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    queryset, error = filter_movies(request.GET)
+    if error is not None:
+        return json_response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    return astream_export(queryset, output, gzip=accepts_gzip(request))
+
+
+# Same paths and names as the router's; movie_api/asgi_urls.py puts them
+# first. The names keep the view label in /metrics the same under both.
+urlpatterns = [
+    re_path(r'^movies/$', movie_list, name='movie-list'),
+    re_path(r'^movies/top-rated/$', top_rated, name='movie-top-rated'),
+    re_path(r'^movies/export/$', export, name='movie-export'),
+    re_path(r'^movies/(?P<pk>[^/.]+)/$', movie_detail, name='movie-detail'),
+]
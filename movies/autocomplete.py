@@ -0,0 +1,316 @@
+"""
+In-process prefix index for title and director autocomplete.
+
+Each movie contributes two normalized keys (title and director) to one
+sorted list, and a lookup is a bisect over it. Results are ranked by
+rating. For "hot" prefixes, whose key range is larger than
+MOVIES['AUTOCOMPLETE_HOT_PREFIX'] entries, the top results are
+precomputed, so even one-letter lookups avoid scanning the range.
+
+The index is built once per process (at worker start or on first use)
+and kept current in two ways:
+
+- this process's own saves and deletes are applied incrementally, from
+  the Movie signals, once the transaction commits
+- every MOVIES['AUTOCOMPLETE_REFRESH_SECONDS'] a lookup compares the
+  catalog version, and rebuilds if another process or a bulk import has
+  written since
+
+Memory is bounded by MOVIES['AUTOCOMPLETE_MAX_MOVIES'] (the best-rated
+movies are kept, also as writes come in) and by truncating keys to
+MOVIES['AUTOCOMPLETE_KEY_LENGTH'] characters. Slots freed by removals are
+reused, so a long-lived worker does not grow with every save.
+"""
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from heapq import heapify, heappop, heappush, nlargest
+
+from django.db import DatabaseError, transaction
+
+from .conf import get_setting
+from .models import CatalogState, Movie
+
+
+# Sorts after every character a normalized key can contain
+MAX_CHAR = '\U0010ffff'
+
+# Most results a lookup can return (and the length of precomputed lists)
+MAX_RESULTS = 20
+
+
+separator_re = re.compile(r'[\W_]+')
+
+
+def normalize(text, length=None):
+    """
+    Return ``text`` case-folded, accent-free and with punctuation collapsed
+    to single spaces, e.g. "Amélie: Part II" -> "amelie part ii".
+    """
+    text = text or ''
+    if not text.isascii():
+        text = ''.join(
+            char for char in unicodedata.normalize('NFKD', text)
+            if not unicodedata.combining(char)
+        )
+    text = separator_re.sub(' ', text.casefold()).strip()
+    return text[:length] if length else text
+
+
+class PrefixIndex:
+    """
+    Sorted-key prefix index over (id, title, director, year, rating) rows.
+
+    With ``max_movies``, add() keeps only the best-rated movies: a movie
+    rated at or below the worst one held is skipped once the index is
+    full, and a better one evicts the worst.
+
+    Not thread-safe on its own; AutocompleteService serializes access.
+    """
+
+    def __init__(self, key_length=32, hot_prefix=1000, top=MAX_RESULTS, max_movies=None):
+        self.key_length = key_length
+        self.hot_prefix = hot_prefix
+        self.top = top
+        self.max_movies = max_movies
+        self.keys = []               # sorted normalized keys
+        self.key_slots = array('l')  # movie slot of each key
+        self.movies = []             # slot -> (id, title, director, year, rating) or None
+        self.ratings = array('f')    # slot -> rating, for ranking
+        self.slots = {}              # movie id -> slot
+        self.free = []               # slots of removed movies, reused first
+        self.worst = []              # min-heap of (rating, id); stale entries skipped
+        self.hot = {}                # prefix -> top slots, best first
+
+    def __len__(self):
+        return len(self.slots)
+
+    def build(self, rows):
+        """
+        Load ``rows`` and precompute the hot prefixes.
+        """
+        keys = []
+        key_slots = array('l')
+        for row in rows:
+            slot = self._store(row)
+            for key in self._movie_keys(row):
+                keys.append(key)
+                key_slots.append(slot)
+        # Sort positions rather than (key, slot) tuples to keep the peak small
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[position] for position in order]
+        self.key_slots = array('l', (key_slots[position] for position in order))
+        del keys, key_slots, order
+        self.hot = {}
+        self._collect(0, len(self.keys), 0)
+        return self
+
+    def search(self, prefix, limit=10):
+        """
+        Return up to ``limit`` movie rows whose title or director starts
+        with ``prefix``, best rated first.
+        """
+        prefix = normalize(prefix, self.key_length)
+        if not prefix:
+            return []
+        slots = self.hot.get(prefix)
+        if slots is None:
+            lo = bisect_left(self.keys, prefix)
+            hi = bisect_left(self.keys, prefix + MAX_CHAR, lo)
+            slots = self._best(self.key_slots[lo:hi])
+            if hi - lo > self.hot_prefix:
+                # Grown hot since the build; remember it
+                self.hot[prefix] = slots
+        return [self.movies[slot] for slot in slots[:limit]]
+
+    def add(self, row):
+        """
+        Insert or replace one movie row.
+        """
+        self.remove(row[0])
+        if self.max_movies and len(self.slots) >= self.max_movies:
+            rating, movie_id = self._worst()
+            if row[4] <= rating:
+                return
+            self.remove(movie_id)
+        slot = self._store(row)
+        for key in self._movie_keys(row):
+            position = bisect_left(self.keys, key)
+            self.keys.insert(position, key)
+            self.key_slots.insert(position, slot)
+            for length in range(1, len(key) + 1):
+                best = self.hot.get(key[:length])
+                if best is not None:
+                    self.hot[key[:length]] = self._best(best + [slot])
+
+    def remove(self, movie_id):
+        """
+        Drop one movie; hot lists that contained it are recomputed lazily.
+        """
+        slot = self.slots.pop(movie_id, None)
+        if slot is None:
+            return
+        for key in self._movie_keys(self.movies[slot]):
+            position = bisect_left(self.keys, key)
+            while self.key_slots[position] != slot:
+                position += 1
+            del self.keys[position]
+            del self.key_slots[position]
+            for length in range(1, len(key) + 1):
+                best = self.hot.get(key[:length])
+                if best is not None and slot in best:
+                    del self.hot[key[:length]]
+        self.movies[slot] = None
+        self.ratings[slot] = -1.0
+        self.free.append(slot)
+
+    def _store(self, row):
+        if self.free:
+            slot = self.free.pop()
+            self.movies[slot] = tuple(row)
+            self.ratings[slot] = row[4]
+        else:
+            slot = len(self.movies)
+            self.movies.append(tuple(row))
+            self.ratings.append(row[4])
+        self.slots[row[0]] = slot
+        if self.max_movies:
+            heappush(self.worst, (row[4], row[0]))
+            if len(self.worst) > 2 * len(self.slots) + 64:
+                self._reheap()
+        return slot
+
+    def _worst(self):
+        """
+        Return ``(rating, id)`` of the worst-rated movie held.
+        """
+        while True:
+            rating, movie_id = self.worst[0]
+            slot = self.slots.get(movie_id)
+            if slot is not None and self.movies[slot][4] == rating:
+                return rating, movie_id
+            # Removed or re-rated since it was pushed
+            heappop(self.worst)
+
+    def _reheap(self):
+        # Drop stale entries so the heap stays proportional to the index
+        self.worst = [(self.movies[slot][4], movie_id) for movie_id, slot in self.slots.items()]
+        heapify(self.worst)
+
+    def _movie_keys(self, row):
+        # Title and director; a movie whose director is its title gets one key
+        keys = {normalize(row[1], self.key_length), normalize(row[2], self.key_length)}
+        keys.discard('')
+        return sorted(keys)
+
+    def _best(self, slots):
+        return nlargest(self.top, dict.fromkeys(slots), key=self.ratings.__getitem__)
+
+    def _collect(self, lo, hi, depth):
+        """
+        Return the best slots of keys[lo:hi], which share ``depth`` leading
+        characters, storing them for every hot prefix on the way.
+
+        Children are solved first and merged, so the whole pass touches
+        each key once.
+        """
+        if hi - lo <= self.hot_prefix:
+            return self._best(self.key_slots[lo:hi])
+        candidates = []
+        position = lo
+        # A key equal to the prefix itself sorts first
+        while position < hi and len(self.keys[position]) == depth:
+            candidates.append(self.key_slots[position])
+            position += 1
+        while position < hi:
+            child = self.keys[position][:depth + 1]
+            end = bisect_left(self.keys, child + MAX_CHAR, position, hi)
+            candidates.extend(self._collect(position, end, depth + 1))
+            position = end
+        best = self._best(candidates)
+        if depth:
+            self.hot[self.keys[lo][:depth]] = best
+        return best
+
+
+class AutocompleteService:
+    """
+    Per-process owner of the PrefixIndex: builds, refreshes and guards it.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.index = None
+        self.version = None
+        self.local_writes = 0  # deltas applied since the last rebuild
+        self.checked = 0.0
+
+    def rows(self):
+        return Movie.objects.order_by('-rating', 'id').values_list(
+            'id', 'title', 'director', 'year', 'rating'
+        )[:get_setting('AUTOCOMPLETE_MAX_MOVIES')].iterator(chunk_size=10000)
+
+    def rebuild(self):
+        with self.lock:
+            state = CatalogState.objects.current()
+            self.index = PrefixIndex(
+                key_length=get_setting('AUTOCOMPLETE_KEY_LENGTH'),
+                hot_prefix=get_setting('AUTOCOMPLETE_HOT_PREFIX'),
+                max_movies=get_setting('AUTOCOMPLETE_MAX_MOVIES'),
+            ).build(self.rows())
+            self.version = state.version
+            self.local_writes = 0
+            self.checked = time.monotonic()
+
+    def search(self, prefix, limit=10):
+        with self.lock:
+            if self.index is None:
+                self.rebuild()
+            elif time.monotonic() - self.checked > get_setting('AUTOCOMPLETE_REFRESH_SECONDS'):
+                self.checked = time.monotonic()
+                # Each local write bumped the version once; anything else
+                # came from another process (or a bulk write) and needs a
+                # rebuild.
+                if CatalogState.objects.current().version != self.version + self.local_writes:
+                    self.rebuild()
+            return self.index.search(prefix, limit)
+
+    def warm(self):
+        """
+        Build the index ahead of the first lookup (e.g. at worker start).
+        """
+        try:
+            self.rebuild()
+        except DatabaseError:
+            # Not migrated yet; the first lookup builds it instead
+            self.index = None
+
+    def movie_saved(self, movie, using):
+        self._on_commit(using, lambda: self.index.add(
+            (movie.pk, movie.title, movie.director, movie.year, movie.rating)
+        ))
+
+    def movie_deleted(self, movie_id, using):
+        self._on_commit(using, lambda: self.index.remove(movie_id))
+
+    def _on_commit(self, using, apply):
+        if self.index is None:
+            return
+
+        def update():
+            with self.lock:
+                if self.index is None:
+                    return
+                # Applying is idempotent, so a rebuild that already saw this
+                # write does no harm. Writes from other processes are left
+                # to the periodic check in search(), off the commit path.
+                apply()
+                self.local_writes += 1
+
+        transaction.on_commit(update, using=using)
+
+
+autocomplete = AutocompleteService()
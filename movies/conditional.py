@@ -0,0 +1,158 @@
+"""
+ETag / Last-Modified helpers for conditional GETs on Movie endpoints.
+
+Validators come from version columns, never from the rendered body:
+collection endpoints use the CatalogState version and write time, and
+the detail endpoint uses the row's ``updated_at``. A collection ETag also
+covers what picks the response out of the catalog (path, query, media
+type), so one page or filter's ETag never matches another's. Wrapped in Django's
+``condition`` decorator, a matching If-None-Match / If-Modified-Since
+returns 304 before any queryset is evaluated or serialized.
+
+Django's ``condition`` only wraps sync views (before Django 5.0), so
+``acondition`` does the same for the async views: it loads the state the
+validator functions need with the async ORM, then runs them.
+"""
+import datetime
+import functools
+import hashlib
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date, urlencode
+from django.views.decorators.http import condition
+
+from .exports import accepts_gzip
+from .models import CatalogState, Movie
+
+
+def catalog_state(request):
+    """
+    Return the CatalogState row, read at most once per request.
+    """
+    state = getattr(request, '_catalog_state', None)
+    if state is None:
+        state = CatalogState.objects.current()
+        request._catalog_state = state
+    return state
+
+
+async def acatalog_state(request, *args, **kwargs):
+    """
+    Async version of catalog_state().
+    """
+    state = getattr(request, '_catalog_state', None)
+    if state is None:
+        state = await CatalogState.objects.acurrent()
+        request._catalog_state = state
+    return state
+
+
+def representation_key(request, encoding=False):
+    """
+    Return a digest of what selects a collection response besides the
+    catalog version: the path (which action), the query parameters
+    sorted, the negotiated media type and, with ``encoding=True``,
+    whether the body is gzipped.
+    """
+    params = sorted((key, value) for key, values in request.GET.lists() for value in values)
+    parts = [request.path, urlencode(params), getattr(request, 'accepted_media_type', None) or '']
+    if encoding:
+        parts.append('gzip' if accepts_gzip(request) else 'identity')
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def catalog_etag(request, *args, **kwargs):
+    return f'W/"catalog-{catalog_state(request).cache_token}-{representation_key(request)}"'
+
+
+def export_etag(request, *args, **kwargs):
+    # Exports are gzipped on the fly, so the encoding is part of the body
+    key = representation_key(request, encoding=True)
+    return f'W/"catalog-{catalog_state(request).cache_token}-{key}"'
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    return catalog_state(request).updated_at
+
+
+def movie_updated_at(request, pk=None, **kwargs):
+    """
+    Return the movie's ``updated_at`` with one indexed lookup, or None.
+    """
+    if not hasattr(request, '_movie_updated_at'):
+        try:
+            updated_at = Movie.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError):
+            updated_at = None
+        request._movie_updated_at = updated_at
+    return request._movie_updated_at
+
+
+async def aload_movie_updated_at(request, pk=None, **kwargs):
+    if not hasattr(request, '_movie_updated_at'):
+        try:
+            updated_at = await Movie.objects.filter(pk=pk).values_list('updated_at', flat=True).afirst()
+        except (TypeError, ValueError):
+            updated_at = None
+        request._movie_updated_at = updated_at
+
+
+def movie_etag(request, pk=None, **kwargs):
+    updated_at = movie_updated_at(request, pk)
+    if updated_at is None:
+        return None
+    return f'W/"movie-{pk}-{updated_at.timestamp():.6f}"'
+
+
+def movie_last_modified(request, pk=None, **kwargs):
+    return movie_updated_at(request, pk)
+
+
+# Method decorators for ViewSet actions
+catalog_condition = method_decorator(
+    condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
+)
+export_condition = method_decorator(
+    condition(etag_func=export_etag, last_modified_func=catalog_last_modified)
+)
+movie_condition = method_decorator(
+    condition(etag_func=movie_etag, last_modified_func=movie_last_modified)
+)
+
+
+def acondition(load, etag_func, last_modified_func):
+    """
+    ``condition`` for async views; ``load`` is awaited first so the
+    validator functions find their state on the request.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def inner(request, *args, **kwargs):
+            await load(request, *args, **kwargs)
+            etag = etag_func(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag is not None else None
+            last_modified = last_modified_func(request, *args, **kwargs)
+            if last_modified:
+                if not timezone.is_aware(last_modified):
+                    last_modified = timezone.make_aware(last_modified, datetime.timezone.utc)
+                last_modified = int(last_modified.timestamp())
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+
+            if request.method in ('GET', 'HEAD'):
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+        return inner
+    return decorator
+
+
+acatalog_condition = acondition(acatalog_state, catalog_etag, catalog_last_modified)
+aexport_condition = acondition(acatalog_state, export_etag, catalog_last_modified)
+amovie_condition = acondition(aload_movie_updated_at, movie_etag, movie_last_modified)
@@ -0,0 +1,74 @@
+"""
+App-level settings for the movies app.
+
+Values are read from the ``MOVIES`` dict in Django settings, falling back
+to the defaults below.
+"""
+from django.conf import settings
+
+
+DEFAULTS = {
+    # Rows per INSERT batch used by the bulk importers.
+    'IMPORT_BATCH_SIZE': 1000,
+    # Maximum number of movies accepted by one bulk API request.
+    'BULK_MAX_ITEMS': 5000,
+    # Default pagination count strategy: 'exact', 'estimate' or 'none'
+    # (clients can override it with ?count=).
+    'PAGINATION_COUNT': 'exact',
+    # Estimate mode counts at most this many rows.
+    'COUNT_ESTIMATE_CAP': 10000,
+    # Seconds a filtered count stays cached (writes invalidate it sooner).
+    'COUNT_CACHE_TIMEOUT': 300,
+    # Django cache alias backing the read-endpoint response cache.
+    'RESPONSE_CACHE_ALIAS': 'default',
+    # Seconds a cached response stays fresh (0 disables the cache).
+    'RESPONSE_CACHE_TIMEOUT': 60,
+    # Seconds a stale response may still be served while it is rebuilt.
+    'RESPONSE_CACHE_STALE': 30,
+    # Seconds a rebuild holds its lock (and others wait for it).
+    'RESPONSE_CACHE_LOCK_TIMEOUT': 5,
+    # Serve list and top-rated from values_list() rows instead of
+    # MovieSerializer (same output, much less per-row work).
+    'FAST_SERIALIZATION': True,
+    # Rows fetched and encoded per chunk by the streaming export.
+    'EXPORT_CHUNK_SIZE': 2000,
+    # Autocomplete index: most movies held in memory (best rated first),
+    # characters kept per key, range size above which a prefix's top
+    # results are precomputed, and seconds between catalog version checks.
+    'AUTOCOMPLETE_MAX_MOVIES': 1000000,
+    'AUTOCOMPLETE_KEY_LENGTH': 32,
+    'AUTOCOMPLETE_HOT_PREFIX': 1000,
+    'AUTOCOMPLETE_REFRESH_SECONDS': 5,
+    # Seconds the landing page summary stays cached (writes drop it sooner).
+    'SUMMARY_CACHE_TIMEOUT': 300,
+    # Pragmas run on every new SQLite connection, e.g. {'journal_mode': 'wal'}
+    # (settings.py fills these in for MOVIES_DB_PROFILE=production).
+    'SQLITE_PRAGMAS': {},
+    # Database aliases that serve movie reads (see movies/routers.py).
+    'READ_REPLICAS': [],
+    # Seconds a client that wrote keeps reading only caught-up replicas.
+    'REPLICA_PIN_SECONDS': 30,
+    # Fraction of requests timed in detail (SQL, serialize, render) and
+    # logged; the rest only get a total in their Server-Timing header.
+    'TIMING_SAMPLE_RATE': 0.1,
+    # Requests at least this slow (ms) are logged at WARNING, with their
+    # slowest SQL statements (at most TIMING_SLOW_SQL_LIMIT), sampled or not.
+    'TIMING_SLOW_MS': 1000,
+    'TIMING_SLOW_SQL_LIMIT': 20,
+    # Record request, SQL and import metrics for /metrics.
+    'METRICS': True,
+    # Directory the worker processes share their metrics through (see
+    # movies/metrics.py); None keeps them in process memory.
+    'METRICS_DIR': None,
+    # SQL statements at least this slow (ms) are logged with their query
+    # plan (None disables it); the log keeps the newest SLOW_QUERY_LOG_SIZE.
+    'SLOW_QUERY_MS': 100,
+    'SLOW_QUERY_LOG_SIZE': 100,
+}
+
+
+def get_setting(name):
+    """
+    Return the configured value for ``name``, or its default.
+    """
+    return getattr(settings, 'MOVIES', {}).get(name, DEFAULTS[name])
@@ -0,0 +1,95 @@
+"""
+Count strategies for paginated Movie responses.
+
+    exact:    unfiltered lists read the maintained CatalogState.row_count;
+              filtered lists are counted once per catalog version and
+              cached until the next write
+    estimate: like exact when a cached count exists, otherwise count at
+              most MOVIES['COUNT_ESTIMATE_CAP'] rows
+    none:     no count at all; pages are fetched forward-only
+
+acount_queryset() is the async version, for the ASGI read views.
+"""
+import hashlib
+
+from django.core.cache import cache
+
+from .conf import get_setting
+from .models import CatalogState, Movie
+
+
+EXACT = 'exact'
+ESTIMATE = 'estimate'
+NONE = 'none'
+COUNT_MODES = (EXACT, ESTIMATE, NONE)
+
+
+def is_unfiltered(queryset):
+    """
+    Return True if ``queryset`` selects every Movie row.
+    """
+    query = queryset.query
+    return (
+        queryset.model is Movie
+        and not query.where
+        and not query.is_sliced
+        and not query.distinct
+        and not query.combinator
+    )
+
+
+def count_cache_key(queryset, state):
+    compiler = queryset.query.get_compiler(using=queryset.db)
+    sql, params = compiler.as_sql()
+    digest = hashlib.sha1(f'{sql}|{params!r}'.encode('utf-8')).hexdigest()
+    return f'movies:count:{state.cache_token}:{digest}'
+
+
+def count_queryset(queryset, mode=EXACT):
+    """
+    Return ``(count, is_estimate)`` for ``queryset`` using ``mode``.
+    """
+    state = CatalogState.objects.db_manager(queryset.db).current()
+    if is_unfiltered(queryset):
+        return state.row_count, False
+
+    queryset = queryset.order_by()
+    key = count_cache_key(queryset, state)
+    count = cache.get(key)
+    if count is not None:
+        return count, False
+
+    if mode == ESTIMATE:
+        cap = get_setting('COUNT_ESTIMATE_CAP')
+        count = queryset[:cap + 1].count()
+        if count > cap:
+            return cap, True
+
+    count = queryset.count() if mode != ESTIMATE else count
+    cache.set(key, count, get_setting('COUNT_CACHE_TIMEOUT'))
+    return count, False
+
+
+async def acount_queryset(queryset, mode=EXACT):
+    """
+    Async version of count_queryset().
+    """
+    state = await CatalogState.objects.db_manager(queryset.db).acurrent()
+    if is_unfiltered(queryset):
+        return state.row_count, False
+
+    queryset = queryset.order_by()
+    key = count_cache_key(queryset, state)
+    count = await cache.aget(key)
+    if count is not None:
+        return count, False
+
+    if mode == ESTIMATE:
+        cap = get_setting('COUNT_ESTIMATE_CAP')
+        count = await queryset[:cap + 1].acount()
+        if count > cap:
+            return cap, True
+
+    count = await queryset.acount() if mode != ESTIMATE else count
+    await cache.aset(key, count, get_setting('COUNT_CACHE_TIMEOUT'))
+    return count, False
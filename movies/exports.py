@@ -0,0 +1,184 @@
+"""
+Streaming catalog exports (NDJSON and CSV).
+
+Rows are read with ``values_list().iterator(chunk_size=...)`` and encoded
+one chunk at a time, so memory stays flat however large the catalog is.
+Each row has the same fields and values as the list endpoint.
+The ``a``-prefixed functions do the same with the async ORM, for ASGI.
+"""
+import csv
+import io
+import re
+from gzip import GzipFile
+
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import StreamingBuffer, compress_sequence
+
+from .conf import get_setting
+from .importers import batched
+from .renderers import FastJSONRenderer
+from .serializers import MovieRowSerializer
+
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+EXPORT_FORMATS = (NDJSON, CSV)
+
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv; charset=utf-8',
+}
+
+gzip_re = re.compile(r'\bgzip\b')
+
+
+def iter_chunks(queryset, chunk_size):
+    """
+    Yield lists of row dicts, ``chunk_size`` rows at a time.
+    """
+    serializer = MovieRowSerializer()
+    rows = queryset.values_list(*MovieRowSerializer.fields).iterator(chunk_size=chunk_size)
+    for chunk in batched(rows, chunk_size):
+        yield serializer.to_representation(chunk)
+
+
+async def aiter_chunks(queryset, chunk_size):
+    """
+    Async version of iter_chunks().
+    """
+    serializer = MovieRowSerializer()
+    chunk = []
+    # named=True: Django 4.2.0's aiterator() runs plain values_list()
+    # queries eagerly, outside its thread
+    rows = queryset.values_list(*MovieRowSerializer.fields, named=True)
+    async for row in rows.aiterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield serializer.to_representation(chunk)
+            chunk = []
+    if chunk:
+        yield serializer.to_representation(chunk)
+
+
+class NDJSONEncoder:
+    def __init__(self):
+        self.renderer = FastJSONRenderer()
+
+    def header(self):
+        return b''
+
+    def encode(self, chunk):
+        return b''.join(self.renderer.render(item) + b'\n' for item in chunk)
+
+
+class CSVEncoder:
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def header(self):
+        self.writer.writerow(MovieRowSerializer.fields)
+        return self.flush()
+
+    def encode(self, chunk):
+        self.writer.writerows(
+            ['' if value is None else value for value in item.values()]
+            for item in chunk
+        )
+        return self.flush()
+
+    def flush(self):
+        data = self.buffer.getvalue().encode('utf-8')
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+ENCODERS = {
+    NDJSON: NDJSONEncoder,
+    CSV: CSVEncoder,
+}
+
+
+def iter_encoded(chunks, encoder):
+    header = encoder.header()
+    if header:
+        yield header
+    for chunk in chunks:
+        yield encoder.encode(chunk)
+
+
+async def aiter_encoded(chunks, encoder):
+    header = encoder.header()
+    if header:
+        yield header
+    async for chunk in chunks:
+        yield encoder.encode(chunk)
+
+
+async def acompress_sequence(sequence):
+    """
+    django.utils.text.compress_sequence() for an async iterator.
+    """
+    buf = StreamingBuffer()
+    with GzipFile(mode='wb', compresslevel=6, fileobj=buf, mtime=0) as zfile:
+        # Output headers...
+        yield buf.read()
+        async for item in sequence:
+            zfile.write(item)
+            data = buf.read()
+            if data:
+                yield data
+    yield buf.read()
+
+
+def export_format(output, accepted_format):
+    """
+    Return the requested export format: ``?output=`` if given, else the
+    format negotiated from the Accept header, else NDJSON.
+
+    Returns None when ``output`` is not a known format.
+    """
+    if output is not None:
+        return output if output in EXPORT_FORMATS else None
+    return accepted_format if accepted_format in EXPORT_FORMATS else NDJSON
+
+
+def accepts_gzip(request):
+    return bool(gzip_re.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+
+
+def stream_export(queryset, export_format, gzip=False, chunk_size=None):
+    """
+    Return a StreamingHttpResponse with ``queryset`` in ``export_format``.
+
+    With ``gzip=True`` the body is compressed while it streams.
+    """
+    chunk_size = chunk_size or get_setting('EXPORT_CHUNK_SIZE')
+    chunks = iter_chunks(queryset.order_by('pk'), chunk_size)
+    body = iter_encoded(chunks, ENCODERS[export_format]())
+    if gzip:
+        body = compress_sequence(body)
+    return export_response(body, export_format, gzip)
+
+
+def astream_export(queryset, export_format, gzip=False, chunk_size=None):
+    """
+    stream_export() reading rows with the async ORM, for ASGI.
+    """
+    chunk_size = chunk_size or get_setting('EXPORT_CHUNK_SIZE')
+    chunks = aiter_chunks(queryset.order_by('pk'), chunk_size)
+    body = aiter_encoded(chunks, ENCODERS[export_format]())
+    if gzip:
+        body = acompress_sequence(body)
+    return export_response(body, export_format, gzip)
+
+
+def export_response(body, export_format, gzip):
+    response = StreamingHttpResponse(body, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="movies.{export_format}"'
+    if gzip:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    return response
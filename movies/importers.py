@@ -0,0 +1,462 @@
+"""
+Bulk-load engine shared by all movie importers.
+
+Rows are parsed lazily from CSV and inserted with batched ``bulk_create``
+inside a single transaction, so a full reload costs one commit instead of
+one INSERT and fsync per row.
+
+Import modes:
+    append:  insert rows next to the existing catalog
+    replace: delete and insert in one transaction
+    staged:  load into the staging tables, validate, then swap them in with
+             a single short transaction (readers see the old or the new
+             catalog, never a partial one)
+    delta:   compare row fingerprints against the catalog in one bulk read
+             and upsert only new and changed rows (optionally pruning rows
+             missing from the source)
+
+Writes to Movie use the (title, year) natural-key upsert, so a repeated
+key updates the existing row.
+
+On PostgreSQL (psycopg 3) the append, replace and staged loads stream rows
+with COPY instead of batched INSERTs (see movies/postgres.py).
+"""
+import csv
+import time
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .conf import get_setting
+from .metrics import record_import
+from .models import (
+    CatalogState, Movie, MovieGenre, MovieStat, StagedMovie, StagedMovieGenre,
+    StagedMovieStat, bulk_catalog_write, compute_fingerprint,
+)
+from .postgres import copy_model_rows, copy_upsert_movies, supports_copy
+from .search import search_index_rebuilt
+
+
+APPEND = 'append'
+REPLACE = 'replace'
+STAGED = 'staged'
+DELTA = 'delta'
+IMPORT_MODES = (APPEND, REPLACE, STAGED, DELTA)
+
+
+# Column names for the two CSV layouts we accept, keyed by model field.
+IMDB_COLUMNS = {
+    'title': 'Title',
+    'director': 'Director',
+    'genre': 'Genre',
+    'year': 'Year',
+    'rating': 'Rating',
+    'budget': 'Revenue (Millions)',
+}
+SIMPLE_COLUMNS = {
+    'title': 'title',
+    'director': 'director',
+    'genre': 'genre',
+    'year': 'year',
+    'rating': 'rating',
+    'budget': 'budget',
+}
+
+
+class StagingValidationError(Exception):
+    """
+    Raised when the staged catalog fails validation and is not swapped in.
+    """
+
+
+class ImportStats:
+    """
+    Running counters for an import, with throughput reporting.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.skipped = 0
+        self.errors = []
+        self.swap_seconds = None
+        self.started = time.perf_counter()
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def processed(self):
+        return self.created + self.updated + self.unchanged
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+
+def detect_columns(fieldnames):
+    """
+    Return the column mapping for a CSV header, or raise ValueError.
+    """
+    fieldnames = fieldnames or []
+    if 'Title' in fieldnames and 'Director' in fieldnames:
+        return IMDB_COLUMNS
+    if 'title' in fieldnames and 'director' in fieldnames:
+        return SIMPLE_COLUMNS
+    raise ValueError(
+        f"Unrecognized CSV format. Columns found: {', '.join(fieldnames)}"
+    )
+
+
+def parse_row(row, columns):
+    """
+    Convert one CSV row into a dict of Movie field values.
+
+    Raises ValueError or KeyError when the row is unusable.
+    """
+    title = row[columns['title']].strip()
+    director = (row[columns['director']] or '').strip() or 'Unknown'
+    genre = row[columns['genre']].strip()
+    year = int(row[columns['year']])
+    rating = float(row[columns['rating']])
+
+    if not title or not genre:
+        raise ValueError('empty required field')
+    if year < 1800 or year > 2100:
+        raise ValueError(f'invalid year {year}')
+    if rating < 0 or rating > 10:
+        raise ValueError(f'invalid rating {rating}')
+
+    budget = None
+    raw_budget = (row.get(columns['budget']) or '').strip()
+    if raw_budget and raw_budget != 'nan':
+        try:
+            if columns is IMDB_COLUMNS:
+                # Revenue is given in millions
+                budget = int(float(raw_budget) * 1_000_000)
+            else:
+                budget = int(raw_budget)
+        except (ValueError, TypeError):
+            budget = None
+
+    return {
+        'title': title,
+        'director': director,
+        'genre': genre,
+        'year': year,
+        'rating': rating,
+        'budget': budget,
+    }
+
+
+def iter_csv_rows(file, stats=None, on_error=None):
+    """
+    Stream parsed rows from an open CSV file.
+
+    Bad rows are counted on ``stats`` and passed to ``on_error`` as
+    ``(row_num, error)`` instead of aborting the import.
+    """
+    reader = csv.DictReader(file)
+    columns = detect_columns(reader.fieldnames)
+
+    for row_num, row in enumerate(reader, start=2):
+        try:
+            yield parse_row(row, columns)
+        except (ValueError, KeyError) as e:
+            if stats is not None:
+                stats.skipped += 1
+                stats.errors.append((row_num, str(e)))
+            if on_error is not None:
+                on_error(row_num, e)
+
+
+def batched(iterable, size):
+    """
+    Yield lists of up to ``size`` items from ``iterable``.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def delete_catalog(using=DEFAULT_DB_ALIAS):
+    """
+    Delete every movie and genre link with two plain DELETE statements.
+
+    Bypasses the ORM collector, which would otherwise load every row to
+    send per-row delete signals. Callers refresh CatalogState afterwards.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {quote(MovieGenre._meta.db_table)}')
+        cursor.execute(f'DELETE FROM {quote(Movie._meta.db_table)}')
+
+
+def stage_catalog_extras(using=DEFAULT_DB_ALIAS):
+    """
+    Fill the genre link and summary staging tables from the staged movies.
+
+    Runs before the swap, outside its transaction: readers never look at
+    the staging tables, so none of this holds the catalog's write lock.
+    """
+    links = StagedMovieGenre.objects.db_manager(using)
+    stats = StagedMovieStat.objects.db_manager(using)
+    links.all().delete()
+    stats.all().delete()
+    pairs = MovieGenre.objects.db_manager(using).link_pairs(
+        StagedMovie.objects.db_manager(using).values_list('pk', 'genre').order_by()
+    )
+    links.bulk_create(
+        [StagedMovieGenre(movie_id=movie_id, genre_id=genre_id) for movie_id, genre_id in pairs],
+        batch_size=1000,
+    )
+    stats.bulk_create(MovieStat.objects.db_manager(using).compute(staged=True), batch_size=1000)
+
+
+def clear_staging(using=DEFAULT_DB_ALIAS):
+    for model in (StagedMovieGenre, StagedMovieStat, StagedMovie):
+        model.objects.db_manager(using).all().delete()
+
+
+def copy_table(connection, source, target, fields):
+    """
+    Copy the ``fields`` columns of every ``source`` row into ``target``.
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(source._meta.get_field(name).column) for name in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(target._meta.db_table)} ({columns}) '
+            f'SELECT {columns} FROM {quote(source._meta.db_table)}'
+        )
+
+
+def swap_staged_catalog(using=DEFAULT_DB_ALIAS):
+    """
+    Replace the catalog with the staging tables in one transaction.
+
+    stage_catalog_extras() must have filled the link and summary staging
+    tables. Inside the transaction every step is one set-based statement:
+    delete the catalog, then ``INSERT ... SELECT`` the movies (keeping
+    their staged ids), links and summary rows. The search index is
+    rebuilt in one pass instead of per row. So the write lock is held
+    only for the copy itself.
+    """
+    connection = connections[using]
+    movie_fields = [field.name for field in Movie._meta.concrete_fields]
+    stat_fields = [
+        field.name for field in MovieStat._meta.concrete_fields if not field.primary_key
+    ]
+
+    with transaction.atomic(using=using), search_index_rebuilt(connection):
+        delete_catalog(using=using)
+        MovieStat.objects.db_manager(using).all().delete()
+        copy_table(connection, StagedMovie, Movie, movie_fields)
+        copy_table(connection, StagedMovieGenre, MovieGenre, ['movie', 'genre'])
+        copy_table(connection, StagedMovieStat, MovieStat, stat_fields)
+        # The movies kept their staged ids; move the id sequence past them
+        with connection.cursor() as cursor:
+            for statement in connection.ops.sequence_reset_sql(no_style(), [Movie]):
+                cursor.execute(statement)
+        CatalogState.objects.db_manager(using).refresh(stats_current=True)
+
+
+class BulkImporter:
+    """
+    Load parsed movie rows with batched ``bulk_create``.
+
+    Args:
+        batch_size: Rows per INSERT batch (default: MOVIES['IMPORT_BATCH_SIZE'])
+        progress: Optional callable receiving ImportStats after each batch
+        on_error: Optional callable receiving (row_num, error) for bad rows
+        using: Database alias to write to
+    """
+
+    def __init__(self, batch_size=None, progress=None, on_error=None,
+                 using=DEFAULT_DB_ALIAS):
+        self.batch_size = batch_size or get_setting('IMPORT_BATCH_SIZE')
+        if self.batch_size < 1:
+            raise ValueError('batch_size must be a positive integer')
+        self.progress = progress
+        self.on_error = on_error
+        self.using = using
+
+    def load(self, rows, mode=APPEND, stats=None, min_rows=1, prune=False):
+        """
+        Insert ``rows`` (dicts of field values) and return ImportStats.
+
+        In ``replace`` mode the existing catalog is deleted in the same
+        transaction as the inserts, so a failed import leaves it untouched.
+        In ``staged`` mode the import is refused with StagingValidationError
+        unless the staged row count matches and is at least ``min_rows``.
+        In ``delta`` mode ``prune=True`` also deletes movies whose
+        (title, year) is absent from ``rows``.
+        """
+        if mode not in IMPORT_MODES:
+            raise ValueError(f'Unknown import mode: {mode}')
+        stats = stats or ImportStats()
+
+        if mode == STAGED:
+            self._load_staged(rows, stats, min_rows)
+        elif mode == DELTA:
+            with transaction.atomic(using=self.using), bulk_catalog_write(self.using) as write:
+                self._load_delta(rows, stats, prune)
+                write.changed = bool(stats.created or stats.updated or stats.deleted)
+        else:
+            with transaction.atomic(using=self.using), bulk_catalog_write(self.using):
+                if mode == REPLACE:
+                    delete_catalog(using=self.using)
+                self._insert_batches(Movie, rows, stats)
+
+        stats.finish()
+        record_import(mode, stats)
+        return stats
+
+    def load_csv(self, path, mode=APPEND, min_rows=1, prune=False):
+        """
+        Stream a CSV file (IMDB or simple format) into the database.
+        """
+        stats = ImportStats()
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            rows = iter_csv_rows(file, stats=stats, on_error=self.on_error)
+            return self.load(
+                rows, mode=mode, stats=stats, min_rows=min_rows, prune=prune
+            )
+
+    def _insert_batches(self, model, rows, stats, commit_each=False):
+        connection = connections[self.using]
+        if supports_copy(connection):
+            self._copy(connection, model, rows, stats)
+            return
+        manager = model.objects.db_manager(self.using)
+        # Movie rows go through the natural-key upsert so a repeated
+        # (title, year) updates the existing row instead of failing.
+        write = manager.upsert if model is Movie else manager.bulk_create
+        for batch in batched(rows, self.batch_size):
+            objs = [
+                model(**values, fingerprint=compute_fingerprint(values))
+                for values in batch
+            ]
+            if commit_each:
+                with transaction.atomic(using=self.using):
+                    write(objs, batch_size=self.batch_size)
+            else:
+                write(objs, batch_size=self.batch_size)
+            stats.created += len(batch)
+            self._report(stats)
+
+    def _copy(self, connection, model, rows, stats):
+        # One COPY stream replaces the INSERT batches; progress is still
+        # reported every batch_size rows.
+        def counted(rows):
+            for values in rows:
+                yield dict(values, fingerprint=compute_fingerprint(values))
+                stats.created += 1
+                if stats.created % self.batch_size == 0:
+                    self._report(stats)
+
+        if model is Movie:
+            copy_upsert_movies(connection, counted(rows))
+        else:
+            with transaction.atomic(using=self.using):
+                copy_model_rows(connection, model, counted(rows), timestamps=True)
+        self._report(stats)
+
+    def _load_staged(self, rows, stats, min_rows):
+        staging = StagedMovie.objects.db_manager(self.using)
+        clear_staging(self.using)
+
+        # The staging table is invisible to readers, so each batch commits
+        # on its own instead of holding the write lock for the whole load.
+        self._insert_batches(StagedMovie, rows, stats, commit_each=True)
+
+        staged = staging.count()
+        try:
+            if staged != stats.created:
+                raise StagingValidationError(
+                    f'Staged {staged} rows but parsed {stats.created}'
+                )
+            if staged < min_rows:
+                raise StagingValidationError(
+                    f'Staged {staged} rows, expected at least {min_rows}'
+                )
+            distinct = staging.values('title', 'year').distinct().count()
+            if distinct != staged:
+                raise StagingValidationError(
+                    f'Staged catalog has {staged - distinct} duplicate (title, year) rows'
+                )
+            stage_catalog_extras(using=self.using)
+            started = time.perf_counter()
+            swap_staged_catalog(using=self.using)
+            stats.swap_seconds = time.perf_counter() - started
+        finally:
+            clear_staging(self.using)
+
+    def _load_delta(self, rows, stats, prune):
+        manager = Movie.objects.db_manager(self.using)
+
+        # One bulk read of the identity keys and fingerprints
+        existing = {
+            (title, year): (pk, fingerprint)
+            for pk, title, year, fingerprint in manager.values_list(
+                'pk', 'title', 'year', 'fingerprint'
+            ).order_by().iterator(chunk_size=self.batch_size * 10)
+        }
+        seen = set()
+        pending = []
+
+        for values in rows:
+            key = (values['title'], values['year'])
+            if key in seen:
+                error = ValueError(f'duplicate movie {key[0]} ({key[1]})')
+                stats.skipped += 1
+                stats.errors.append((None, str(error)))
+                if self.on_error is not None:
+                    self.on_error(None, error)
+                continue
+            seen.add(key)
+
+            fingerprint = compute_fingerprint(values)
+            current = existing.get(key)
+            if current is None:
+                stats.created += 1
+            elif current[1] != fingerprint:
+                stats.updated += 1
+            else:
+                stats.unchanged += 1
+                continue
+
+            # New and changed rows share one upsert statement per batch
+            pending.append(Movie(**values, fingerprint=fingerprint))
+            if len(pending) >= self.batch_size:
+                manager.upsert(pending, batch_size=self.batch_size)
+                pending = []
+                self._report(stats)
+
+        if pending:
+            manager.upsert(pending, batch_size=self.batch_size)
+
+        if prune:
+            missing = [pk for key, (pk, _) in existing.items() if key not in seen]
+            for batch in batched(missing, self.batch_size):
+                _, deleted = manager.filter(pk__in=batch).delete()
+                stats.deleted += deleted.get(Movie._meta.label, 0)
+        self._report(stats)
+
+    def _report(self, stats):
+        if self.progress is not None:
+            self.progress(stats)
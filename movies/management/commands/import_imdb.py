@@ -1,69 +1,101 @@
 """
 Django management command to import IMDB Top 1000 Movies data.
 """
-import csv
 import os
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from movies.importers import (
+    BulkImporter, DELTA, IMPORT_MODES, REPLACE, STAGED, StagingValidationError,
+)
 from movies.models import Movie
 
 
 class Command(BaseCommand):
     help = 'Import IMDB Top 1000 Movies from CSV file'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv_file',
+            nargs='?',
+            default='imdb_full.csv',
+            help='Path to the CSV file (default: imdb_full.csv)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Rows per INSERT batch (default: MOVIES["IMPORT_BATCH_SIZE"])',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=IMPORT_MODES,
+            default=REPLACE,
+            help='append: keep existing movies; replace: delete and reload in '
+                 'one transaction; staged: load into a staging table and swap '
+                 'it in atomically; delta: write only new and changed rows '
+                 '(default: replace)',
+        )
+        parser.add_argument(
+            '--min-rows',
+            type=int,
+            default=1,
+            help='Staged mode: refuse the swap if fewer rows were loaded (default: 1)',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delta mode: delete movies that are missing from the CSV',
+        )
+
     def handle(self, *args, **options):
-        csv_file = 'imdb_full.csv'
+        csv_file = options['csv_file']
 
         if not os.path.exists(csv_file):
             self.stdout.write(self.style.ERROR(f'Error: {csv_file} not found!'))
             return
 
-        self.stdout.write('Clearing existing movies...')
-        Movie.objects.all().delete()
-
-        self.stdout.write(f'Reading {csv_file}...')
-        movies_created = 0
-        movies_skipped = 0
-
-        with open(csv_file, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-
-            for row in reader:
-                try:
-                    title = row['Title'].strip()
-                    director = row['Director'].strip() if row['Director'] else 'Unknown'
-                    genre = row['Genre'].strip()
-                    year = int(row['Year'])
-                    rating = float(row['Rating'])
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer')
 
-                    revenue = row.get('Revenue (Millions)', '').strip()
-                    budget = None
-                    if revenue and revenue != 'nan':
-                        try:
-                            budget = int(float(revenue) * 1000000)
-                        except (ValueError, TypeError):
-                            budget = None
+        importer = BulkImporter(
+            batch_size=options['batch_size'],
+            progress=self.report_progress,
+            on_error=self.report_error,
+        )
 
-                    Movie.objects.create(
-                        title=title,
-                        director=director,
-                        genre=genre,
-                        year=year,
-                        rating=rating,
-                        budget=budget
-                    )
-                    movies_created += 1
-
-                    if movies_created % 100 == 0:
-                        self.stdout.write(f'Imported {movies_created} movies...')
-
-                except (ValueError, KeyError) as e:
-                    movies_skipped += 1
-                    self.stdout.write(
-                        self.style.WARNING(f'Skipped row due to error: {e}')
-                    )
-                    continue
+        self.stdout.write(
+            f'Reading {csv_file} ({options["mode"]} mode, batch size {importer.batch_size})...'
+        )
+        try:
+            stats = importer.load_csv(
+                csv_file,
+                mode=options['mode'],
+                min_rows=options['min_rows'],
+                prune=options['prune'],
+            )
+        except StagingValidationError as e:
+            raise CommandError(f'Staged catalog rejected, live catalog unchanged: {e}')
 
         self.stdout.write(self.style.SUCCESS(f'\n✓ Import complete!'))
-        self.stdout.write(f'  - Movies created: {movies_created}')
-        self.stdout.write(f'  - Movies skipped: {movies_skipped}')
+        self.stdout.write(f'  - Movies created: {stats.created}')
+        if options['mode'] == DELTA:
+            self.stdout.write(f'  - Movies updated: {stats.updated}')
+            self.stdout.write(f'  - Movies unchanged: {stats.unchanged}')
+            self.stdout.write(f'  - Movies deleted: {stats.deleted}')
+        self.stdout.write(f'  - Movies skipped: {stats.skipped}')
+        self.stdout.write(
+            f'  - Elapsed: {stats.elapsed:.2f}s ({stats.rows_per_second:,.0f} rows/s)'
+        )
+        if options['mode'] == STAGED:
+            self.stdout.write(f'  - Swap time: {stats.swap_seconds * 1000:.1f}ms')
         self.stdout.write(f'  - Total in database: {Movie.objects.count()}')
+
+    def report_progress(self, stats):
+        self.stdout.write(
+            f'Processed {stats.processed} movies... ({stats.rows_per_second:,.0f} rows/s)'
+        )
+
+    def report_error(self, row_num, error):
+        where = f'row {row_num}' if row_num is not None else 'row'
+        self.stdout.write(
+            self.style.WARNING(f'Skipped {where} due to error: {error}')
+        )
@@ -0,0 +1,33 @@
+"""
+Django management command to refresh SQLite read replicas from the primary.
+"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.conf import get_setting
+from movies.replicas import sync_replicas
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary database into each SQLite read replica (online backup API)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Keep running and re-sync every INTERVAL seconds',
+        )
+
+    def handle(self, *args, **options):
+        if not get_setting('READ_REPLICAS'):
+            raise CommandError('No read replicas configured (set MOVIES_DB_REPLICAS)')
+
+        while True:
+            started = time.perf_counter()
+            aliases = sync_replicas()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'Synced {", ".join(aliases)} in {elapsed:.2f}s')
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
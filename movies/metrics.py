@@ -0,0 +1,331 @@
+"""
+Prometheus metrics, summed across worker processes.
+
+Each process writes its samples to its own memory-mapped file in
+MOVIES['METRICS_DIR']. A sample update is a dict lookup and an in-place
+write of 8 bytes, and no lock is shared between processes. ``/metrics``
+reads every file in the directory and adds them up, so whichever worker
+answers reports the totals of all of them. That includes workers that
+have exited, so counters never go backwards, and management commands such
+as import_movies. Empty the directory when the server starts (see
+gunicorn.conf.py).
+
+Without METRICS_DIR, samples are kept in memory and ``/metrics`` reports
+the current process only, which is enough for runserver.
+
+The output is the Prometheus text format (0.0.4), rendered here, so there
+is no client library to install.
+"""
+import glob
+import mmap
+import os
+import re
+import struct
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from .conf import get_setting
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; HTTP requests and imports
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+IMPORT_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+
+class FileValues:
+    """
+    Float values by key in a memory-mapped file written by one process.
+
+    Layout: the used length (8 bytes), then one entry per key: the key's
+    byte length (4 bytes), the UTF-8 key padded so the value is 8-byte
+    aligned, and the value as a double.
+    """
+    initial_size = 64 * 1024
+
+    def __init__(self, path):
+        self.file = open(path, 'a+b')
+        self.size = os.fstat(self.file.fileno()).st_size
+        if self.size == 0:
+            self.size = self.initial_size
+            self.file.truncate(self.size)
+        self.map = mmap.mmap(self.file.fileno(), self.size)
+        self.used = struct.unpack_from('<Q', self.map, 0)[0] or 8
+        self.positions = {
+            key: position for key, position, _ in read_entries(self.map, self.used)
+        }
+
+    def add(self, key, amount):
+        position = self.positions.get(key)
+        if position is None:
+            position = self._append(key)
+        value = struct.unpack_from('<d', self.map, position)[0]
+        struct.pack_into('<d', self.map, position, value + amount)
+
+    def _append(self, key):
+        encoded = key.encode('utf-8')
+        padded = len(encoded) + (-(4 + len(encoded)) % 8)
+        length = 4 + padded + 8
+        if self.used + length > self.size:
+            while self.used + length > self.size:
+                self.size *= 2
+            self.file.truncate(self.size)
+            self.map = mmap.mmap(self.file.fileno(), self.size)
+        struct.pack_into(f'<i{padded}sd', self.map, self.used, len(encoded), encoded, 0.0)
+        position = self.used + 4 + padded
+        self.used += length
+        # Readers only look up to the used length, so publish it last
+        struct.pack_into('<Q', self.map, 0, self.used)
+        self.positions[key] = position
+        return position
+
+
+class MemoryValues(dict):
+    def add(self, key, amount):
+        self[key] = self.get(key, 0.0) + amount
+
+
+def read_entries(data, used=None):
+    """
+    Yield ``(key, value position, value)`` from a FileValues buffer.
+    """
+    if used is None:
+        used = struct.unpack_from('<Q', data, 0)[0]
+    position = 8
+    while position < used:
+        length = struct.unpack_from('<i', data, position)[0]
+        key = bytes(data[position + 4:position + 4 + length]).decode('utf-8')
+        position += 4 + length + (-(4 + length) % 8)
+        yield key, position, struct.unpack_from('<d', data, position)[0]
+        position += 8
+
+
+class Store:
+    """
+    This process's values; reopened after a fork or a METRICS_DIR change.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = None
+        self.owner = None
+
+    def current(self):
+        owner = (os.getpid(), get_setting('METRICS_DIR'))
+        if self.owner != owner:
+            directory = owner[1]
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+                self.values = FileValues(os.path.join(directory, f'metrics_{owner[0]}.db'))
+            else:
+                self.values = MemoryValues()
+            self.owner = owner
+        return self.values
+
+    def add(self, key, amount):
+        with self.lock:
+            self.current().add(key, amount)
+
+    def observe(self, bucket, total, count, value):
+        with self.lock:
+            values = self.current()
+            values.add(bucket, 1)
+            values.add(total, value)
+            values.add(count, 1)
+
+    def totals(self):
+        """
+        Return every key's value summed over all processes.
+        """
+        with self.lock:
+            values = self.current()
+        directory = get_setting('METRICS_DIR')
+        if not directory:
+            return dict(values)
+        totals = defaultdict(float)
+        for path in glob.glob(os.path.join(directory, 'metrics_*.db')):
+            with open(path, 'rb') as file:
+                data = file.read()
+            if len(data) < 8:
+                continue
+            for key, _, value in read_entries(data):
+                totals[key] += value
+        return totals
+
+
+store = Store()
+
+# Registered metrics, in exposition order
+registry = []
+
+
+def escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{escape(values[name])}"' for name in names) + '}'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.keys = {}      # label values -> store keys
+        registry.append(self)
+
+    def key_for(self, labels):
+        values = tuple(labels[name] for name in self.labels)
+        try:
+            return self.keys[values]
+        except KeyError:
+            key = self.keys[values] = self.make_key(labels)
+            return key
+
+    def render(self, totals):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines += self.samples(totals)
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if get_setting('METRICS'):
+            store.add(self.key_for(labels), amount)
+
+    def make_key(self, labels):
+        return self.name + format_labels(self.labels, labels)
+
+    def samples(self, totals):
+        return [
+            f'{key} {value!r}' for key, value in sorted(totals.items())
+            if key == self.name or key.startswith(self.name + '{')
+        ]
+
+
+class Histogram(Metric):
+    """
+    Bucket counts are stored per bucket and made cumulative when rendered.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(float(bound) for bound in buckets)
+        self.bucket_re = re.compile(
+            rf'^{re.escape(self.name)}_bucket\{{(.*?),?le="([^"]+)"\}}$'
+        )
+
+    def observe(self, value, **labels):
+        if not get_setting('METRICS'):
+            return
+        buckets, total, count = self.key_for(labels)
+        store.observe(buckets[bisect_left(self.buckets, value)], total, count, value)
+
+    def make_key(self, labels):
+        names = self.labels + ('le',)
+        return (
+            [
+                f'{self.name}_bucket' + format_labels(names, dict(labels, le=bound))
+                for bound in self.buckets + ('+Inf',)
+            ],
+            f'{self.name}_sum' + format_labels(self.labels, labels),
+            f'{self.name}_count' + format_labels(self.labels, labels),
+        )
+
+    def samples(self, totals):
+        series = defaultdict(dict)
+        for key, value in totals.items():
+            match = self.bucket_re.match(key)
+            if match:
+                series[match.group(1)][match.group(2)] = value
+        lines = []
+        for labels in sorted(series):
+            counts = series[labels]
+            prefix = f'{labels},' if labels else ''
+            suffix = f'{{{labels}}}' if labels else ''
+            cumulative = 0.0
+            for bound in [repr(bound) for bound in self.buckets] + ['+Inf']:
+                cumulative += counts.get(bound, 0.0)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative!r}')
+            lines.append(f'{self.name}_sum{suffix} {totals.get(f"{self.name}_sum{suffix}", 0.0)!r}')
+            lines.append(f'{self.name}_count{suffix} {cumulative!r}')
+        return lines
+
+
+def render():
+    """
+    Return all metrics in the Prometheus text format.
+    """
+    totals = store.totals()
+    lines = []
+    for metric in registry:
+        lines += metric.render(totals)
+    return '\n'.join(lines) + '\n'
+
+
+REQUESTS = Counter(
+    'movies_http_requests_total', 'HTTP requests by view, method and status.',
+    ('view', 'method', 'status'),
+)
+REQUEST_SECONDS = Histogram(
+    'movies_http_request_duration_seconds', 'HTTP request latency.', ('view', 'method'),
+)
+REQUEST_DB_SECONDS = Histogram(
+    'movies_http_request_db_seconds', 'Time spent in SQL per HTTP request.', ('view',),
+)
+REQUEST_QUERIES = Histogram(
+    'movies_http_request_queries', 'SQL statements per HTTP request.', ('view',),
+    buckets=COUNT_BUCKETS,
+)
+RESPONSE_CACHE = Counter(
+    'movies_response_cache_total', 'Response cache lookups by view and result.',
+    ('view', 'result'),
+)
+QUERY_SECONDS = Histogram(
+    'movies_db_query_duration_seconds', 'SQL statement latency.', ('alias',),
+    buckets=QUERY_BUCKETS,
+)
+IMPORT_ROWS = Counter(
+    'movies_import_rows_total', 'Rows written or checked by imports.', ('mode',),
+)
+IMPORT_SECONDS = Histogram(
+    'movies_import_duration_seconds', 'Import run time.', ('mode',), buckets=IMPORT_BUCKETS,
+)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unmatched'
+
+
+def record_request(request, response, seconds, timer=None):
+    """
+    Record one HTTP request; ``timer`` is its RequestTimer.
+    """
+    view = view_name(request)
+    REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+    REQUEST_SECONDS.observe(seconds, view=view, method=request.method)
+    if timer is not None:
+        REQUEST_DB_SECONDS.observe(timer.db_time, view=view)
+        REQUEST_QUERIES.observe(timer.query_count, view=view)
+    # response_cache.CACHE_HEADER; importing it here would be circular
+    result = response.get('X-Cache')
+    if result:
+        RESPONSE_CACHE.inc(view=view, result=result)
+
+
+def record_import(mode, stats):
+    IMPORT_ROWS.inc(stats.processed, mode=mode)
+    IMPORT_SECONDS.observe(stats.elapsed, mode=mode)
@@ -0,0 +1,169 @@
+"""
+Middleware for the movies app.
+"""
+import json
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import DEFAULT_DB_ALIAS
+
+from .conf import get_setting
+from .metrics import record_request
+from .models import CatalogState
+from .routers import routing_scope
+from .timing import RENDER, SERIALIZE, timing_scope
+
+
+logger = logging.getLogger('movies.timing')
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReadYourWritesMiddleware:
+    """
+    Scope replica routing to the request and make writes sticky.
+
+    Unsafe methods read the primary. A request that wrote to the catalog
+    sets the ``movies_rw`` cookie to the catalog version it produced. For
+    MOVIES['REPLICA_PIN_SECONDS'], later requests from that client only
+    read replicas that have reached that version.
+    """
+    cookie_name = 'movies_rw'
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not get_setting('READ_REPLICAS'):
+            return self.get_response(request)
+
+        with self.routing_scope(request) as state:
+            response = self.get_response(request)
+            if state.wrote:
+                version = CatalogState.objects.db_manager(DEFAULT_DB_ALIAS).current().version
+                self.pin(response, version)
+        return response
+
+    async def __acall__(self, request):
+        if not get_setting('READ_REPLICAS'):
+            return await self.get_response(request)
+
+        with self.routing_scope(request) as state:
+            response = await self.get_response(request)
+            if state.wrote:
+                version = (await CatalogState.objects.db_manager(DEFAULT_DB_ALIAS).acurrent()).version
+                self.pin(response, version)
+        return response
+
+    def routing_scope(self, request):
+        return routing_scope(
+            pinned=request.method not in SAFE_METHODS,
+            min_version=self.written_version(request),
+        )
+
+    def pin(self, response, version):
+        response.set_cookie(
+            self.cookie_name, str(version),
+            max_age=get_setting('REPLICA_PIN_SECONDS'),
+            httponly=True, samesite='Lax',
+        )
+
+    def written_version(self, request):
+        try:
+            return int(request.COOKIES[self.cookie_name])
+        except (KeyError, ValueError):
+            return None
+
+
+class RequestTimingMiddleware:
+    """
+    Report where each request's time went in a Server-Timing header.
+
+    Every response gets ``total``. A sampled fraction of requests
+    (MOVIES['TIMING_SAMPLE_RATE']) also gets ``db`` (with the query
+    count), ``serialize`` and ``render`` (see movies.timing), and is
+    logged as one JSON line to the ``movies.timing`` logger.
+
+    Requests slower than MOVIES['TIMING_SLOW_MS'] are logged at WARNING
+    whether sampled or not, with their slowest
+    MOVIES['TIMING_SLOW_SQL_LIMIT'] statements. Unsampled requests get a
+    plain timer that counts their queries and keeps only those slowest
+    statements, since whether a request is slow is known only at the end.
+
+    With MOVIES['METRICS'] on, every request is also counted in the
+    movies.metrics histograms.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with self.timing_scope() as timer:
+            response = self.get_response(request)
+        return self.report(request, response, started, timer)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with self.timing_scope() as timer:
+            response = await self.get_response(request)
+        return self.report(request, response, started, timer)
+
+    def timing_scope(self):
+        return timing_scope(self.sampled(), keep=get_setting('TIMING_SLOW_SQL_LIMIT'))
+
+    def sampled(self):
+        rate = get_setting('TIMING_SAMPLE_RATE')
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def report(self, request, response, started, timer):
+        seconds = time.perf_counter() - started
+        if get_setting('METRICS'):
+            record_request(request, response, seconds, timer)
+        total = seconds * 1000
+        metrics = []
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total, 2),
+        }
+        if timer.detailed:
+            db = timer.db_time * 1000
+            metrics.append(f'db;dur={db:.2f};desc="{len(timer.queries)} queries"')
+            record.update(queries=len(timer.queries), db_ms=round(db, 2))
+            for name in (SERIALIZE, RENDER):
+                elapsed = timer.phases.get(name, 0.0) * 1000
+                metrics.append(f'{name};dur={elapsed:.2f}')
+                record[f'{name}_ms'] = round(elapsed, 2)
+        metrics.append(f'total;dur={total:.2f}')
+        response['Server-Timing'] = ', '.join(metrics)
+
+        slow = total >= get_setting('TIMING_SLOW_MS')
+        if slow:
+            record['slow'] = True
+            record['sql'] = [
+                {'db': alias, 'ms': round(seconds * 1000, 2), 'sql': sql, 'params': params}
+                for alias, sql, params, seconds
+                in timer.slowest_queries(get_setting('TIMING_SLOW_SQL_LIMIT'))
+            ]
+            logger.warning(json.dumps(record, default=str))
+        elif timer.detailed:
+            logger.info(json.dumps(record, default=str))
+        return response
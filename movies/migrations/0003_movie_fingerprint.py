@@ -0,0 +1,52 @@
+# Generated by Django 4.2 on 2026-10-17 06:52
+
+import hashlib
+
+from django.db import migrations, models
+
+
+# Frozen copy of movies.models.compute_fingerprint as of this migration
+FINGERPRINT_FIELDS = ('title', 'director', 'genre', 'year', 'rating', 'budget')
+
+
+def compute_fingerprint(values):
+    parts = []
+    for name in FINGERPRINT_FIELDS:
+        value = values.get(name)
+        if name == 'rating' and value is not None:
+            value = repr(float(value))
+        parts.append('' if value is None else str(value))
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def backfill_fingerprints(apps, schema_editor):
+    Movie = apps.get_model('movies', 'Movie')
+    movies = list(Movie.objects.using(schema_editor.connection.alias).only(*FINGERPRINT_FIELDS))
+    for movie in movies:
+        movie.fingerprint = compute_fingerprint(
+            {name: getattr(movie, name) for name in FINGERPRINT_FIELDS}
+        )
+    Movie.objects.using(schema_editor.connection.alias).bulk_update(
+        movies, ['fingerprint'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0002_stagedmovie'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-1 of the content fields, used by delta imports', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='stagedmovie',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-1 of the content fields, used by delta imports', max_length=40),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-17 06:54
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def delete_duplicate_movies(apps, schema_editor):
+    """
+    Keep the most recently inserted row for each duplicated (title, year).
+    """
+    Movie = apps.get_model('movies', 'Movie')
+    movies = Movie.objects.using(schema_editor.connection.alias)
+    duplicates = (
+        movies.values('title', 'year')
+        .annotate(rows=Count('id'), keep=Max('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for duplicate in duplicates:
+        movies.filter(title=duplicate['title'], year=duplicate['year']).exclude(
+            id=duplicate['keep']
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_movie_fingerprint'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_movies, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='movie',
+            constraint=models.UniqueConstraint(fields=('title', 'year'), name='movies_movie_title_year_uniq'),
+        ),
+    ]
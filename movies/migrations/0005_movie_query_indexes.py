@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-17 06:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0004_movie_natural_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['year', 'rating'], name='movies_year_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['rating', 'year'], name='movies_rating_year_idx'),
+        ),
+    ]
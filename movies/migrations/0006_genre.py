@@ -0,0 +1,93 @@
+# Generated by Django 4.2 on 2026-10-17 06:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Frozen copy of movies.models.split_genres as of this migration
+def split_genres(value):
+    names = []
+    seen = set()
+    for part in (value or '').split(','):
+        name = part.strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+def backfill_genres(apps, schema_editor):
+    """
+    Create Genre rows and links from each movie's comma-joined genre string.
+    """
+    alias = schema_editor.connection.alias
+    Movie = apps.get_model('movies', 'Movie')
+    Genre = apps.get_model('movies', 'Genre')
+    MovieGenre = apps.get_model('movies', 'MovieGenre')
+
+    rows = [
+        (pk, split_genres(genre))
+        for pk, genre in Movie.objects.using(alias).values_list('pk', 'genre').order_by()
+    ]
+    names = {}
+    for _, movie_genres in rows:
+        for name in movie_genres:
+            names.setdefault(name.lower(), name)
+
+    Genre.objects.using(alias).bulk_create(
+        [Genre(name=name, key=key) for key, name in names.items()]
+    )
+    genre_ids = dict(Genre.objects.using(alias).values_list('key', 'pk'))
+    MovieGenre.objects.using(alias).bulk_create(
+        [
+            MovieGenre(movie_id=pk, genre_id=genre_ids[name.lower()])
+            for pk, movie_genres in rows
+            for name in movie_genres
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0005_movie_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Genre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Genre name', max_length=100)),
+                ('key', models.CharField(editable=False, help_text='Lower-cased genre name', max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Genre',
+                'verbose_name_plural': 'Genres',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MovieGenre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genre', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='movie_links', to='movies.genre')),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='genre_links', to='movies.movie')),
+            ],
+            options={
+                'verbose_name': 'Movie genre',
+                'verbose_name_plural': 'Movie genres',
+            },
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='genres',
+            field=models.ManyToManyField(blank=True, help_text='Genres parsed from the genre field', related_name='movies', through='movies.MovieGenre', to='movies.genre'),
+        ),
+        migrations.AddConstraint(
+            model_name='moviegenre',
+            constraint=models.UniqueConstraint(fields=('genre', 'movie'), name='movies_moviegenre_genre_movie_uniq'),
+        ),
+        migrations.RunPython(backfill_genres, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-17 06:58
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def seed_catalog_state(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Movie = apps.get_model('movies', 'Movie')
+    CatalogState = apps.get_model('movies', 'CatalogState')
+    CatalogState.objects.using(alias).create(
+        name='movies',
+        row_count=Movie.objects.using(alias).count(),
+        version=1,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_genre'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogState',
+            fields=[
+                ('name', models.CharField(help_text='Collection name', max_length=50, primary_key=True, serialize=False)),
+                ('row_count', models.BigIntegerField(default=0, help_text='Number of rows in the collection')),
+                ('version', models.BigIntegerField(default=0, help_text='Incremented on every write')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Time of the last write')),
+            ],
+            options={
+                'verbose_name': 'Catalog state',
+                'verbose_name_plural': 'Catalog states',
+            },
+        ),
+        migrations.RunPython(seed_catalog_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-17 07:03
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    Movie = apps.get_model('movies', 'Movie')
+    Movie.objects.using(schema_editor.connection.alias).update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0007_catalogstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Last modification timestamp'),
+        ),
+        migrations.AddField(
+            model_name='stagedmovie',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Last modification timestamp'),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2 on 2026-10-17 07:20
+
+from django.db import migrations
+
+
+# Frozen copy of the FTS5 DDL in movies.search as of this migration
+FTS_TABLE = 'movies_movie_fts'
+
+SEARCH_INDEX_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"title, director, content='movies_movie', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON movies_movie BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, director) "
+    f"VALUES (new.id, new.title, new.director); END",
+
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON movies_movie BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, director) "
+    f"VALUES ('delete', old.id, old.title, old.director); END",
+
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, director "
+    f"ON movies_movie BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, director) "
+    f"VALUES ('delete', old.id, old.title, old.director); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, director) "
+    f"VALUES (new.id, new.title, new.director); END",
+
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+TRIGGERS = (f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au')
+
+
+def fts5_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def create_search_index(apps, schema_editor):
+    # No-op on backends without FTS5; search falls back to LIKE there
+    if not fts5_supported(schema_editor.connection):
+        return
+    for statement in SEARCH_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for trigger in TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_movie_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
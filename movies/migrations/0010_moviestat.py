@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-17 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0009_movie_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('genre', 'Genre'), ('year', 'Year'), ('decade', 'Decade'), ('director', 'Director')], help_text='Grouping dimension', max_length=10)),
+                ('key', models.CharField(help_text='Group value', max_length=200)),
+                ('count', models.BigIntegerField(default=0)),
+                ('rating_sum', models.FloatField(default=0)),
+                ('rating_min', models.FloatField(null=True)),
+                ('rating_max', models.FloatField(null=True)),
+                ('budget_sum', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['dimension', 'key'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='moviestat',
+            constraint=models.UniqueConstraint(fields=('dimension', 'key'), name='movies_moviestat_dimension_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2 on 2026-10-17 07:40
+
+from django.db import migrations
+
+
+# (index name, column); the expressions match Django's icontains SQL,
+# UPPER("column"::text) LIKE UPPER(%s). Genre filters use the MovieGenre
+# links, so genre gets no index.
+TRIGRAM_INDEXES = (
+    ('movies_movie_title_trgm', 'title'),
+    ('movies_movie_director_trgm', 'director'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # PostgreSQL only, and only when the server ships pg_trgm; otherwise
+    # icontains keeps scanning
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON movies_movie '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0010_moviestat'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, remove_trigram_indexes),
+    ]
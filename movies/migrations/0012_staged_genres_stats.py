@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-17 08:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0011_movie_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StagedMovieStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('genre', 'Genre'), ('year', 'Year'), ('decade', 'Decade'), ('director', 'Director')], help_text='Grouping dimension', max_length=10)),
+                ('key', models.CharField(help_text='Group value', max_length=200)),
+                ('count', models.BigIntegerField(default=0)),
+                ('rating_sum', models.FloatField(default=0)),
+                ('rating_min', models.FloatField(null=True)),
+                ('rating_max', models.FloatField(null=True)),
+                ('budget_sum', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Staged movie stat',
+                'verbose_name_plural': 'Staged movie stats',
+                'db_table': 'movies_moviestat_staging',
+            },
+        ),
+        migrations.CreateModel(
+            name='StagedMovieGenre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genre', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='movies.genre')),
+                ('movie', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='movies.stagedmovie')),
+            ],
+            options={
+                'verbose_name': 'Staged movie genre',
+                'verbose_name_plural': 'Staged movie genres',
+                'db_table': 'movies_moviegenre_staging',
+            },
+        ),
+    ]
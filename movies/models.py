@@ -1,22 +1,345 @@
 """
 Movie model with field validation.
 """
-from django.db import models
+import hashlib
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models import (
+    Count, Exists, ExpressionWrapper, F, IntegerField, Max, Min, OuterRef, Q, Sum,
+)
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
-class Movie(models.Model):
+# Content fields covered by the row fingerprint, in hashing order.
+FINGERPRINT_FIELDS = ('title', 'director', 'genre', 'year', 'rating', 'budget')
+
+
+def compute_fingerprint(values):
     """
-    Movie model representing a film with its metadata.
+    Return a stable SHA-1 hex digest of a movie's content fields.
 
-    Fields:
-        title: Movie title (required)
-        director: Director name (required)
-        genre: Movie genre (required)
-        year: Release year (1800-2100)
-        rating: Movie rating (0-10)
-        budget: Production budget (optional)
-        created_at: Timestamp of record creation
+    ``values`` is a mapping of field name to value. Used by the delta
+    importer to detect changed rows without comparing every column.
+    """
+    parts = []
+    for name in FINGERPRINT_FIELDS:
+        value = values.get(name)
+        if name == 'rating' and value is not None:
+            value = repr(float(value))
+        parts.append('' if value is None else str(value))
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def split_genres(value):
+    """
+    Return the distinct genre names in a comma-joined genre string.
+
+    "Action,Adventure,Sci-Fi" -> ["Action", "Adventure", "Sci-Fi"]
+    """
+    names = []
+    seen = set()
+    for part in (value or '').split(','):
+        name = part.strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+# The movie id and the fields the catalog statistics depend on
+STAT_FIELDS = ('id', 'genre', 'year', 'director', 'rating', 'budget')
+
+
+def stat_values(movie):
+    return {name: getattr(movie, name) for name in STAT_FIELDS}
+
+
+_bookkeeping = threading.local()
+
+# Sent after a bulk write (per-row signals were suspended), once
+# CatalogState is up to date. Arguments: name, using and stats_current
+# (the writer already brought MovieStat up to date).
+catalog_refreshed = Signal()
+
+
+def bookkeeping_suspended():
+    """
+    Return True inside a bulk_catalog_write() block on this thread.
+    """
+    return getattr(_bookkeeping, 'depth', 0) > 0
+
+
+class BulkWrite:
+    """
+    Handle yielded by bulk_catalog_write(); clear ``changed`` to skip the
+    recount when the block turned out to write nothing.
+
+    A writer that reports every movie it changes through stats_changed()
+    gets its summary rows adjusted instead of rebuilt. Reports in a nested
+    block are ignored (and lazy querysets passed in never run): the
+    outermost block decides.
+    """
+
+    def __init__(self, outermost=True):
+        self.changed = True
+        self.outermost = outermost
+        self.removed = None
+        self.added = None
+
+    def stats_changed(self, removed=(), added=()):
+        """
+        Record stat_values() of movies before (``removed``) and after
+        (``added``) the write; read ``removed`` before writing.
+        """
+        if not self.outermost:
+            return
+        if self.removed is None:
+            self.removed, self.added = [], []
+        self.removed += list(removed)
+        self.added += list(added)
+
+
+@contextmanager
+def bulk_catalog_write(using=DEFAULT_DB_ALIAS):
+    """
+    Skip per-row catalog bookkeeping inside the block.
+
+    Bulk writers (importers, upserts) wrap their work in this and the
+    catalog is recounted once on a clean exit, or adjusted by the changes
+    the writer reported (see BulkWrite). Use it inside the writer's
+    transaction so the recount commits with the data.
+    """
+    write = BulkWrite(outermost=not bookkeeping_suspended())
+    _bookkeeping.depth = getattr(_bookkeeping, 'depth', 0) + 1
+    try:
+        yield write
+    except BaseException:
+        _bookkeeping.depth -= 1
+        raise
+    _bookkeeping.depth -= 1
+    if write.changed and write.outermost:
+        if write.removed is None:
+            CatalogState.objects.db_manager(using).refresh()
+        else:
+            # Every change is known: no recount or rebuild needed
+            MovieStat.objects.db_manager(using).apply_changes(write.removed, write.added)
+            CatalogState.objects.db_manager(using).record_write(
+                delta=len(write.added) - len(write.removed),
+            )
+            catalog_refreshed.send(
+                sender=CatalogState, name=CatalogState.MOVIES, using=using, stats_current=True,
+            )
+
+
+class MovieQuerySet(models.QuerySet):
+    """
+    QuerySet with bulk operations keyed on the (title, year) natural key.
+    """
+
+    # Natural key and the columns rewritten when an upsert hits a conflict
+    NATURAL_KEY = ['title', 'year']
+    UPSERT_FIELDS = ['director', 'genre', 'rating', 'budget', 'fingerprint', 'updated_at']
+
+    def upsert(self, objs, batch_size=None):
+        """
+        Insert movies, updating existing ones with the same (title, year).
+
+        Runs ``INSERT ... ON CONFLICT (title, year) DO UPDATE`` in batches.
+        When ``objs`` repeats a natural key, the last occurrence wins.
+        Returns the list of movies written.
+        """
+        unique = {}
+        for obj in objs:
+            obj.fingerprint = obj.compute_fingerprint()
+            unique[(obj.title, obj.year)] = obj
+        movies = list(unique.values())
+        if not movies:
+            return []
+
+        with bulk_catalog_write(using=self.db) as write:
+            write.stats_changed(removed=self._existing_stat_values(movies), added=map(stat_values, movies))
+            written = self.bulk_create(
+                movies,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=self.NATURAL_KEY,
+                update_fields=self.UPSERT_FIELDS,
+            )
+            self._link_genres(movies)
+        return written
+
+    def bulk_insert(self, objs, batch_size=None):
+        """
+        Insert new movies with batched INSERTs and link their genres.
+
+        Unlike upsert(), an existing (title, year) raises IntegrityError.
+        Returns the movies with primary keys set.
+        """
+        for obj in objs:
+            obj.fingerprint = obj.compute_fingerprint()
+        if not objs:
+            return []
+
+        with bulk_catalog_write(using=self.db) as write:
+            write.stats_changed(added=map(stat_values, objs))
+            movies = self.bulk_create(objs, batch_size=batch_size)
+            if all(movie.pk is not None for movie in movies):
+                MovieGenre.objects.db_manager(self.db).replace_links(
+                    (movie.pk, movie.genre) for movie in movies
+                )
+            else:
+                self._link_genres(movies)
+        return movies
+
+    def bulk_edit(self, objs, fields, batch_size=None):
+        """
+        Write ``fields`` of existing movies with batched UPDATEs.
+
+        Keeps fingerprint, updated_at and genre links in step, which
+        plain ``bulk_update`` would skip.
+        """
+        if not objs:
+            return 0
+        now = timezone.now()
+        for obj in objs:
+            obj.fingerprint = obj.compute_fingerprint()
+            obj.updated_at = now
+        fields = list(dict.fromkeys(list(fields) + ['fingerprint', 'updated_at']))
+
+        with bulk_catalog_write(using=self.db) as write:
+            write.stats_changed(
+                removed=self.filter(pk__in=[obj.pk for obj in objs]).values(*STAT_FIELDS),
+                added=map(stat_values, objs),
+            )
+            updated = self.bulk_update(objs, fields, batch_size=batch_size)
+            if 'genre' in fields:
+                MovieGenre.objects.db_manager(self.db).replace_links(
+                    (obj.pk, obj.genre) for obj in objs
+                )
+        return updated
+
+    def with_genre(self, name):
+        """
+        Filter to movies tagged with genre ``name`` (case-insensitive).
+
+        Uses an EXISTS probe on the (genre, movie) index instead of a
+        LIKE scan over the comma-joined genre column.
+        """
+        return self.filter(Exists(
+            MovieGenre.objects.filter(
+                movie=OuterRef('pk'),
+                genre__key=name.strip().lower(),
+            )
+        ))
+
+    def _existing_stat_values(self, movies, chunk_size=500):
+        # stat_values() of the stored movies sharing a natural key with ``movies``
+        keys = {(movie.title, movie.year) for movie in movies}
+        titles = sorted({movie.title for movie in movies})
+        for start in range(0, len(titles), chunk_size):
+            rows = self.filter(title__in=titles[start:start + chunk_size]).values(
+                'title', *STAT_FIELDS
+            ).order_by()
+            for row in rows:
+                if (row.pop('title'), row['year']) in keys:
+                    yield row
+
+    def _link_genres(self, movies, chunk_size=500):
+        # bulk_create does not return primary keys for upserts on every
+        # backend, so look the written rows up again by natural key.
+        keys = {(movie.title, movie.year) for movie in movies}
+        titles = sorted({movie.title for movie in movies})
+        links = MovieGenre.objects.db_manager(self.db)
+        for start in range(0, len(titles), chunk_size):
+            rows = self.filter(title__in=titles[start:start + chunk_size]).values_list(
+                'pk', 'title', 'year', 'genre'
+            ).order_by()
+            links.replace_links(
+                (pk, genre) for pk, title, year, genre in rows if (title, year) in keys
+            )
+
+
+class GenreQuerySet(models.QuerySet):
+    """
+    QuerySet for resolving genre names to Genre rows.
+    """
+
+    def resolve(self, names):
+        """
+        Return ``{key: genre_id}`` for ``names``, creating missing genres.
+        """
+        wanted = {}
+        for name in names:
+            wanted.setdefault(name.lower(), name)
+        if not wanted:
+            return {}
+
+        found = dict(self.filter(key__in=wanted).values_list('key', 'pk').order_by())
+        missing = [
+            Genre(name=name, key=key)
+            for key, name in wanted.items() if key not in found
+        ]
+        if missing:
+            self.bulk_create(missing, ignore_conflicts=True)
+            found.update(
+                self.filter(key__in=[genre.key for genre in missing]).values_list('key', 'pk').order_by()
+            )
+        return found
+
+
+class MovieGenreQuerySet(models.QuerySet):
+    """
+    QuerySet for maintaining movie/genre links in bulk.
+    """
+
+    def link_pairs(self, rows):
+        """
+        Return ``(movie_id, genre_id)`` pairs for ``(movie_id, genre_string)``
+        rows, creating missing genres.
+        """
+        rows = [(movie_id, split_genres(genre)) for movie_id, genre in rows]
+        genre_ids = Genre.objects.db_manager(self.db).resolve(
+            name for _, names in rows for name in names
+        )
+        return [
+            (movie_id, genre_ids[name.lower()])
+            for movie_id, names in rows
+            for name in names
+        ]
+
+    def build_links(self, rows):
+        """
+        Return unsaved MovieGenre links for ``(movie_id, genre_string)`` rows.
+        """
+        return [
+            MovieGenre(movie_id=movie_id, genre_id=genre_id)
+            for movie_id, genre_id in self.link_pairs(rows)
+        ]
+
+    def replace_links(self, rows, batch_size=1000):
+        """
+        Rebuild the links of each ``(movie_id, genre_string)`` row.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        links = self.build_links(rows)
+        movie_ids = [movie_id for movie_id, _ in rows]
+        for start in range(0, len(movie_ids), batch_size):
+            self.filter(movie_id__in=movie_ids[start:start + batch_size]).delete()
+        self.bulk_create(links, batch_size=batch_size)
+
+
+
+class MovieFields(models.Model):
+    """
+    Abstract base holding the Movie columns, shared with the staging table.
     """
     title = models.CharField(
         max_length=200,
@@ -53,11 +376,617 @@ class Movie(models.Model):
         auto_now_add=True,
         help_text="Record creation timestamp"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last modification timestamp"
+    )
+    fingerprint = models.CharField(
+        max_length=40,
+        blank=True,
+        editable=False,
+        help_text="SHA-1 of the content fields, used by delta imports"
+    )
+
+    class Meta:
+        abstract = True
+
+    def compute_fingerprint(self):
+        return compute_fingerprint(
+            {name: getattr(self, name) for name in FINGERPRINT_FIELDS}
+        )
+
+    def save(self, *args, **kwargs):
+        self.fingerprint = self.compute_fingerprint()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            missing = [name for name in ('fingerprint', 'updated_at') if name not in update_fields]
+            kwargs['update_fields'] = list(update_fields) + missing
+        super().save(*args, **kwargs)
+
+
+class Genre(models.Model):
+    """
+    Normalized genre shared by many movies.
+
+    Fields:
+        name: Display name as first imported (e.g. "Sci-Fi")
+        key: Lower-cased name used for case-insensitive lookups (unique)
+    """
+    name = models.CharField(
+        max_length=100,
+        help_text="Genre name"
+    )
+    key = models.CharField(
+        max_length=100,
+        unique=True,
+        editable=False,
+        help_text="Lower-cased genre name"
+    )
+
+    objects = GenreQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Genre'
+        verbose_name_plural = 'Genres'
+
+    def save(self, *args, **kwargs):
+        self.key = self.name.strip().lower()
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.name
+
+
+class Movie(MovieFields):
+    """
+    Movie model representing a film with its metadata.
+
+    Fields:
+        title: Movie title (required)
+        director: Director name (required)
+        genre: Movie genre (required)
+        year: Release year (1800-2100)
+        rating: Movie rating (0-10)
+        budget: Production budget (optional)
+        created_at: Timestamp of record creation
+        fingerprint: Hash of the content fields (maintained on save)
+        genres: Normalized genres parsed from ``genre`` (maintained on save)
+
+    (title, year) is the natural key and is unique.
+    """
+    genres = models.ManyToManyField(
+        Genre,
+        through='MovieGenre',
+        related_name='movies',
+        blank=True,
+        help_text="Genres parsed from the genre field"
+    )
+
+    objects = MovieQuerySet.as_manager()
 
     class Meta:
         ordering = ['-year', '-rating']
         verbose_name = 'Movie'
         verbose_name_plural = 'Movies'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'year'],
+                name='movies_movie_title_year_uniq',
+            ),
+        ]
+        indexes = [
+            # Default list ordering (-year, -rating) and top-rated ?year=
+            # filters (year equality, rating range, ordered by rating).
+            models.Index(fields=['year', 'rating'], name='movies_year_rating_idx'),
+            # Top-rated: rating >= x ORDER BY -rating, -year
+            models.Index(fields=['rating', 'year'], name='movies_rating_year_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'genre' in update_fields:
+            MovieGenre.objects.db_manager(self._state.db).replace_links(
+                [(self.pk, self.genre)]
+            )
+
+    def __str__(self):
+        return f"{self.title} ({self.year})"
+
+
+class MovieGenre(models.Model):
+    """
+    Link between a movie and one of its genres.
+
+    The unique (genre, movie) index makes "movies in genre X" an index
+    range scan and "is movie M in genre X" a single index probe.
+    """
+    movie = models.ForeignKey(
+        Movie,
+        on_delete=models.CASCADE,
+        related_name='genre_links'
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        related_name='movie_links',
+        db_index=False
+    )
+
+    objects = MovieGenreQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Movie genre'
+        verbose_name_plural = 'Movie genres'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['genre', 'movie'],
+                name='movies_moviegenre_genre_movie_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.movie_id} -> {self.genre_id}"
+
+
+class StagedMovie(MovieFields):
+    """
+    Staging copy of the Movie table used for atomic catalog reloads.
+
+    Importers fill this table first and swap its contents into Movie in a
+    single short transaction, so readers never see a partial catalog.
+    """
+
+    class Meta:
+        db_table = 'movies_movie_staging'
+        verbose_name = 'Staged movie'
+        verbose_name_plural = 'Staged movies'
 
     def __str__(self):
         return f"{self.title} ({self.year})"
+
+
+class StagedMovieGenre(models.Model):
+    """
+    Genre links of the staged movies, built before the swap.
+
+    No constraints or indexes: the table is only filled, copied and emptied.
+    """
+    movie = models.ForeignKey(
+        StagedMovie,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+
+    class Meta:
+        db_table = 'movies_moviegenre_staging'
+        verbose_name = 'Staged movie genre'
+        verbose_name_plural = 'Staged movie genres'
+
+    def __str__(self):
+        return f"{self.movie_id} -> {self.genre_id}"
+
+
+class CatalogStateQuerySet(models.QuerySet):
+    """
+    QuerySet for reading and maintaining catalog-wide counters.
+    """
+
+    def current(self, name=None):
+        """
+        Return the CatalogState row for ``name``, creating it if missing.
+        """
+        name = name or CatalogState.MOVIES
+        try:
+            return self.get(name=name)
+        except CatalogState.DoesNotExist:
+            self.refresh(name)
+            return self.get(name=name)
+
+    async def acurrent(self, name=None):
+        """
+        Async version of current().
+        """
+        name = name or CatalogState.MOVIES
+        try:
+            return await self.aget(name=name)
+        except CatalogState.DoesNotExist:
+            await sync_to_async(self.refresh)(name)
+            return await self.aget(name=name)
+
+    def record_write(self, delta=0, name=None):
+        """
+        Bump the catalog version and adjust the row count by ``delta``.
+        """
+        name = name or CatalogState.MOVIES
+        updated = self.filter(name=name).update(
+            row_count=F('row_count') + delta,
+            version=F('version') + 1,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            self.refresh(name)
+
+    def refresh(self, name=None, stats_current=False):
+        """
+        Recount the catalog and bump its version (used after bulk writes).
+        """
+        name = name or CatalogState.MOVIES
+        row_count = Movie.objects.db_manager(self.db).count()
+        updated = self.filter(name=name).update(
+            row_count=row_count,
+            version=F('version') + 1,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            self.create(name=name, row_count=row_count, version=1)
+        catalog_refreshed.send(
+            sender=CatalogState, name=name, using=self.db, stats_current=stats_current,
+        )
+
+
+class CatalogState(models.Model):
+    """
+    Maintained counters for a collection, read instead of scanning it.
+
+    Fields:
+        name: Collection name (primary key)
+        row_count: Number of rows, maintained on every write
+        version: Incremented on every write; cache keys include it
+        updated_at: Time of the last write
+    """
+    MOVIES = 'movies'
+
+    name = models.CharField(
+        max_length=50,
+        primary_key=True,
+        help_text="Collection name"
+    )
+    row_count = models.BigIntegerField(
+        default=0,
+        help_text="Number of rows in the collection"
+    )
+    version = models.BigIntegerField(
+        default=0,
+        help_text="Incremented on every write"
+    )
+    updated_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Time of the last write"
+    )
+
+    objects = CatalogStateQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Catalog state'
+        verbose_name_plural = 'Catalog states'
+
+    @property
+    def cache_token(self):
+        """
+        Token that changes on every write, for use in cache keys.
+        """
+        return f'{self.version}.{self.updated_at.timestamp():.6f}'
+
+    def __str__(self):
+        return f"{self.name} v{self.version} ({self.row_count} rows)"
+
+
+class MovieStatQuerySet(models.QuerySet):
+    """
+    QuerySet maintaining the per-group summary rows.
+    """
+
+    def groups(self, values):
+        """
+        Return the (dimension, key) groups of a movie's field ``values``.
+        """
+        groups = [(MovieStat.GENRE, name.lower()) for name in split_genres(values['genre'])]
+        groups += [
+            (MovieStat.YEAR, str(values['year'])),
+            (MovieStat.DECADE, MovieStat.decade_key(values['year'])),
+            (MovieStat.DIRECTOR, values['director']),
+        ]
+        return groups
+
+    def apply_changes(self, removed=(), added=()):
+        """
+        Adjust the running totals for movies written since they were counted.
+
+        ``removed`` and ``added`` hold stat_values() of the movies before
+        and after the write: a created movie is only added, a deleted one
+        only removed, an updated one both. Call it after the write. The
+        statements do not grow with the number of groups touched: one
+        upsert adds the deltas, one delete drops emptied groups, and the
+        groups whose minimum or maximum may have been a removed rating
+        are re-aggregated with one query per dimension, leaving out the
+        changed movies and folding in their new ratings.
+        """
+        deltas = {}
+        for sign, rows in ((-1, removed), (1, added)):
+            for values in rows:
+                rating = values['rating']
+                for group in self.groups(values):
+                    delta = deltas.setdefault(group, {
+                        'count': 0, 'rating_sum': 0.0, 'budget_sum': 0, -1: [], 1: [],
+                    })
+                    delta['count'] += sign
+                    delta['rating_sum'] += sign * rating
+                    delta['budget_sum'] += sign * (values['budget'] or 0)
+                    delta[sign].append(rating)
+        if not deltas:
+            return
+
+        totals = self._add_deltas(deltas)
+        empty = [group for group, (count, _, _) in totals.items() if count <= 0]
+        if empty:
+            self.filter(self.groups_filter(empty)).delete()
+        stale = [
+            group for group, (count, rating_min, rating_max) in totals.items()
+            if count > 0 and deltas[group][-1]
+            and (min(deltas[group][-1]) <= rating_min or max(deltas[group][-1]) >= rating_max)
+        ]
+        if stale:
+            self._reaggregate_extremes(stale, deltas, [values['id'] for values in removed])
+
+    def _add_deltas(self, deltas):
+        """
+        Upsert the count, sum and new-rating extremes of each group and
+        return ``{group: (count, rating_min, rating_max)}`` after the write.
+        """
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        table = quote(MovieStat._meta.db_table)
+        least, greatest = ('MIN', 'MAX') if connection.vendor == 'sqlite' else ('LEAST', 'GREATEST')
+        columns = ['dimension', 'key', 'count', 'rating_sum', 'rating_min', 'rating_max', 'budget_sum']
+        updates = [f'{quote(name)} = {table}.{quote(name)} + excluded.{quote(name)}'
+                   for name in ('count', 'rating_sum', 'budget_sum')]
+        # A removal-only delta carries NULL extremes; keep the stored ones
+        updates += [
+            f'{quote(name)} = COALESCE({function}({table}.{quote(name)}, excluded.{quote(name)}), '
+            f'{table}.{quote(name)}, excluded.{quote(name)})'
+            for name, function in (('rating_min', least), ('rating_max', greatest))
+        ]
+        returning = connection.features.can_return_rows_from_bulk_insert
+        rows = [
+            (dimension, key, delta['count'], delta['rating_sum'],
+             min(delta[1], default=None), max(delta[1], default=None), delta['budget_sum'])
+            for (dimension, key), delta in deltas.items()
+        ]
+        totals = {}
+        batch_size = connection.ops.bulk_batch_size(columns, rows)
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                placeholders = ', '.join(['(' + ', '.join(['%s'] * len(columns)) + ')'] * len(batch))
+                cursor.execute(
+                    f'INSERT INTO {table} ({", ".join(map(quote, columns))}) VALUES {placeholders} '
+                    f'ON CONFLICT ({quote("dimension")}, {quote("key")}) DO UPDATE SET {", ".join(updates)}'
+                    + (f' RETURNING {quote("dimension")}, {quote("key")}, {quote("count")}, '
+                       f'{quote("rating_min")}, {quote("rating_max")}' if returning else ''),
+                    [value for row in batch for value in row],
+                )
+                if returning:
+                    totals.update(((row[0], row[1]), row[2:]) for row in cursor.fetchall())
+        if not returning:
+            rows = self.filter(self.groups_filter(deltas)).values_list(
+                'dimension', 'key', 'count', 'rating_min', 'rating_max'
+            ).order_by()
+            totals = {(row[0], row[1]): row[2:] for row in rows}
+        return totals
+
+    def _reaggregate_extremes(self, groups, deltas, movie_ids):
+        keys = defaultdict(list)
+        for dimension, key in groups:
+            keys[dimension].append(key)
+        extremes = {}
+        for dimension, dimension_keys in keys.items():
+            for row in self.aggregate_groups(dimension, dimension_keys, exclude_movies=movie_ids):
+                key = row['group']
+                if dimension == MovieStat.DECADE:
+                    key = MovieStat.decade_key(key)
+                extremes[(dimension, str(key))] = (row['rating_min'], row['rating_max'])
+        stats = []
+        for group in groups:
+            rest_min, rest_max = extremes.get(group, (None, None))
+            added = deltas[group][1]
+            stats.append(MovieStat(
+                dimension=group[0], key=group[1],
+                rating_min=min([rating for rating in [rest_min] + added if rating is not None]),
+                rating_max=max([rating for rating in [rest_max] + added if rating is not None]),
+            ))
+        self.bulk_create(
+            stats, update_conflicts=True,
+            unique_fields=['dimension', 'key'], update_fields=['rating_min', 'rating_max'],
+        )
+
+    @staticmethod
+    def groups_filter(groups):
+        """
+        Return a Q selecting the summary rows of ``(dimension, key)`` groups.
+        """
+        keys = defaultdict(list)
+        for dimension, key in groups:
+            keys[dimension].append(key)
+        condition = Q()
+        for dimension, dimension_keys in keys.items():
+            condition |= Q(dimension=dimension, key__in=dimension_keys)
+        return condition
+
+    def aggregate_groups(self, dimension, keys=None, exclude_movies=(), staged=False):
+        """
+        Return ``values()`` rows aggregating the catalog by ``dimension``,
+        optionally limited to the groups ``keys`` and leaving some movies out.
+
+        With ``staged=True`` the staged catalog is aggregated instead.
+        """
+        movies, links = (StagedMovie, StagedMovieGenre) if staged else (Movie, MovieGenre)
+        if dimension == MovieStat.GENRE:
+            # Genre groups aggregate over the links
+            path = 'movie__'
+            rows = links._default_manager.db_manager(self.db).order_by()
+            if keys is not None:
+                rows = rows.filter(genre__key__in=keys)
+            if exclude_movies:
+                rows = rows.exclude(movie_id__in=exclude_movies)
+            rows = rows.values(group=F('genre__key'))
+        else:
+            path = ''
+            rows = movies._default_manager.db_manager(self.db).order_by()
+            if keys is not None:
+                condition = Q()
+                for key in keys:
+                    condition |= Q(**MovieStat.key_filter(dimension, key))
+                rows = rows.filter(condition)
+            if exclude_movies:
+                rows = rows.exclude(pk__in=exclude_movies)
+            rows = rows.values(group={
+                MovieStat.YEAR: F('year'),
+                MovieStat.DECADE: ExpressionWrapper(F('year') / 10 * 10, output_field=IntegerField()),
+                MovieStat.DIRECTOR: F('director'),
+            }[dimension])
+        return rows.annotate(
+            count=Count('pk'),
+            rating_sum=Sum(f'{path}rating'),
+            rating_min=Min(f'{path}rating'),
+            rating_max=Max(f'{path}rating'),
+            budget_sum=Coalesce(Sum(f'{path}budget'), 0),
+        )
+
+    def compute(self, staged=False):
+        """
+        Return unsaved summary rows computed with GROUP BY queries, as
+        MovieStat or, with ``staged=True``, StagedMovieStat rows of the
+        staged catalog.
+        """
+        model = StagedMovieStat if staged else MovieStat
+        stats = []
+        for dimension, _ in MovieStat.DIMENSIONS:
+            for row in self.aggregate_groups(dimension, staged=staged):
+                key = row['group']
+                if dimension == MovieStat.DECADE:
+                    key = MovieStat.decade_key(key)
+                stats.append(model(
+                    dimension=dimension, key=str(key), count=row['count'],
+                    rating_sum=row['rating_sum'], rating_min=row['rating_min'],
+                    rating_max=row['rating_max'], budget_sum=row['budget_sum'],
+                ))
+        return stats
+
+    def rebuild(self):
+        """
+        Recompute every summary row from the catalog.
+
+        Returns the number of rows written.
+        """
+        stats = self.compute()
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            self.bulk_create(stats, batch_size=1000)
+        return len(stats)
+
+
+class MovieStatFields(models.Model):
+    """
+    Abstract base holding the MovieStat columns, shared with its staging table.
+    """
+    GENRE = 'genre'
+    YEAR = 'year'
+    DECADE = 'decade'
+    DIRECTOR = 'director'
+    DIMENSIONS = [
+        (GENRE, 'Genre'),
+        (YEAR, 'Year'),
+        (DECADE, 'Decade'),
+        (DIRECTOR, 'Director'),
+    ]
+
+    dimension = models.CharField(
+        max_length=10,
+        choices=DIMENSIONS,
+        help_text="Grouping dimension"
+    )
+    key = models.CharField(
+        max_length=200,
+        help_text="Group value"
+    )
+    count = models.BigIntegerField(default=0)
+    rating_sum = models.FloatField(default=0)
+    rating_min = models.FloatField(null=True)
+    rating_max = models.FloatField(null=True)
+    budget_sum = models.BigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class MovieStat(MovieStatFields):
+    """
+    Materialized aggregate of the catalog for one group.
+
+    Kept up to date incrementally on every Movie write, including the bulk
+    and upsert endpoints, and rebuilt in full after catalog imports or by
+    ``manage.py rebuild_stats``.
+
+    Fields:
+        dimension: genre, year, decade or director
+        key: Group value (lower-cased genre, "1994", "1990s", director name)
+        count: Number of movies in the group
+        rating_sum: Sum of ratings (average = rating_sum / count)
+        rating_min / rating_max: Rating extremes
+        budget_sum: Total budget of movies with a known budget
+    """
+    objects = MovieStatQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['dimension', 'key']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dimension', 'key'],
+                name='movies_moviestat_dimension_key_uniq',
+            ),
+        ]
+
+    @staticmethod
+    def decade_key(year):
+        return f'{year // 10 * 10}s'
+
+    @staticmethod
+    def key_filter(dimension, key):
+        """
+        Return Movie filter kwargs selecting the movies of one group.
+        """
+        if dimension == MovieStat.YEAR:
+            return {'year': int(key)}
+        if dimension == MovieStat.DECADE:
+            start = int(key.rstrip('s'))
+            return {'year__gte': start, 'year__lt': start + 10}
+        return {'director': key}
+
+    @property
+    def rating_avg(self):
+        return self.rating_sum / self.count if self.count else None
+
+    def __str__(self):
+        return f"{self.dimension}={self.key} ({self.count} movies)"
+
+
+class StagedMovieStat(MovieStatFields):
+    """
+    Summary rows of the staged catalog, computed before the swap.
+    """
+
+    class Meta:
+        db_table = 'movies_moviestat_staging'
+        verbose_name = 'Staged movie stat'
+        verbose_name_plural = 'Staged movie stats'
@@ -0,0 +1,352 @@
+"""
+Pagination for the Movie API.
+
+Page-number pagination stays the default. Clients can opt in to keyset
+(cursor) pagination with ``?pagination=cursor``. Each page then continues
+from the last row seen instead of using OFFSET, so deep pages cost the same
+as the first one and concurrent inserts do not shift page contents.
+
+Page-number responses take their ``count`` from a count strategy (see
+movies.counts), selectable with ``?count=exact|estimate|none``.
+
+The ``apaginate_*`` methods are async versions for the ASGI read views;
+they fetch the count and the page up front, since nothing may hit the
+database lazily from async code.
+"""
+import base64
+import json
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.core.paginator import EmptyPage, InvalidPage, Page, PageNotAnInteger
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .conf import get_setting
+from .counts import COUNT_MODES, ESTIMATE, EXACT, NONE, acount_queryset, count_queryset
+
+
+class ForwardPage(Page):
+    """
+    Page whose has_next() comes from fetching one extra row, not a count.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountedPaginator(DjangoPaginator):
+    """
+    Django paginator whose count comes from a count strategy.
+
+    In ``estimate`` and ``none`` modes pages are fetched forward-only
+    (page_size + 1 rows), so the page itself never needs the count.
+    """
+
+    def __init__(self, object_list, per_page, count_mode=EXACT, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_mode = count_mode
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        mode = EXACT if self.count_mode == NONE else self.count_mode
+        count, self.count_is_estimate = count_queryset(self.object_list, mode)
+        return count
+
+    def validate_number(self, number):
+        if self.count_mode == EXACT:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        if self.count_mode == EXACT:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return self.forward_page(rows, number)
+
+    async def acount(self):
+        """
+        Fetch the count ahead of time, so ``count`` never queries.
+        """
+        mode = EXACT if self.count_mode == NONE else self.count_mode
+        self.__dict__['count'], self.count_is_estimate = await acount_queryset(self.object_list, mode)
+
+    async def apage(self, number):
+        """
+        Async version of page(); in ``exact`` mode call acount() first.
+        """
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        if self.count_mode == EXACT:
+            top = min(bottom + self.per_page, self.count)
+            rows = [row async for row in self.object_list[bottom:top]]
+            return self._get_page(rows, number, self)
+        rows = [row async for row in self.object_list[bottom:bottom + self.per_page + 1]]
+        return self.forward_page(rows, number)
+
+    def forward_page(self, rows, number):
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return ForwardPage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+
+
+class MoviePagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset mode.
+
+    Views opt in per action through a ``keyset_orderings`` mapping of
+    action name to a unique ordering, e.g. ``('-year', '-rating', '-id')``.
+    """
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_ordering = self.get_keyset_ordering(request, view)
+        if self.keyset_ordering is None:
+            return self.paginate_page_number(queryset, request)
+        return self.paginate_keyset(queryset, request)
+
+    def get_paginated_response(self, data):
+        if self.keyset_ordering is None:
+            fields = []
+            if self.count_mode != NONE:
+                fields.append(('count', self.page.paginator.count))
+                if self.count_mode == ESTIMATE:
+                    fields.append(('count_is_estimate', self.page.paginator.count_is_estimate))
+        else:
+            fields = []
+        return Response(OrderedDict(fields + [
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param) or get_setting('PAGINATION_COUNT')
+        if mode not in COUNT_MODES:
+            raise ValidationError(
+                {self.count_query_param: f'Must be one of: {", ".join(COUNT_MODES)}'}
+            )
+        return mode
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async version of paginate_queryset().
+        """
+        self.keyset_ordering = self.get_keyset_ordering(request, view)
+        if self.keyset_ordering is None:
+            return await self.apaginate_page_number(queryset, request)
+        return await self.apaginate_keyset(queryset, request)
+
+    def paginate_page_number(self, queryset, request):
+        """
+        PageNumberPagination.paginate_queryset() using a count strategy.
+        """
+        paginator = self.get_paginator(queryset, request)
+        if paginator is None:
+            return None
+        page_number = self.get_page_number(request, paginator)
+        with self.page_not_found(page_number):
+            self.page = paginator.page(page_number)
+        return self.page_rows_for(paginator, request)
+
+    async def apaginate_page_number(self, queryset, request):
+        paginator = self.get_paginator(queryset, request)
+        if paginator is None:
+            return None
+        if self.count_mode != NONE:
+            await paginator.acount()
+        page_number = self.get_page_number(request, paginator)
+        with self.page_not_found(page_number):
+            self.page = await paginator.apage(page_number)
+        return self.page_rows_for(paginator, request)
+
+    def get_paginator(self, queryset, request):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.count_mode = self.get_count_mode(request)
+        return CountedPaginator(queryset, page_size, count_mode=self.count_mode)
+
+    @contextmanager
+    def page_not_found(self, page_number):
+        try:
+            yield
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+    def page_rows_for(self, paginator, request):
+        if (self.count_mode == EXACT and paginator.num_pages > 1
+                and self.template is not None):
+            # The browsable API page controls need the page count
+            self.display_page_controls = True
+
+        self.request = request
+        return list(self.page)
+
+    def get_next_link(self):
+        if self.keyset_ordering is None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page_rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if self.keyset_ordering is None:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.page_rows[0], reverse=True)
+
+    def get_keyset_ordering(self, request, view):
+        orderings = getattr(view, 'keyset_orderings', {})
+        ordering = orderings.get(getattr(view, 'action', None))
+        wants_cursor = (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+        return tuple(ordering) if ordering and wants_cursor else None
+
+    def paginate_keyset(self, queryset, request):
+        """
+        Return one page of rows after (or before) the cursor position.
+        """
+        queryset, page_size, position, reverse = self.keyset_query(queryset, request)
+        return self.keyset_page(list(queryset), page_size, position, reverse)
+
+    async def apaginate_keyset(self, queryset, request):
+        queryset, page_size, position, reverse = self.keyset_query(queryset, request)
+        return self.keyset_page([row async for row in queryset], page_size, position, reverse)
+
+    def keyset_query(self, queryset, request):
+        """
+        Return ``(queryset, page_size, position, reverse)`` for the page at
+        the cursor; the queryset fetches one row more than the page.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        ordering = self.keyset_ordering
+        if reverse:
+            ordering = tuple(self.flip(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+        return queryset[:page_size + 1], page_size, position, reverse
+
+    def keyset_page(self, rows, page_size, position, reverse):
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page_rows = rows
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        return rows
+
+    @staticmethod
+    def flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def after(ordering, position):
+        """
+        Build the filter for rows strictly after ``position`` in ``ordering``.
+
+        For (-a, -b, -c) this is ``a <= A AND (a < A OR (a = A AND (b < B OR
+        (b = B AND c < C))))``. The leading bound lets the database seek
+        into the composite index instead of scanning from the start.
+        """
+        fields = [field.lstrip('-') for field in ordering]
+        ops = ['lt' if field.startswith('-') else 'gt' for field in ordering]
+
+        condition = Q(**{f'{fields[-1]}__{ops[-1]}': position[-1]})
+        for field, op, value in reversed(list(zip(fields[:-1], ops[:-1], position[:-1]))):
+            condition = Q(**{f'{field}__{op}': value}) | (Q(**{field: value}) & condition)
+        bound = Q(**{f'{fields[0]}__{ops[0]}e': position[0]})
+        return bound & condition
+
+    def encode_cursor(self, row, reverse):
+        fields = [field.lstrip('-') for field in self.keyset_ordering]
+        if isinstance(row, dict):
+            position = [row[field] for field in fields]
+        else:
+            position = [getattr(row, field) for field in fields]
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            position = payload['p']
+            reverse = bool(payload.get('r', 0))
+            if len(position) != len(self.keyset_ordering):
+                raise ValueError('cursor does not match ordering')
+            if not all(isinstance(value, (int, float)) for value in position):
+                raise ValueError('cursor values must be numbers')
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.count_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Count strategy: exact (default), estimate (capped) or none '
+                           '(omit count; cheapest for forward-only paging).',
+            'schema': {'type': 'string', 'enum': list(COUNT_MODES)},
+        })
+        if getattr(view, 'keyset_orderings', {}).get(getattr(view, 'action', None)):
+            parameters += [
+                {
+                    'name': self.mode_query_param,
+                    'required': False,
+                    'in': 'query',
+                    'description': 'Set to "cursor" for keyset pagination (no count, '
+                                   'constant-time deep pages).',
+                    'schema': {'type': 'string', 'enum': ['cursor']},
+                },
+                {
+                    'name': self.cursor_query_param,
+                    'required': False,
+                    'in': 'query',
+                    'description': 'Opaque cursor taken from a previous next/previous link.',
+                    'schema': {'type': 'string'},
+                },
+            ]
+        return parameters
@@ -0,0 +1,98 @@
+"""
+PostgreSQL fast paths.
+
+Used only when the connection is PostgreSQL through psycopg 3; every
+caller keeps its portable path for other backends.
+
+- COPY bulk loads: rows stream to the server in one COPY instead of
+  batched multi-row INSERTs, then land in movies_movie with a single
+  ``INSERT ... SELECT ... ON CONFLICT (title, year) DO UPDATE``
+"""
+from django.utils import timezone
+
+from .models import Movie, MovieGenre, MovieQuerySet
+
+
+IMPORT_TABLE = 'movies_import'
+
+# Columns a bulk load supplies; ids and timestamps are filled in on insert
+# (budget is optional and may be missing from a row)
+COPY_FIELDS = ('title', 'director', 'genre', 'year', 'rating', 'budget', 'fingerprint')
+
+
+def supports_copy(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3
+
+
+def copy_rows(connection, table, columns, rows):
+    """
+    Stream ``rows`` (tuples in ``columns`` order) into ``table`` with COPY.
+
+    Returns the number of rows sent.
+    """
+    quote = connection.ops.quote_name
+    count = 0
+    with connection.cursor() as cursor:
+        statement = f'COPY {quote(table)} ({", ".join(quote(c) for c in columns)}) FROM STDIN'
+        with cursor.cursor.copy(statement) as copy:
+            for row in rows:
+                copy.write_row(row)
+                count += 1
+    return count
+
+
+def copy_model_rows(connection, model, rows, timestamps=False):
+    """
+    COPY field-value dicts into ``model``'s table.
+
+    With ``timestamps=True``, created_at and updated_at are set to now.
+    """
+    columns = [model._meta.get_field(name).column for name in COPY_FIELDS]
+    extra = ()
+    if timestamps:
+        columns += ['created_at', 'updated_at']
+        now = timezone.now()
+        extra = (now, now)
+    return copy_rows(connection, model._meta.db_table, columns, (
+        tuple(values.get(name) for name in COPY_FIELDS) + extra for values in rows
+    ))
+
+
+def copy_upsert_movies(connection, rows):
+    """
+    Upsert field-value dicts into Movie through a COPY-loaded temp table.
+
+    When ``rows`` repeats a (title, year), the last occurrence wins, as
+    with MovieQuerySet.upsert(). Genre links are rebuilt for every written
+    movie. Run it inside a transaction so a failed load changes nothing.
+    Returns the number of rows read.
+    """
+    quote = connection.ops.quote_name
+    fields = [Movie._meta.get_field(name) for name in COPY_FIELDS]
+    definitions = ', '.join(f'{quote(f.column)} {f.db_type(connection)}' for f in fields)
+    columns = ', '.join(quote(f.column) for f in fields)
+    updated = [quote(Movie._meta.get_field(name).column) for name in MovieQuerySet.UPSERT_FIELDS]
+    updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in updated)
+    key = ', '.join(quote(Movie._meta.get_field(name).column) for name in MovieQuerySet.NATURAL_KEY)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMP TABLE {IMPORT_TABLE} (seq bigserial, {definitions})'
+        )
+    count = copy_rows(connection, IMPORT_TABLE, [f.column for f in fields], (
+        tuple(values.get(name) for name in COPY_FIELDS) for values in rows
+    ))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(Movie._meta.db_table)} ({columns}, created_at, updated_at) '
+            f'SELECT DISTINCT ON ({key}) {columns}, now(), now() FROM {IMPORT_TABLE} '
+            f'ORDER BY {key}, seq DESC '
+            f'ON CONFLICT ({key}) DO UPDATE SET {updates} '
+            f'RETURNING id, genre'
+        )
+        written = cursor.fetchall()
+        cursor.execute(f'DROP TABLE {IMPORT_TABLE}')
+    MovieGenre.objects.db_manager(connection.alias).replace_links(written)
+    return count
@@ -0,0 +1,75 @@
+"""
+Renderers for the Movie API.
+"""
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .timing import RENDER, timed
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    Output matches JSONRenderer's compact unicode form byte for byte.
+    ASCII-only or indented output, and values orjson cannot encode,
+    fall back to the stock encoder.
+    """
+
+    @timed(RENDER)
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context)):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Match JSONRenderer, which escapes these for JavaScript embedding
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Lets content negotiation accept an export media type.
+
+    The export action streams its own body, so this only renders the
+    JSON error responses sent instead of an export.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return FastJSONRenderer().render(data)
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+def json_response(data, status=200):
+    """
+    Return ``data`` as the JSON HttpResponse a ViewSet action would send.
+
+    For views outside DRF (the async views). The data is also kept on
+    ``response.data``, as on a DRF Response.
+    """
+    response = HttpResponse(
+        FastJSONRenderer().render(data), status=status, content_type=FastJSONRenderer.media_type
+    )
+    response.data = data
+    # Same URL, other Accept headers may get the browsable API
+    patch_vary_headers(response, ('Accept',))
+    return response
@@ -0,0 +1,44 @@
+"""
+SQLite read replicas kept fresh with the online backup API.
+
+For local testing and single-host deployments: each replica alias in
+MOVIES['READ_REPLICAS'] names an SQLite file that is overwritten with a
+consistent snapshot of the primary. The copy runs in steps so the primary
+stays writable while it runs; replica readers see the new snapshot once
+a step sequence completes.
+"""
+import sqlite3
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .conf import get_setting
+
+
+# Pages copied per backup step
+BACKUP_PAGES = 1024
+
+
+def sync_replica(alias, source=DEFAULT_DB_ALIAS, pages=BACKUP_PAGES):
+    """
+    Copy the ``source`` database into the SQLite replica ``alias``.
+    """
+    primary = connections[source]
+    replica = connections[alias]
+    if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+        raise ValueError('Backup API replicas need SQLite on both sides')
+    primary.ensure_connection()
+    target = sqlite3.connect(str(replica.settings_dict['NAME']))
+    try:
+        primary.connection.backup(target, pages=pages)
+    finally:
+        target.close()
+
+
+def sync_replicas(source=DEFAULT_DB_ALIAS):
+    """
+    Refresh every configured replica; return the aliases synced.
+    """
+    aliases = list(get_setting('READ_REPLICAS'))
+    for alias in aliases:
+        sync_replica(alias, source=source)
+    return aliases
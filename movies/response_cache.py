@@ -0,0 +1,205 @@
+"""
+Versioned response cache for the read-only Movie endpoints.
+
+Entries are keyed on the action, URL kwargs and normalized query params,
+and tagged with the catalog token (CatalogState.cache_token) they were
+built from. Every Movie write bumps the catalog version, so old entries
+go stale without anyone having to find and delete them.
+
+A stale entry (past its TTL, or built from an older catalog) is still
+served for up to MOVIES['RESPONSE_CACHE_STALE'] seconds while one request
+rebuilds it. Rebuilds are single-flight: the rebuilding request takes a
+lock with ``cache.add()``, and concurrent requests for a cold key wait for
+its result instead of running the same queries.
+
+The backend is the Django cache named by MOVIES['RESPONSE_CACHE_ALIAS'],
+so its size bound (MAX_ENTRIES) and location come from CACHES.
+
+``acached_response`` is the same cache for the async views; both store
+the response data, so WSGI and ASGI workers share entries.
+"""
+import asyncio
+import functools
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.utils.http import urlencode
+from rest_framework import status
+from rest_framework.response import Response
+
+from .conditional import acatalog_state, catalog_state
+from .conf import get_setting
+from .renderers import json_response
+
+
+CACHE_HEADER = 'X-Cache'
+HIT = 'HIT'
+MISS = 'MISS'
+STALE = 'STALE'
+
+# Seconds between checks while waiting for another request's rebuild
+POLL_INTERVAL = 0.05
+
+
+def get_response_cache():
+    return caches[get_setting('RESPONSE_CACHE_ALIAS')]
+
+
+def response_cache_key(request, action, kwargs):
+    """
+    Return the cache key for ``action`` with normalized params.
+
+    Query params are sorted so ``?a=1&b=2`` and ``?b=2&a=1`` share an
+    entry. The host is included because pagination links are absolute.
+    """
+    params = urlencode(sorted(request.GET.lists()), doseq=True)
+    url_kwargs = urlencode(sorted(kwargs.items()))
+    raw = '|'.join([request.scheme, request.get_host(), action, url_kwargs, params])
+    return f'movies:response:{hashlib.sha1(raw.encode("utf-8")).hexdigest()}'
+
+
+def _cached(entry, state):
+    response = Response(entry['data'], status=entry['status'])
+    response[CACHE_HEADER] = state
+    return response
+
+
+def _wait_for_rebuild(cache, key, lock_key, token):
+    """
+    Wait for the request holding ``lock_key`` to store a fresh entry.
+
+    Returns None when the lock is released without one (e.g. the view
+    returned an error) or the lock timeout passes.
+    """
+    deadline = time.monotonic() + get_setting('RESPONSE_CACHE_LOCK_TIMEOUT')
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry['token'] == token:
+            return entry
+        if cache.get(lock_key) is None:
+            return None
+    return None
+
+
+async def _await_rebuild(cache, key, lock_key, token):
+    """
+    Async version of _wait_for_rebuild().
+    """
+    deadline = time.monotonic() + get_setting('RESPONSE_CACHE_LOCK_TIMEOUT')
+    while time.monotonic() < deadline:
+        await asyncio.sleep(POLL_INTERVAL)
+        entry = await cache.aget(key)
+        if entry is not None and entry['token'] == token:
+            return entry
+        if await cache.aget(lock_key) is None:
+            return None
+    return None
+
+
+def cached_response(view_method):
+    """
+    Cache successful responses of a read-only ViewSet action.
+
+    Responses carry ``X-Cache: HIT``, ``MISS`` or ``STALE``. Set
+    MOVIES['RESPONSE_CACHE_TIMEOUT'] to 0 to disable caching.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        timeout = get_setting('RESPONSE_CACHE_TIMEOUT')
+        if not timeout:
+            return view_method(self, request, *args, **kwargs)
+
+        cache = get_response_cache()
+        key = response_cache_key(request, self.action, kwargs)
+        lock_key = f'{key}:lock'
+        token = catalog_state(request).cache_token
+        now = time.time()
+
+        entry = cache.get(key)
+        if entry is not None and entry['token'] == token and now < entry['expires']:
+            return _cached(entry, HIT)
+
+        if not cache.add(lock_key, 1, get_setting('RESPONSE_CACHE_LOCK_TIMEOUT')):
+            # Another request is rebuilding this key
+            if entry is not None and now < entry['expires'] + get_setting('RESPONSE_CACHE_STALE'):
+                return _cached(entry, STALE)
+            fresh = _wait_for_rebuild(cache, key, lock_key, token)
+            if fresh is not None:
+                return _cached(fresh, HIT)
+            return view_method(self, request, *args, **kwargs)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                stale = get_setting('RESPONSE_CACHE_STALE')
+                cache.set(key, {
+                    'token': token,
+                    'expires': time.time() + timeout,
+                    'status': response.status_code,
+                    'data': response.data,
+                }, timeout + stale)
+            response[CACHE_HEADER] = MISS
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    return wrapper
+
+
+def _acached(entry, state):
+    response = json_response(entry['data'], status=entry['status'])
+    response[CACHE_HEADER] = state
+    return response
+
+
+def acached_response(action):
+    """
+    cached_response() for an async view serving ``action``.
+
+    The view must return a json_response().
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            timeout = get_setting('RESPONSE_CACHE_TIMEOUT')
+            if not timeout:
+                return await view(request, *args, **kwargs)
+
+            cache = get_response_cache()
+            key = response_cache_key(request, action, kwargs)
+            lock_key = f'{key}:lock'
+            token = (await acatalog_state(request)).cache_token
+            now = time.time()
+
+            entry = await cache.aget(key)
+            if entry is not None and entry['token'] == token and now < entry['expires']:
+                return _acached(entry, HIT)
+
+            if not await cache.aadd(lock_key, 1, get_setting('RESPONSE_CACHE_LOCK_TIMEOUT')):
+                # Another request is rebuilding this key
+                if entry is not None and now < entry['expires'] + get_setting('RESPONSE_CACHE_STALE'):
+                    return _acached(entry, STALE)
+                fresh = await _await_rebuild(cache, key, lock_key, token)
+                if fresh is not None:
+                    return _acached(fresh, HIT)
+                return await view(request, *args, **kwargs)
+
+            try:
+                response = await view(request, *args, **kwargs)
+                if response.status_code == status.HTTP_200_OK:
+                    stale = get_setting('RESPONSE_CACHE_STALE')
+                    await cache.aset(key, {
+                        'token': token,
+                        'expires': time.time() + timeout,
+                        'status': response.status_code,
+                        'data': response.data,
+                    }, timeout + stale)
+                response[CACHE_HEADER] = MISS
+                return response
+            finally:
+                await cache.adelete(lock_key)
+
+        return wrapper
+    return decorator
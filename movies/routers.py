@@ -0,0 +1,121 @@
+"""
+Read/write splitting for the movies app.
+
+Writes always go to the primary (``default``). Reads of movies models go
+to one of MOVIES['READ_REPLICAS'], chosen once per request, except when
+the reader must see its own writes:
+
+- a request that writes (or uses an unsafe method) reads the primary for
+  the rest of the request
+- after such a request the client gets a cookie holding the catalog
+  version it wrote (see ReadYourWritesMiddleware). Until the cookie
+  expires, its requests only use a replica whose catalog version has
+  caught up, and read the primary otherwise.
+
+Other apps (auth, sessions, admin log) stay on the primary.
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+
+from .conf import get_setting
+
+
+class RoutingState:
+    """
+    Routing decisions for one request (or one thread outside requests).
+    """
+
+    def __init__(self, pinned=False, min_version=None):
+        self.pinned = pinned            # read the primary for the whole scope
+        self.min_version = min_version  # oldest catalog version a replica may have
+        self.wrote = False              # a movies write happened in this scope
+        self.replica = None             # alias picked for this scope's reads
+
+
+_state = contextvars.ContextVar('movies_routing_state', default=None)
+
+
+def routing_state():
+    state = _state.get()
+    if state is None:
+        state = RoutingState()
+        _state.set(state)
+    return state
+
+
+@contextmanager
+def routing_scope(pinned=False, min_version=None):
+    """
+    Run the block with fresh routing state and yield it.
+    """
+    state = RoutingState(pinned=pinned, min_version=min_version)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def is_routed(model):
+    return model._meta.app_label == 'movies'
+
+
+class ReplicaRouter:
+    """
+    Database router sending movies reads to replicas and writes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = get_setting('READ_REPLICAS')
+        if not replicas or not is_routed(model):
+            return None
+        state = routing_state()
+        if state.pinned or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            state.replica = self.choose_replica(replicas, state.min_version)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        if is_routed(model):
+            routing_state().wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_setting('READ_REPLICAS')}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary, never migrated directly
+        if db in get_setting('READ_REPLICAS'):
+            return False
+        return None
+
+    def choose_replica(self, replicas, min_version=None):
+        """
+        Return a random replica that has reached ``min_version``, or the
+        primary if none has.
+        """
+        candidates = list(replicas)
+        random.shuffle(candidates)
+        for alias in candidates:
+            if min_version is None or self.replica_version(alias) >= min_version:
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def replica_version(self, alias):
+        from .models import CatalogState
+
+        try:
+            version = CatalogState.objects.using(alias).filter(
+                name=CatalogState.MOVIES
+            ).values_list('version', flat=True).first()
+        except DatabaseError:
+            # Unreachable or not yet synced; never pick it for pinned reads
+            return -1
+        return version or 0
@@ -0,0 +1,260 @@
+"""
+Full-text search over movie titles and directors.
+
+On SQLite the search runs against an FTS5 index (``movies_movie_fts``),
+an external-content table over movies_movie. Triggers keep it in sync
+with every write, including raw SQL bulk loads. Matching is an index
+lookup, results are ranked with BM25 (title weighted above director),
+each term also matches as a prefix, and matches are highlighted.
+
+Other backends, or SQLite builds without FTS5, fall back to
+case-insensitive ``LIKE`` matching ranked by rating.
+"""
+import re
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.utils.html import escape
+
+from .models import Movie
+from .serializers import MovieRowSerializer
+
+
+FTS_TABLE = 'movies_movie_fts'
+
+# BM25 column weights for (title, director)
+TITLE_WEIGHT = 10.0
+DIRECTOR_WEIGHT = 5.0
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+# Placeholders for the marks until the text is HTML-escaped; control
+# characters that escape() leaves alone and titles do not contain
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+term_re = re.compile(r'\w+', re.UNICODE)
+
+
+def _movie_table():
+    return Movie._meta.db_table
+
+
+def search_index_sql():
+    """
+    Return the statements creating the FTS5 table and its sync triggers.
+    """
+    movies = _movie_table()
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"title, director, content='{movies}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {movies} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, title, director) "
+        f"VALUES (new.id, new.title, new.director); END",
+
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {movies} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, director) "
+        f"VALUES ('delete', old.id, old.title, old.director); END",
+
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, director "
+        f"ON {movies} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, director) "
+        f"VALUES ('delete', old.id, old.title, old.director); "
+        f"INSERT INTO {FTS_TABLE}(rowid, title, director) "
+        f"VALUES (new.id, new.title, new.director); END",
+    ]
+
+
+def fts5_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+SEARCH_OBJECTS = (FTS_TABLE, f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au')
+
+
+def _search_objects(connection):
+    """
+    Return which of the FTS table and its triggers exist.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)',
+            list(SEARCH_OBJECTS),
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def install_search_index(connection):
+    """
+    Create any missing part of the FTS5 index and rebuild it if needed.
+
+    Safe to run repeatedly. SQLite drops the triggers whenever a
+    migration rebuilds movies_movie, so this also runs after migrate.
+    Returns True when something had to be created.
+    """
+    # Migrations may have created or dropped the index since it was checked
+    _available.pop(connection.alias, None)
+    if not fts5_supported(connection):
+        return False
+    if _movie_table() not in connection.introspection.table_names():
+        return False
+    if len(_search_objects(connection)) == len(SEARCH_OBJECTS):
+        return False
+    with connection.cursor() as cursor:
+        for statement in search_index_sql():
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def drop_search_index(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for trigger in SEARCH_OBJECTS[1:]:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    _available.pop(connection.alias, None)
+
+
+@contextmanager
+def search_index_rebuilt(connection):
+    """
+    Rebuild the index in one pass after a bulk rewrite of movies_movie.
+
+    The sync triggers are dropped for the block, so rewritten rows skip
+    the per-row index updates, and restored after it. Use inside a
+    transaction: SQLite rolls the DDL back with it if the block fails.
+    """
+    if not search_index_available(connection.alias):
+        yield
+        return
+    with connection.cursor() as cursor:
+        for trigger in SEARCH_OBJECTS[1:]:
+            cursor.execute(f'DROP TRIGGER {trigger}')
+    yield
+    with connection.cursor() as cursor:
+        for statement in search_index_sql()[1:]:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+# alias -> whether the FTS5 index exists there
+_available = {}
+
+
+def search_index_available(using=DEFAULT_DB_ALIAS):
+    if using not in _available:
+        connection = connections[using]
+        _available[using] = (
+            connection.vendor == 'sqlite' and FTS_TABLE in _search_objects(connection)
+        )
+    return _available[using]
+
+
+def parse_terms(query):
+    """
+    Return the word terms of ``query`` (punctuation and FTS syntax dropped).
+    """
+    return term_re.findall(query or '')
+
+
+def fts_match_expression(terms):
+    # Quote each term so user input is never parsed as FTS5 syntax, and
+    # add * for prefix matching; terms are ANDed.
+    return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def mark_up(text):
+    """
+    HTML-escape ``text`` and turn the placeholder marks into ``<mark>`` tags.
+    """
+    if text is None:
+        return None
+    return escape(text).replace(MARK_START, HIGHLIGHT_START).replace(MARK_END, HIGHLIGHT_END)
+
+
+def highlight_terms(text, terms):
+    """
+    Wrap case-insensitive prefix matches of ``terms`` in the escaped ``text``.
+    """
+    pattern = re.compile(
+        r'\b(' + '|'.join(re.escape(term) for term in terms) + r')\w*',
+        re.IGNORECASE | re.UNICODE,
+    )
+    return mark_up(pattern.sub(lambda m: f'{MARK_START}{m.group(0)}{MARK_END}', text))
+
+
+def search_movies(query, limit=20, offset=0, using=DEFAULT_DB_ALIAS):
+    """
+    Search titles and directors for ``query``.
+
+    Returns ``(count, results)``, where each result is a list-shaped movie
+    dict plus ``score`` (higher is better) and ``highlight`` with the
+    marked-up title and director.
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return 0, []
+    if search_index_available(using):
+        hits, count = _search_fts(terms, limit, offset, using)
+    else:
+        hits, count = _search_like(terms, limit, offset, using)
+
+    ids = [hit[0] for hit in hits]
+    rows = Movie.objects.using(using).filter(pk__in=ids).order_by().values_list(
+        *MovieRowSerializer.fields
+    )
+    movies = {item['id']: item for item in MovieRowSerializer().to_representation(rows)}
+    results = []
+    for pk, score, title, director in hits:
+        item = movies.get(pk)
+        if item is None:
+            continue
+        item['score'] = score
+        item['highlight'] = {'title': title, 'director': director}
+        results.append(item)
+    return count, results
+
+
+def _search_fts(terms, limit, offset, using):
+    match = fts_match_expression(terms)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+        )
+        count = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT rowid, bm25({FTS_TABLE}, %s, %s) AS rank, "
+            f"highlight({FTS_TABLE}, 0, %s, %s), highlight({FTS_TABLE}, 1, %s, %s) "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY rank, rowid LIMIT %s OFFSET %s",
+            [TITLE_WEIGHT, DIRECTOR_WEIGHT,
+             MARK_START, MARK_END, MARK_START, MARK_END,
+             match, limit, offset],
+        )
+        # bm25() is lower-is-better; flip it so scores read naturally
+        hits = [(pk, round(-rank, 4), mark_up(title), mark_up(director))
+                for pk, rank, title, director in cursor.fetchall()]
+    return hits, count
+
+
+def _search_like(terms, limit, offset, using):
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(director__icontains=term)
+    queryset = Movie.objects.using(using).filter(condition)
+    rows = queryset.order_by('-rating', 'id').values_list('pk', 'title', 'director')[offset:offset + limit]
+    hits = [
+        (pk, None, highlight_terms(title, terms), highlight_terms(director, terms))
+        for pk, title, director in rows
+    ]
+    return hits, queryset.count()
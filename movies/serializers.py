@@ -1,11 +1,30 @@
 """
 Serializers for Movie model with validation.
 """
-from rest_framework import serializers
-from .models import Movie
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator
+from .models import Movie, MovieStat
+from .timing import SERIALIZE, timed
 
 
-class MovieSerializer(serializers.ModelSerializer):
+class TimedSerializerMixin:
+    """
+    Count building ``.data`` toward the request's serialize timing.
+    """
+
+    @property
+    @timed(SERIALIZE)
+    def data(self):
+        return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class MovieSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Movie model with field validation.
 
@@ -13,12 +32,21 @@ class MovieSerializer(serializers.ModelSerializer):
         - Rating: 0-10 range
         - Year: 1800-2100 range
         - Required fields: title, director, genre
+        - Uniqueness of (title, year)
     """
 
     class Meta:
         model = Movie
         fields = ['id', 'title', 'director', 'genre', 'year', 'rating', 'budget', 'created_at']
         read_only_fields = ['id', 'created_at']
+        list_serializer_class = TimedListSerializer
+        validators = [
+            UniqueTogetherValidator(
+                queryset=Movie.objects.all(),
+                fields=['title', 'year'],
+                message="A movie with this title and year already exists."
+            ),
+        ]
 
     def validate_rating(self, value):
         """
@@ -69,3 +97,92 @@ class MovieSerializer(serializers.ModelSerializer):
                 "Genre cannot be empty."
             )
         return value.strip()
+
+
+class MovieUpsertSerializer(MovieSerializer):
+    """
+    Serializer for bulk upserts keyed on (title, year).
+
+    Same field validation as MovieSerializer, without the uniqueness
+    check: an existing (title, year) is updated rather than rejected.
+    """
+
+    class Meta(MovieSerializer.Meta):
+        validators = []
+
+
+class MovieRowSerializer:
+    """
+    Read-only fast path producing MovieSerializer's output from value rows.
+
+    Rows come from ``values_list(*MovieRowSerializer.fields)``; each is
+    turned into a dict with zip() plus one datetime conversion, skipping
+    model instances and per-field ``to_representation`` calls. Key order
+    and values match MovieSerializer(many=True).data.
+    """
+    fields = tuple(MovieSerializer.Meta.fields)
+
+    def __init__(self):
+        self.created_at_index = self.fields.index('created_at')
+        self.format_created_at = self.compile_datetime(MovieSerializer().fields['created_at'])
+
+    @staticmethod
+    def compile_datetime(field):
+        """
+        Return a converter equivalent to ``field.to_representation``.
+
+        For the default ISO 8601 output with time zone support, the zone
+        is resolved once instead of on every row.
+        """
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if output_format is None or output_format.lower() != ISO_8601 or tz is None:
+            return field.to_representation
+
+        def to_representation(value):
+            if not value:
+                return None
+            if timezone.is_naive(value):
+                return field.to_representation(value)
+            value = value.astimezone(tz).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return to_representation
+
+    @timed(SERIALIZE)
+    def to_representation(self, rows):
+        fields = self.fields
+        index = self.created_at_index
+        format_created_at = self.format_created_at
+        data = []
+        for row in rows:
+            item = dict(zip(fields, row))
+            item['created_at'] = format_created_at(row[index])
+            data.append(item)
+        return data
+
+
+class MovieStatSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Serializer for one catalog statistics group.
+
+    ``name`` is the display form of the key: the genre's name for genre
+    groups (keys are lower-cased), the key itself otherwise. Pass a
+    ``genre_names`` key -> name mapping in the context.
+    """
+    name = serializers.SerializerMethodField()
+    rating_avg = serializers.SerializerMethodField()
+    budget_total = serializers.IntegerField(source='budget_sum')
+
+    class Meta:
+        model = MovieStat
+        fields = ['key', 'name', 'count', 'rating_avg', 'rating_min', 'rating_max', 'budget_total']
+        list_serializer_class = TimedListSerializer
+
+    def get_name(self, obj):
+        return self.context.get('genre_names', {}).get(obj.key, obj.key)
+
+    def get_rating_avg(self, obj):
+        average = obj.rating_avg
+        return None if average is None else round(average, 2)
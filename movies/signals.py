@@ -0,0 +1,83 @@
+"""
+Signal receivers keeping catalog bookkeeping in sync with Movie writes.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from .autocomplete import autocomplete
+from .models import (
+    STAT_FIELDS, CatalogState, Movie, MovieStat, bookkeeping_suspended, catalog_refreshed,
+    stat_values,
+)
+from .search import install_search_index
+from .sqlite import apply_pragmas
+from .summary import invalidate_summary
+from .timing import install_query_timer
+
+
+@receiver(pre_save, sender=Movie)
+def movie_saving(sender, instance, raw=False, using=DEFAULT_DB_ALIAS, **kwargs):
+    # Remember the stored values so post_save can move the movie between groups
+    instance._stat_values = None
+    if raw or bookkeeping_suspended() or instance._state.adding:
+        return
+    instance._stat_values = Movie.objects.using(using).filter(pk=instance.pk).values(*STAT_FIELDS).first()
+
+
+@receiver(post_save, sender=Movie)
+def movie_saved(sender, instance, created, raw=False, using=DEFAULT_DB_ALIAS, **kwargs):
+    if raw or bookkeeping_suspended():
+        return
+    CatalogState.objects.db_manager(using).record_write(delta=1 if created else 0)
+    before = getattr(instance, '_stat_values', None)
+    after = stat_values(instance)
+    if before != after:
+        MovieStat.objects.db_manager(using).apply_changes(
+            removed=[before] if before is not None else [], added=[after],
+        )
+    autocomplete.movie_saved(instance, using)
+    invalidate_summary(using)
+
+
+@receiver(post_delete, sender=Movie)
+def movie_deleted(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    if bookkeeping_suspended():
+        return
+    CatalogState.objects.db_manager(using).record_write(delta=-1)
+    MovieStat.objects.db_manager(using).apply_changes(removed=[stat_values(instance)])
+    autocomplete.movie_deleted(instance.pk, using)
+    invalidate_summary(using)
+
+
+@receiver(catalog_refreshed)
+def catalog_rewritten(sender, using=DEFAULT_DB_ALIAS, stats_current=False, **kwargs):
+    # Bulk writes skip the per-row receivers above; recompute unless the
+    # writer reported its changes (bulk_catalog_write adjusted the rows)
+    if not stats_current:
+        MovieStat.objects.db_manager(using).rebuild()
+    invalidate_summary(using)
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    apply_pragmas(connection)
+    install_query_timer(connection)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    # SQLite drops triggers when a migration rebuilds movies_movie
+    if sender.name == 'movies':
+        install_search_index(connections[using])
+        fill_stats(using)
+
+
+def fill_stats(using):
+    # First migrate over an existing catalog: compute the initial summary
+    if MovieStat._meta.db_table not in connections[using].introspection.table_names():
+        return
+    stats = MovieStat.objects.db_manager(using)
+    if not stats.exists() and Movie.objects.using(using).exists():
+        stats.rebuild()
@@ -0,0 +1,200 @@
+"""
+Log of slow SQL statements with their query plans.
+
+``record_query`` (movies.timing) passes every statement slower than
+MOVIES['SLOW_QUERY_MS'] to ``capture``. It records the statement, its
+parameters, its duration and the application frames that ran it, and
+queues it for a background thread. That thread runs ``EXPLAIN QUERY
+PLAN`` (SQLite) or ``EXPLAIN`` (PostgreSQL) on its own connection, so the
+request that ran the query never waits for the plan. It then flags plans
+that scan a whole table or sort in a temporary B-tree.
+
+The newest MOVIES['SLOW_QUERY_LOG_SIZE'] entries are kept in the default
+cache, so workers sharing a cache (MOVIES_CACHE_DIR) share the log.
+Staff read it at /api/slow-queries/.
+"""
+import os
+import queue
+import threading
+import traceback
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from .conf import get_setting
+
+
+CACHE_KEY = 'movies:slow-queries'
+
+# Plan flags
+FULL_SCAN = 'full_scan'
+TEMP_SORT = 'temp_sort'
+
+# Statements worth a plan; EXPLAIN itself is never captured
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+# Call site frames kept per entry, innermost last
+CALL_SITE_DEPTH = 5
+
+_lock = threading.Lock()
+_queue = queue.Queue(maxsize=100)
+_worker = None
+
+
+def is_slow(seconds):
+    threshold = get_setting('SLOW_QUERY_MS')
+    return threshold is not None and seconds * 1000 >= threshold
+
+
+def call_site():
+    """
+    Return the innermost project frames of the current stack.
+    """
+    root = str(settings.BASE_DIR) + os.sep
+    skip = (os.path.abspath(__file__), os.path.join(os.path.dirname(__file__), 'timing.py'))
+    frames = []
+    for frame in traceback.StackSummary.extract(traceback.walk_stack(None), lookup_lines=False):
+        filename = os.path.abspath(frame.filename)
+        if not filename.startswith(root) or filename in skip or 'site-packages' in filename:
+            continue
+        frames.append(f'{filename[len(root):]}:{frame.lineno} in {frame.name}')
+        if len(frames) == CALL_SITE_DEPTH:
+            break
+    return frames[::-1]
+
+
+def jsonable(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): jsonable(item) for key, item in value.items()}
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return repr(value)
+
+
+def capture(connection, sql, params, many, seconds):
+    """
+    Log a slow statement and queue it to be explained.
+    """
+    statement = sql.lstrip().upper()
+    if statement.startswith('EXPLAIN'):
+        return
+    entry = {
+        'at': timezone.now().isoformat(),
+        'db': connection.alias,
+        'ms': round(seconds * 1000, 2),
+        'sql': sql,
+        'params': None if many else jsonable(params),
+        'call_site': call_site(),
+        'plan': None,
+        'flags': [],
+    }
+    if many or not statement.startswith(EXPLAINABLE):
+        store(entry)
+        return
+    try:
+        _queue.put_nowait((entry, sql, params))
+    except queue.Full:
+        entry['plan'] = ['(not explained: too many slow queries queued)']
+        store(entry)
+        return
+    start_worker()
+
+
+def start_worker():
+    global _worker
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=work, name='movies-explain', daemon=True)
+            _worker.start()
+
+
+def work():
+    while True:
+        entry, sql, params = _queue.get()
+        try:
+            explain(entry, sql, params)
+            store(entry)
+        finally:
+            _queue.task_done()
+
+
+def flush():
+    """
+    Wait until every queued statement is explained and logged.
+    """
+    _queue.join()
+
+
+def explain(entry, sql, params):
+    """
+    Fill in the entry's plan and flags.
+    """
+    connection = connections[entry['db']]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                entry['plan'] = sqlite_plan(cursor.fetchall())
+            else:
+                cursor.execute(f'EXPLAIN {sql}', params)
+                entry['plan'] = [row[0] for row in cursor.fetchall()]
+    except DatabaseError as exc:
+        entry['plan'] = [f'(not explained: {exc})']
+        return
+    finally:
+        connection.close()
+    entry['flags'] = plan_flags(entry['plan'])
+
+
+def sqlite_plan(rows):
+    """
+    Indent EXPLAIN QUERY PLAN rows ``(id, parent, notused, detail)`` by depth.
+    """
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+
+def plan_flags(plan):
+    flags = []
+    for line in plan:
+        step = line.strip().lstrip('->').strip()
+        # SQLite: "SCAN movies_movie" (no index); PostgreSQL: "Seq Scan on ..."
+        if (step.startswith('SCAN ') and ' USING ' not in step and 'CONSTANT ROW' not in step) \
+                or step.startswith('Seq Scan'):
+            flags.append(FULL_SCAN)
+        # SQLite: "USE TEMP B-TREE FOR ORDER BY"; PostgreSQL: "Sort" nodes
+        if step.startswith('USE TEMP B-TREE') or step.startswith(('Sort ', 'Incremental Sort ')):
+            flags.append(TEMP_SORT)
+    return sorted(set(flags))
+
+
+def store(entry):
+    with _lock:
+        entries = cache.get(CACHE_KEY, [])
+        entries.append(entry)
+        cache.set(CACHE_KEY, entries[-get_setting('SLOW_QUERY_LOG_SIZE'):], None)
+
+
+def slow_queries():
+    """
+    Return the logged statements, newest first.
+    """
+    return cache.get(CACHE_KEY, [])[::-1]
+
+
+def clear():
+    cache.delete(CACHE_KEY)
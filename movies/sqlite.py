@@ -0,0 +1,49 @@
+"""
+Per-connection SQLite tuning.
+
+Django opens SQLite with its defaults: rollback journal, no memory
+mapping and a 2 MB page cache. MOVIES['SQLITE_PRAGMAS'] lists pragmas run
+on every new connection (see the production profile in settings), e.g.
+
+    journal_mode=wal      readers no longer wait for a writer
+    synchronous=normal    fsync at checkpoints, not every commit (safe in WAL)
+    mmap_size=...         read pages through the OS page cache
+    cache_size=-N         N KiB of page cache per connection
+    busy_timeout=ms       wait for a lock instead of failing at once
+"""
+import re
+
+from .conf import get_setting
+
+
+pragma_name_re = re.compile(r'^[a-z_]+$')
+
+
+def apply_pragmas(connection, pragmas=None):
+    """
+    Run the configured pragmas on an SQLite ``connection``.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = get_setting('SQLITE_PRAGMAS') if pragmas is None else pragmas
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if not pragma_name_re.match(name):
+                raise ValueError(f'Invalid SQLite pragma name: {name!r}')
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def read_pragmas(connection, names):
+    """
+    Return the current value of each pragma in ``names``.
+    """
+    values = {}
+    with connection.cursor() as cursor:
+        for name in names:
+            if not pragma_name_re.match(name):
+                raise ValueError(f'Invalid SQLite pragma name: {name!r}')
+            cursor.execute(f'PRAGMA {name}')
+            values[name] = cursor.fetchone()[0]
+    return values
@@ -0,0 +1,60 @@
+"""
+Cached catalog summary for the landing page.
+
+The landing page is the most requested URL (health checks and uptime
+monitors poll it), so its numbers are computed once and kept in the
+default cache. Movie writes delete the snapshot when their transaction
+commits, and the next hit recomputes it. The timeout,
+MOVIES['SUMMARY_CACHE_TIMEOUT'], bounds how stale another process's
+snapshot can get when the cache is per-process.
+"""
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .conf import get_setting
+from .models import CatalogState, Movie
+
+
+SUMMARY_CACHE_KEY = 'movies:summary'
+
+
+def _first_movie(queryset):
+    return queryset.values('title', 'year', 'rating').first()
+
+
+def compute_summary(using=DEFAULT_DB_ALIAS):
+    """
+    Return the landing page numbers, read from the database.
+
+    ``generation`` changes on every catalog write; template fragments
+    showing the summary include it in their cache key.
+    """
+    # Read the primary even with replicas: the snapshot is shared by every
+    # client, and one taken from a lagging replica would outlive the lag.
+    state = CatalogState.objects.db_manager(using).current()
+    movies = Movie.objects.using(using)
+    return {
+        'generation': state.cache_token,
+        'total_movies': state.row_count,
+        'highest_rated': _first_movie(movies.order_by('-rating', '-year')),
+        'latest_movie': _first_movie(movies.order_by('-year', '-rating')),
+        'oldest_movie': _first_movie(movies.order_by('year', 'rating')),
+    }
+
+
+def catalog_summary(using=DEFAULT_DB_ALIAS):
+    """
+    Return the cached summary, computing it on a miss.
+    """
+    summary = cache.get(SUMMARY_CACHE_KEY)
+    if summary is None:
+        summary = compute_summary(using)
+        cache.set(SUMMARY_CACHE_KEY, summary, get_setting('SUMMARY_CACHE_TIMEOUT'))
+    return summary
+
+
+def invalidate_summary(using=DEFAULT_DB_ALIAS):
+    """
+    Drop the cached summary once the current transaction commits.
+    """
+    transaction.on_commit(lambda: cache.delete(SUMMARY_CACHE_KEY), using=using)
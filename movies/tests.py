@@ -1,11 +1,40 @@
 """
 Comprehensive test suite for Movie API endpoints.
 """
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import IntegrityError, connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
-from .models import Movie
+from .importers import (
+    BulkImporter, ImportStats, StagingValidationError, iter_csv_rows,
+)
+from .autocomplete import PrefixIndex, autocomplete
+from . import metrics, slow_queries
+from .response_cache import response_cache_key
+from .postgres import supports_copy
+from .replicas import sync_replica
+from .routers import ReplicaRouter, routing_scope
+from .search import search_index_available
+from .sqlite import apply_pragmas, read_pragmas
+from .serializers import MovieSerializer
+from .models import CatalogState, Genre, Movie, MovieStat, StagedMovie
 
 
 class MovieAPITestCase(APITestCase):
@@ -214,6 +243,33 @@ class MovieAPITestCase(APITestCase):
         for movie in results:
             self.assertEqual(movie['genre'].lower(), 'crime'.lower())
 
+    def test_top_rated_genre_matches_whole_names(self):
+        """
+        Test genre filter matches any listed genre but not substrings.
+        """
+        Movie.objects.create(title="Alien", director="Ridley Scott",
+                             genre="Horror,Sci-Fi", year=1979, rating=8.5)
+        url = reverse('movie-top-rated')
+
+        response = self.client.get(url, {'genre': 'sci-fi'})
+        self.assertEqual([m['title'] for m in response.data['results']], ['Alien'])
+
+        response = self.client.get(url, {'genre': 'Fi'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_save_links_genres(self):
+        """
+        Test saving a movie keeps its Genre links in sync with the genre string.
+        """
+        self.movie3.genre = "Action, Crime,Drama"
+        self.movie3.save()
+
+        self.assertEqual(
+            sorted(self.movie3.genres.values_list('name', flat=True)),
+            ['Action', 'Crime', 'Drama'],
+        )
+        self.assertEqual(Genre.objects.get(key='crime').movies.count(), 3)
+
     def test_pagination(self):
         """
         Test list view includes pagination links.
@@ -251,3 +307,1930 @@ class MovieAPITestCase(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('title', response.data)
+
+    def test_create_duplicate_movie(self):
+        """
+        Test POST with an existing (title, year) returns 400.
+        """
+        url = reverse('movie-list')
+        data = {
+            'title': 'The Godfather',
+            'director': 'Someone Else',
+            'genre': 'Crime',
+            'year': 1972,
+            'rating': 7.0,
+        }
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Movie.objects.filter(title='The Godfather').count(), 1)
+
+    def test_upsert_movies(self):
+        """
+        Test POST /api/movies/upsert/ updates existing and creates new movies.
+        """
+        url = reverse('movie-upsert')
+        data = [
+            {'title': 'The Godfather', 'director': 'Francis Ford Coppola',
+             'genre': 'Crime,Drama', 'year': 1972, 'rating': 9.4},
+            {'title': 'Inception', 'director': 'Christopher Nolan',
+             'genre': 'Sci-Fi', 'year': 2010, 'rating': 8.8},
+        ]
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['upserted'], 2)
+        self.assertEqual(Movie.objects.count(), 6)
+        self.movie2.refresh_from_db()
+        self.assertEqual(self.movie2.rating, 9.4)
+        self.assertEqual(self.movie2.genre, 'Crime,Drama')
+
+    def test_upsert_movies_invalid(self):
+        """
+        Test upsert rejects non-list payloads and invalid items.
+        """
+        url = reverse('movie-upsert')
+        response = self.client.post(url, {'title': 'Solo'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(url, [{'title': 'Bad', 'director': 'X',
+                                           'genre': 'Drama', 'year': 2000,
+                                           'rating': 11}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Movie.objects.filter(title='Bad').exists())
+
+
+class BulkEndpointTestCase(APITestCase):
+    """
+    Test cases for the batch create / update / delete endpoint.
+    """
+
+    def setUp(self):
+        self.url = reverse('movie-bulk')
+        self.heat = Movie.objects.create(title="Heat", director="Michael Mann",
+                                         genre="Crime", year=1995, rating=8.3)
+        self.ronin = Movie.objects.create(title="Ronin", director="John Frankenheimer",
+                                          genre="Action", year=1998, rating=7.2)
+
+    def test_bulk_create(self):
+        """
+        Test a batch is created with per-item results and genre links.
+        """
+        response = self.client.post(self.url, [
+            {"title": "Alien", "director": "Ridley Scott", "genre": "Horror, Sci-Fi",
+             "year": 1979, "rating": 8.5},
+            {"title": "Aliens", "director": "James Cameron", "genre": "Action",
+             "year": 1986, "rating": 8.4},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        alien = Movie.objects.get(title="Alien")
+        self.assertEqual(response.data['results'][0], {'index': 0, 'id': alien.pk, 'status': 'created'})
+        self.assertEqual(sorted(alien.genres.values_list('name', flat=True)), ['Horror', 'Sci-Fi'])
+        self.assertEqual(CatalogState.objects.current().row_count, 4)
+
+    def test_bulk_create_rejects_whole_batch(self):
+        """
+        Test one invalid or duplicate item reports errors and writes nothing.
+        """
+        response = self.client.post(self.url, [
+            {"title": "Alien", "director": "Ridley Scott", "genre": "Horror",
+             "year": 1979, "rating": 8.5},
+            {"title": "Heat", "director": "Michael Mann", "genre": "Crime",
+             "year": 1995, "rating": 8.3},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1])
+
+        response = self.client.post(self.url, [
+            {"title": "Alien", "director": "Ridley Scott", "genre": "Horror",
+             "year": 1979, "rating": 11},
+        ], format='json')
+        self.assertIn('rating', response.data['errors'][0]['errors'])
+        self.assertFalse(Movie.objects.filter(title="Alien").exists())
+
+    def test_bulk_update(self):
+        """
+        Test a batch of partial updates is applied together.
+        """
+        response = self.client.patch(self.url, [
+            {"id": self.heat.pk, "rating": 8.4},
+            {"id": self.ronin.pk, "genre": "Action, Thriller"},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.heat.refresh_from_db()
+        self.assertEqual(self.heat.rating, 8.4)
+        self.assertEqual(self.heat.fingerprint, self.heat.compute_fingerprint())
+        self.assertTrue(Movie.objects.with_genre('thriller').filter(pk=self.ronin.pk).exists())
+
+    def test_bulk_update_errors(self):
+        """
+        Test unknown ids and invalid fields are reported per item.
+        """
+        response = self.client.patch(self.url, [
+            {"id": self.heat.pk, "rating": 11},
+            {"id": 9999, "rating": 5},
+            {"id": self.ronin.pk, "title": "Heat", "year": 1995},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0, 1])
+        self.heat.refresh_from_db()
+        self.assertEqual(self.heat.rating, 8.3)
+
+    def test_bulk_delete(self):
+        """
+        Test a batch of ids is deleted, and unknown ids abort the batch.
+        """
+        response = self.client.delete(self.url, {'ids': [self.heat.pk, 9999]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Movie.objects.count(), 2)
+
+        response = self.client.delete(self.url, {'ids': [self.heat.pk, self.ronin.pk]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Movie.objects.count(), 0)
+        self.assertEqual(CatalogState.objects.current().row_count, 0)
+
+    def test_bulk_invalid_ids(self):
+        """
+        Test non-integer and list ids are reported per item, not a server error.
+        """
+        message = ['A valid integer is required.']
+        response = self.client.patch(self.url, [
+            {"id": "abc", "rating": 5},
+            {"id": [self.heat.pk], "rating": 5},
+            {"id": self.ronin.pk, "rating": 11},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0], {'index': 0, 'errors': {'id': message}})
+        self.assertEqual(response.data['errors'][1]['errors']['id'], message)
+        self.assertIn('rating', response.data['errors'][2]['errors'])
+
+        response = self.client.delete(self.url, {'ids': ["abc", [self.heat.pk], self.ronin.pk]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], [
+            {'index': 0, 'errors': {'id': message}},
+            {'index': 1, 'errors': {'id': message}},
+        ])
+        self.assertEqual(Movie.objects.count(), 2)
+
+    def test_bulk_max_items(self):
+        """
+        Test batches over MOVIES['BULK_MAX_ITEMS'] are refused.
+        """
+        with self.settings(MOVIES={'BULK_MAX_ITEMS': 1}):
+            response = self.client.delete(self.url, {'ids': [self.heat.pk, self.ronin.pk]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MovieUpsertTestCase(TestCase):
+    """
+    Test cases for the (title, year) natural key and bulk upsert.
+    """
+
+    def test_natural_key_is_unique(self):
+        """
+        Test the database rejects a second movie with the same (title, year).
+        """
+        Movie.objects.create(title="Heat", director="Michael Mann", genre="Crime",
+                             year=1995, rating=8.3)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Movie.objects.create(title="Heat", director="Other", genre="Crime",
+                                 year=1995, rating=5.0)
+
+    def test_upsert_single_statement(self):
+        """
+        Test upsert writes a batch in one statement, last duplicate winning.
+        """
+        Movie.objects.create(title="Heat", director="Michael Mann", genre="Crime",
+                             year=1995, rating=8.3)
+        movies = [
+            Movie(title="Heat", director="Michael Mann", genre="Crime", year=1995, rating=8.0),
+            Movie(title="Heat", director="Michael Mann", genre="Crime", year=1995, rating=8.5),
+            Movie(title="Collateral", director="Michael Mann", genre="Crime", year=2004, rating=7.5),
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            Movie.objects.upsert(movies)
+
+        movie_writes = [q for q in ctx.captured_queries
+                        if q['sql'].startswith('INSERT INTO "movies_movie"')]
+        self.assertEqual(len(movie_writes), 1)
+
+        self.assertEqual(Movie.objects.count(), 2)
+        heat = Movie.objects.get(title="Heat")
+        self.assertEqual(heat.rating, 8.5)
+        self.assertEqual(heat.fingerprint, heat.compute_fingerprint())
+
+
+class CursorPaginationTestCase(APITestCase):
+    """
+    Test cases for opt-in keyset pagination.
+    """
+
+    def setUp(self):
+        Movie.objects.upsert([
+            Movie(title=f"Movie {i}", director="Director", genre="Drama",
+                  year=2000 + i % 3, rating=8.0 + (i % 4) / 10)
+            for i in range(45)
+        ])
+
+    def crawl(self, url, params):
+        titles = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            titles += [movie['title'] for movie in response.data['results']]
+            if not response.data['next']:
+                return titles, response
+            response = self.client.get(response.data['next'])
+
+    def test_list_cursor_crawl(self):
+        """
+        Test following next links visits every movie once in list order.
+        """
+        titles, _ = self.crawl(reverse('movie-list'), {'pagination': 'cursor'})
+        expected = list(
+            Movie.objects.order_by('-year', '-rating', '-id').values_list('title', flat=True)
+        )
+        self.assertEqual(titles, expected)
+
+    def test_top_rated_cursor_previous(self):
+        """
+        Test previous links walk back to the same pages.
+        """
+        url = reverse('movie-top-rated')
+        first = self.client.get(url, {'pagination': 'cursor', 'min_rating': 8.1})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertIsNone(first.data['previous'])
+        self.assertIn('min_rating=8.1', first.data['next'])
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertEqual(
+            [m['title'] for m in first.data['results']],
+            list(Movie.objects.filter(rating__gte=8.1)
+                 .order_by('-rating', '-year', '-id')
+                 .values_list('title', flat=True)[:20]),
+        )
+
+    def test_invalid_cursor(self):
+        """
+        Test a malformed cursor returns 404.
+        """
+        response = self.client.get(reverse('movie-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_contract_unchanged(self):
+        """
+        Test page-number pagination is still the default.
+        """
+        response = self.client.get(reverse('movie-list'), {'page': 2})
+        self.assertEqual(response.data['count'], 45)
+        self.assertEqual(len(response.data['results']), 20)
+
+
+@override_settings(MOVIES={'RESPONSE_CACHE_TIMEOUT': 0})
+class CountStrategyTestCase(APITestCase):
+    """
+    Test cases for paginated count strategies.
+    """
+
+    def setUp(self):
+        cache.clear()
+        Movie.objects.upsert([
+            Movie(title=f"Movie {i}", director="Director", genre="Drama",
+                  year=2000 + i % 3, rating=8.0 + (i % 4) / 10)
+            for i in range(45)
+        ])
+
+    def count_queries(self, queries):
+        return [q for q in queries if 'COUNT(' in q['sql'] and '"movies_movie"' in q['sql']]
+
+    def test_unfiltered_count_uses_catalog_state(self):
+        """
+        Test the unfiltered list count is read without a COUNT(*).
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('movie-list'))
+        self.assertEqual(response.data['count'], 45)
+        self.assertEqual(self.count_queries(ctx.captured_queries), [])
+
+    def test_catalog_state_tracks_writes(self):
+        """
+        Test row_count follows creates, deletes and bulk loads.
+        """
+        movie = Movie.objects.create(title="Extra", director="D", genre="Drama",
+                                     year=2001, rating=7.0)
+        self.assertEqual(CatalogState.objects.current().row_count, 46)
+        movie.delete()
+        self.assertEqual(CatalogState.objects.current().row_count, 45)
+        BulkImporter().load([{'title': 'Only', 'director': 'D', 'genre': 'Drama',
+                              'year': 2001, 'rating': 7.0, 'budget': None}],
+                            mode='replace')
+        self.assertEqual(CatalogState.objects.current().row_count, 1)
+
+    def test_filtered_count_cached_until_write(self):
+        """
+        Test a filtered count is reused and invalidated by a write.
+        """
+        url = reverse('movie-top-rated')
+        self.client.get(url, {'year': 2000})
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {'year': 2000})
+        self.assertEqual(response.data['count'], 15)
+        self.assertEqual(self.count_queries(ctx.captured_queries), [])
+
+        Movie.objects.create(title="New", director="D", genre="Drama", year=2000, rating=9.0)
+        response = self.client.get(url, {'year': 2000})
+        self.assertEqual(response.data['count'], 16)
+
+    def test_count_none_pages_forward(self):
+        """
+        Test ?count=none omits count and still links to the next page.
+        """
+        url = reverse('movie-list')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {'count': 'none', 'page': 2})
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIn('page=3', response.data['next'])
+        self.assertEqual(self.count_queries(ctx.captured_queries), [])
+
+        last = self.client.get(url, {'count': 'none', 'page': 3})
+        self.assertIsNone(last.data['next'])
+        self.assertEqual(len(last.data['results']), 5)
+
+    def test_count_estimate_is_capped(self):
+        """
+        Test ?count=estimate stops counting at the configured cap.
+        """
+        with self.settings(MOVIES={'COUNT_ESTIMATE_CAP': 10, 'RESPONSE_CACHE_TIMEOUT': 0}):
+            response = self.client.get(
+                reverse('movie-top-rated'), {'count': 'estimate', 'min_rating': 8.0}
+            )
+        self.assertEqual(response.data['count'], 10)
+        self.assertTrue(response.data['count_is_estimate'])
+
+    def test_invalid_count_mode(self):
+        """
+        Test an unknown count mode returns 400.
+        """
+        response = self.client.get(reverse('movie-list'), {'count': 'bogus'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ResponseCacheTestCase(APITestCase):
+    """
+    Test cases for the versioned read-endpoint response cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.movie = Movie.objects.create(
+            title="Heat", director="Michael Mann", genre="Crime", year=1995, rating=8.3
+        )
+
+    def test_repeat_request_is_cached(self):
+        """
+        Test a repeated GET is served from cache without the page query.
+        """
+        url = reverse('movie-top-rated')
+        first = self.client.get(url, {'min_rating': 8, 'year': 1995})
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(url, {'year': 1995, 'min_rating': 8})
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+        self.assertFalse(any('"movies_movie"' in q['sql'] for q in ctx.captured_queries))
+
+    def test_write_invalidates_cache(self):
+        """
+        Test a movie write makes cached responses stale.
+        """
+        url = reverse('movie-detail', kwargs={'pk': self.movie.pk})
+        self.client.get(url)
+        self.client.patch(url, {'rating': 9.0}, format='json')
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['rating'], 9.0)
+
+    def test_stale_served_while_rebuilding(self):
+        """
+        Test a stale entry is served while another request holds the lock.
+        """
+        url = reverse('movie-list')
+        first = self.client.get(url)
+        key = response_cache_key(Request(first.wsgi_request), 'list', {})
+        Movie.objects.create(title="Ronin", director="John Frankenheimer",
+                             genre="Action", year=1998, rating=7.2)
+        # Simulate a rebuild in flight in another worker
+        cache.add(f'{key}:lock', 1)
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'STALE')
+        self.assertEqual(response.data['count'], 1)
+
+    def test_errors_not_cached(self):
+        """
+        Test error responses are not stored.
+        """
+        url = reverse('movie-detail', kwargs={'pk': 9999})
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('X-Cache', response)
+
+
+@override_settings(MOVIES={'RESPONSE_CACHE_TIMEOUT': 0})
+class FastSerializationTestCase(APITestCase):
+    """
+    Test cases for the read-only list serialization fast path.
+    """
+
+    def setUp(self):
+        Movie.objects.create(title="Amélie", director="Jean-Pierre Jeunet",
+                             genre="Comedy, Romance", year=2001, rating=8.3)
+        Movie.objects.create(title="Line\u2028Sep", director="D", genre="Drama",
+                             year=2001, rating=8.0, budget=1000000)
+        Movie.objects.create(title="Old", director="D", genre="Drama", year=1950, rating=7.1)
+
+    def assertSameAsSerializer(self, url, params=None):
+        fast = self.client.get(url, params, HTTP_ACCEPT='application/json')
+        with self.settings(MOVIES={'RESPONSE_CACHE_TIMEOUT': 0, 'FAST_SERIALIZATION': False}):
+            slow = self.client.get(url, params, HTTP_ACCEPT='application/json')
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, slow.content)
+
+    def test_list_output_unchanged(self):
+        """
+        Test the fast path renders the same bytes as MovieSerializer.
+        """
+        self.assertSameAsSerializer(reverse('movie-list'))
+        self.assertSameAsSerializer(reverse('movie-list'), {'pagination': 'cursor'})
+
+    def test_top_rated_output_unchanged(self):
+        """
+        Test the fast path renders the same bytes for top-rated.
+        """
+        self.assertSameAsSerializer(reverse('movie-top-rated'), {'min_rating': 7})
+        self.assertSameAsSerializer(reverse('movie-top-rated'), {'genre': 'romance'})
+
+
+class SearchTestCase(APITestCase):
+    """
+    Test cases for full-text search over titles and directors.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('movie-search')
+        Movie.objects.create(title="The Dark Knight", director="Christopher Nolan",
+                             genre="Action", year=2008, rating=9.0)
+        Movie.objects.create(title="Knight and Day", director="James Mangold",
+                             genre="Action", year=2010, rating=6.3)
+        Movie.objects.create(title="Nolan's Dream", director="Someone Else",
+                             genre="Drama", year=2012, rating=5.0)
+        Movie.objects.create(title="Insomnia", director="Christopher Nolan",
+                             genre="Thriller", year=2002, rating=7.2)
+
+    def titles(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [movie['title'] for movie in response.data['results']]
+
+    def test_search_ranks_and_highlights(self):
+        """
+        Test prefix terms match, title hits rank first and are highlighted.
+        """
+        if not search_index_available():
+            self.skipTest('FTS5 not available')
+        response = self.client.get(self.url, {'q': 'nol'})
+        titles = [movie['title'] for movie in response.data['results']]
+
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(titles[0], "Nolan's Dream")
+        self.assertEqual(response.data['results'][0]['highlight']['title'], "<mark>Nolan</mark>&#x27;s Dream")
+        self.assertEqual(self.titles({'q': 'knight nolan'}), ["The Dark Knight"])
+
+    def test_search_index_follows_writes(self):
+        """
+        Test the index tracks saves, deletes and bulk imports.
+        """
+        if not search_index_available():
+            self.skipTest('FTS5 not available')
+        movie = Movie.objects.get(title="Insomnia")
+        movie.title = "Memento"
+        movie.save()
+        self.assertEqual(self.titles({'q': 'memento'}), ["Memento"])
+        self.assertEqual(self.titles({'q': 'insomnia'}), [])
+
+        movie.delete()
+        self.assertEqual(self.titles({'q': 'memento'}), [])
+
+        BulkImporter().load([{'title': 'Tenet', 'director': 'Christopher Nolan',
+                              'genre': 'Action', 'year': 2020, 'rating': 7.3,
+                              'budget': None}], mode='replace')
+        self.assertEqual(self.titles({'q': 'nolan'}), ["Tenet"])
+
+    def test_search_fallback(self):
+        """
+        Test the LIKE fallback used without FTS5.
+        """
+        with mock.patch('movies.search.search_index_available', return_value=False):
+            response = self.client.get(self.url, {'q': 'knight'})
+        self.assertEqual(
+            [movie['title'] for movie in response.data['results']],
+            ["The Dark Knight", "Knight and Day"],
+        )
+        self.assertEqual(response.data['results'][0]['highlight']['title'], "The Dark <mark>Knight</mark>")
+
+    def test_search_escapes_highlights(self):
+        """
+        Test markup stored in a title is escaped, with only the marks left as HTML.
+        """
+        Movie.objects.create(title="<script>alert(1)</script> Knightfall", director="X",
+                             genre="Drama", year=2020, rating=1.0)
+        expected = "&lt;script&gt;alert(1)&lt;/script&gt; <mark>Knightfall</mark>"
+        with mock.patch('movies.search.search_index_available', return_value=False):
+            response = self.client.get(self.url, {'q': 'knightfall'})
+        self.assertEqual(response.data['results'][0]['highlight']['title'], expected)
+
+        if search_index_available():
+            response = self.client.get(self.url, {'q': 'knightf'})
+            self.assertEqual(response.data['results'][0]['highlight']['title'], expected)
+
+    def test_search_requires_query(self):
+        """
+        Test a missing query or bad limit returns 400.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'q': 'x', 'limit': 1000})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AutocompleteTestCase(APITestCase):
+    """
+    Test cases for the in-memory prefix index and autocomplete endpoint.
+    """
+
+    ROWS = [
+        (1, "The Dark Knight", "Christopher Nolan", 2008, 9.0),
+        (2, "Dark City", "Alex Proyas", 1998, 7.6),
+        (3, "Amélie", "Jean-Pierre Jeunet", 2001, 8.3),
+        (4, "Darkman", "Sam Raimi", 1990, 6.4),
+        (5, "Dunkirk", "Christopher Nolan", 2017, 7.8),
+    ]
+
+    def setUp(self):
+        autocomplete.index = None
+
+    def titles(self, index, prefix, limit=10):
+        return [row[1] for row in index.search(prefix, limit)]
+
+    def test_prefix_index_ranks_by_rating(self):
+        """
+        Test title and director prefixes match, normalized and best rated first.
+        """
+        index = PrefixIndex().build(self.ROWS)
+        self.assertEqual(self.titles(index, 'dark'), ["Dark City", "Darkman"])
+        self.assertEqual(self.titles(index, 'CHRIS'), ["The Dark Knight", "Dunkirk"])
+        self.assertEqual(self.titles(index, 'ame'), ["Amélie"])
+        self.assertEqual(self.titles(index, 'jean pierre'), ["Amélie"])
+        self.assertEqual(self.titles(index, 'd', limit=2), ["Dunkirk", "Dark City"])
+
+    def test_hot_prefixes_match_full_scan(self):
+        """
+        Test precomputed hot prefixes give the same answer as a scan.
+        """
+        rows = [(i, f"Title {i % 97}", f"Director {i % 13}", 2000, (i * 7) % 100 / 10)
+                for i in range(1, 600)]
+        hot = PrefixIndex(hot_prefix=8).build(rows)
+        cold = PrefixIndex(hot_prefix=10 ** 6).build(rows)
+
+        self.assertIn('t', hot.hot)
+        for prefix in ['t', 'title 1', 'd', 'director 1', 'x']:
+            self.assertEqual(
+                [row[4] for row in hot.search(prefix, 20)],
+                [row[4] for row in cold.search(prefix, 20)],
+            )
+
+    def test_prefix_index_incremental_updates(self):
+        """
+        Test add and remove keep results and hot lists current.
+        """
+        index = PrefixIndex(hot_prefix=1).build(self.ROWS)
+        index.add((6, "Dark Waters", "Todd Haynes", 2019, 9.5))
+        self.assertEqual(self.titles(index, 'd', limit=1), ["Dark Waters"])
+
+        index.remove(6)
+        index.add((1, "The Dark Knight Returns", "Christopher Nolan", 2008, 9.0))
+        self.assertEqual(self.titles(index, 'd', limit=1), ["Dunkirk"])
+        self.assertEqual(self.titles(index, 'the'), ["The Dark Knight Returns"])
+        self.assertEqual(len(index), 5)
+
+    def test_prefix_index_reuses_slots(self):
+        """
+        Test repeated saves and deletes do not grow the index.
+        """
+        index = PrefixIndex().build(self.ROWS)
+        for rating in range(50):
+            index.add((1, "The Dark Knight", "Christopher Nolan", 2008, rating / 10))
+            index.remove(2)
+            index.add((2, "Dark City", "Alex Proyas", 1998, 7.6))
+        self.assertEqual(len(index.movies), 5)
+        self.assertEqual(len(index.ratings), 5)
+        self.assertEqual(self.titles(index, 'dark'), ["Dark City", "Darkman"])
+
+    def test_prefix_index_max_movies(self):
+        """
+        Test a full index skips worse-rated movies and evicts for better ones.
+        """
+        index = PrefixIndex(max_movies=3).build(self.ROWS[:3])
+        index.add((4, "Darkman", "Sam Raimi", 1990, 6.4))
+        self.assertEqual(self.titles(index, 'dark'), ["Dark City"])
+
+        index.add((5, "Dunkirk", "Christopher Nolan", 2017, 7.8))
+        self.assertEqual(len(index), 3)
+        self.assertEqual(self.titles(index, 'd'), ["Dunkirk"])
+        self.assertEqual(self.titles(index, 'dark'), [])
+
+        # A re-rated movie competes at its new rating
+        index.add((3, "Amélie", "Jean-Pierre Jeunet", 2001, 5.0))
+        index.add((2, "Dark City", "Alex Proyas", 1998, 7.0))
+        self.assertEqual(self.titles(index, 'dark'), ["Dark City"])
+        self.assertEqual(self.titles(index, 'ame'), [])
+        self.assertEqual(len(index.movies), 3)
+
+    @override_settings(MOVIES={'AUTOCOMPLETE_REFRESH_SECONDS': 0})
+    def test_commit_applies_without_rebuild(self):
+        """
+        Test local writes are applied in place and other writes on refresh.
+        """
+        autocomplete.search('h')
+        with mock.patch.object(autocomplete, 'rebuild', wraps=autocomplete.rebuild) as rebuild:
+            for title in ["Heat", "Hereditary"]:
+                with self.captureOnCommitCallbacks(execute=True):
+                    Movie.objects.create(title=title, director="Anon", genre="Drama",
+                                         year=2000, rating=7.0)
+            self.assertEqual(self.titles(autocomplete, 'he'), ["Heat", "Hereditary"])
+            rebuild.assert_not_called()
+
+            # Written elsewhere: no signal here, only the version moves
+            Movie.objects.bulk_create([Movie(title="Hellboy", director="Guillermo del Toro",
+                                             genre="Action", year=2004, rating=6.8)])
+            CatalogState.objects.record_write(1)
+            self.assertEqual(self.titles(autocomplete, 'hel'), ["Hellboy"])
+            rebuild.assert_called_once()
+
+    def test_autocomplete_endpoint(self):
+        """
+        Test the endpoint answers from the index and picks up writes.
+        """
+        Movie.objects.create(title="Heat", director="Michael Mann", genre="Crime",
+                             year=1995, rating=8.3)
+        url = reverse('movie-autocomplete')
+        response = self.client.get(url, {'prefix': 'he'})
+        self.assertEqual(response.data['results'][0]['title'], "Heat")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Movie.objects.create(title="Hereditary", director="Ari Aster", genre="Horror",
+                                 year=2018, rating=7.3)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'prefix': 'her'})
+        self.assertEqual(response.data['results'][0]['title'], "Hereditary")
+
+    def test_autocomplete_invalid_limit(self):
+        """
+        Test an out-of-range limit returns 400.
+        """
+        response = self.client.get(reverse('movie-autocomplete'), {'prefix': 'a', 'limit': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExportTestCase(APITestCase):
+    """
+    Test cases for the streaming export endpoint.
+    """
+
+    def setUp(self):
+        Movie.objects.create(title="Heat", director="Michael Mann", genre="Crime",
+                             year=1995, rating=8.3, budget=60000000)
+        Movie.objects.create(title="Amélie", director="Jean-Pierre Jeunet",
+                             genre="Comedy, Romance", year=2001, rating=8.3)
+        Movie.objects.create(title="Ronin", director="John Frankenheimer", genre="Action",
+                             year=1998, rating=7.2)
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_export_ndjson(self):
+        """
+        Test NDJSON export streams one list-shaped movie per line.
+        """
+        response = self.client.get(reverse('movie-export'))
+        lines = self.read(response).decode('utf-8').splitlines()
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        expected = MovieSerializer(Movie.objects.order_by('pk'), many=True).data
+        self.assertEqual([json.loads(line) for line in lines], json.loads(json.dumps(expected)))
+
+    def test_export_csv_filtered(self):
+        """
+        Test CSV export honours the filters and writes a header row.
+        """
+        response = self.client.get(reverse('movie-export'), {'output': 'csv', 'min_rating': 8})
+        rows = list(csv.reader(io.StringIO(self.read(response).decode('utf-8'))))
+
+        self.assertEqual(rows[0], ['id', 'title', 'director', 'genre', 'year',
+                                   'rating', 'budget', 'created_at'])
+        self.assertEqual([row[1] for row in rows[1:]], ['Heat', 'Amélie'])
+        self.assertEqual(rows[2][6], '')
+
+    def test_export_gzip(self):
+        """
+        Test the stream is gzip-compressed when the client accepts it.
+        """
+        url = reverse('movie-export')
+        plain = self.read(self.client.get(url))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(self.read(response)), plain)
+
+    def test_export_accept_header(self):
+        """
+        Test Accept picks the format when ?output= is absent, and an
+        unsupported type is refused.
+        """
+        url = reverse('movie-export')
+        response = self.client.get(url, HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(self.read(response).splitlines()), 3)
+
+        response = self.client.get(url, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertTrue(self.read(response).startswith(b'id,title,'))
+        self.assertIn('Accept', response['Vary'])
+
+        response = self.client.get(url, {'output': 'ndjson'}, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        response = self.client.get(url, HTTP_ACCEPT='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+    def test_export_invalid_output(self):
+        """
+        Test an unknown output format returns 400.
+        """
+        response = self.client.get(reverse('movie-export'), {'output': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MovieStatTestCase(APITestCase):
+    """
+    Test cases for the precomputed catalog statistics.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.heat = Movie.objects.create(title="Heat", director="Michael Mann", genre="Crime, Drama",
+                                         year=1995, rating=8.3, budget=60000000)
+        Movie.objects.create(title="Collateral", director="Michael Mann", genre="Crime",
+                             year=2004, rating=7.5, budget=65000000)
+        Movie.objects.create(title="Ronin", director="John Frankenheimer", genre="Action",
+                             year=1998, rating=7.2)
+
+    def snapshot(self):
+        return sorted(
+            (stat.dimension, stat.key, stat.count, round(stat.rating_sum, 6),
+             stat.rating_min, stat.rating_max, stat.budget_sum)
+            for stat in MovieStat.objects.all()
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        MovieStat.objects.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_incremental_matches_rebuild(self):
+        """
+        Test create, update and delete keep the summary equal to a rebuild.
+        """
+        self.assertMatchesRebuild()
+        self.heat.rating = 6.0
+        self.heat.genre = 'Thriller'
+        self.heat.year = 2001
+        self.heat.save()
+        self.assertMatchesRebuild()
+        Movie.objects.get(title="Ronin").delete()
+        self.assertMatchesRebuild()
+        self.assertFalse(MovieStat.objects.filter(dimension=MovieStat.GENRE, key='action').exists())
+
+    def test_bulk_writes_apply_deltas(self):
+        """
+        Test bulk and upsert writes adjust the summary without a full rebuild.
+        """
+        with mock.patch('movies.models.MovieStatQuerySet.rebuild') as rebuild:
+            Movie.objects.upsert([
+                Movie(title="Thief", director="Michael Mann", genre="Crime", year=1981, rating=7.4),
+                Movie(title="Heat", director="Michael Mann", genre="Crime", year=1995, rating=9.0),
+            ])
+        rebuild.assert_not_called()
+        self.assertMatchesRebuild()
+        self.assertFalse(MovieStat.objects.filter(dimension=MovieStat.GENRE, key='drama').exists())
+        stat = MovieStat.objects.get(dimension=MovieStat.DIRECTOR, key='Michael Mann')
+        self.assertEqual((stat.count, stat.rating_max), (3, 9.0))
+
+        collateral = Movie.objects.get(title="Collateral")
+        collateral.rating = 6.0
+        collateral.year = 1981
+        with mock.patch('movies.models.MovieStatQuerySet.rebuild') as rebuild:
+            Movie.objects.bulk_edit([collateral], ['rating', 'year'])
+            Movie.objects.bulk_insert([Movie(title="Manhunter", director="Michael Mann",
+                                             genre="Thriller", year=1986, rating=7.2)])
+            response = self.client.delete(reverse('movie-bulk'),
+                                          {'ids': [self.heat.pk]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rebuild.assert_not_called()
+        self.assertMatchesRebuild()
+
+    def test_deltas_query_count_flat(self):
+        """
+        Test the statements of a bulk write do not grow with the groups it touches.
+        """
+        def upsert(count, start):
+            with CaptureQueriesContext(connection) as queries:
+                Movie.objects.upsert([
+                    Movie(title=f"Film {i}", director=f"Director {i}", genre=f"Genre {i}",
+                          year=1900 + i, rating=5.0)
+                    for i in range(start, start + count)
+                ])
+            return len(queries)
+
+        self.assertEqual(upsert(1, 0), upsert(20, 10))
+        self.assertMatchesRebuild()
+
+    def test_stats_endpoint(self):
+        """
+        Test the endpoint reports aggregates per dimension.
+        """
+        response = self.client.get(reverse('movie-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['dimension'], 'genre')
+        crime = response.data['results'][0]
+        self.assertEqual(crime, {
+            'key': 'crime', 'name': 'Crime', 'count': 2, 'rating_avg': 7.9,
+            'rating_min': 7.5, 'rating_max': 8.3, 'budget_total': 125000000,
+        })
+
+        response = self.client.get(reverse('movie-stats'), {'dimension': 'decade'})
+        self.assertEqual([(item['key'], item['count']) for item in response.data['results']],
+                         [('1990s', 2), ('2000s', 1)])
+
+    def test_stats_invalid_dimension(self):
+        """
+        Test an unknown dimension returns 400.
+        """
+        response = self.client.get(reverse('movie-stats'), {'dimension': 'studio'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LandingPageTestCase(TestCase):
+    """
+    Test cases for the cached landing page summary.
+    """
+
+    def setUp(self):
+        cache.clear()
+        Movie.objects.create(title="Heat", director="Michael Mann", genre="Crime",
+                             year=1995, rating=8.3)
+
+    def test_steady_state_makes_no_queries(self):
+        """
+        Test a repeat hit is served from the cache without touching the database.
+        """
+        url = reverse('api-home')
+        self.assertContains(self.client.get(url), 'Heat')
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, 'Heat')
+
+    def test_write_invalidates_summary(self):
+        """
+        Test a committed write shows up on the next hit.
+        """
+        url = reverse('api-home')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Movie.objects.create(title="Metropolis", director="Fritz Lang", genre="Sci-Fi",
+                                 year=1927, rating=8.3)
+
+        self.assertContains(self.client.get(url), 'Metropolis')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite pragmas')
+class SQLitePragmaTestCase(TestCase):
+    """
+    Test cases for the per-connection SQLite pragmas.
+    """
+
+    @override_settings(MOVIES={'SQLITE_PRAGMAS': {'cache_size': -4096, 'busy_timeout': 2500}})
+    def test_configured_pragmas_applied(self):
+        """
+        Test the configured pragmas are set on the connection.
+        """
+        before = read_pragmas(connection, ['cache_size', 'busy_timeout'])
+        try:
+            apply_pragmas(connection)
+            self.assertEqual(read_pragmas(connection, ['cache_size', 'busy_timeout']),
+                             {'cache_size': -4096, 'busy_timeout': 2500})
+        finally:
+            apply_pragmas(connection, before)
+
+    def test_invalid_pragma_name_rejected(self):
+        """
+        Test pragma names are validated before being interpolated.
+        """
+        with self.assertRaises(ValueError):
+            apply_pragmas(connection, {'cache_size = 0; DROP TABLE movies_movie; --': 1})
+
+
+@override_settings(MOVIES={'READ_REPLICAS': ['replica']})
+class ReplicaRouterTestCase(TestCase):
+    """
+    Test cases for read/write splitting and read-your-writes pinning.
+    """
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_replica_until_write(self):
+        """
+        Test reads use the replica until the scope writes a movie.
+        """
+        with routing_scope():
+            self.assertEqual(self.router.db_for_read(Movie), 'replica')
+            self.assertEqual(self.router.db_for_write(Movie), 'default')
+            self.assertEqual(self.router.db_for_read(Movie), 'default')
+
+    def test_unsafe_request_and_other_apps_use_primary(self):
+        """
+        Test pinned scopes and non-movies models read the primary.
+        """
+        from django.contrib.auth.models import User
+        with routing_scope(pinned=True):
+            self.assertEqual(self.router.db_for_read(Movie), 'default')
+        with routing_scope():
+            self.assertIsNone(self.router.db_for_read(User))
+        self.assertFalse(self.router.allow_migrate('replica', 'movies'))
+
+    def test_lagging_replica_skipped(self):
+        """
+        Test a client that wrote version N avoids replicas behind N.
+        """
+        with mock.patch.object(ReplicaRouter, 'replica_version', return_value=4):
+            with routing_scope(min_version=5):
+                self.assertEqual(self.router.db_for_read(Movie), 'default')
+            with routing_scope(min_version=4):
+                self.assertEqual(self.router.db_for_read(Movie), 'replica')
+
+    @override_settings(MOVIES={'READ_REPLICAS': ['default']})
+    def test_write_sets_version_cookie(self):
+        """
+        Test a writing request hands the client its catalog version.
+        """
+        response = self.client.post(reverse('movie-list'), {
+            'title': 'Heat', 'director': 'Michael Mann', 'genre': 'Crime',
+            'year': 1995, 'rating': 8.3,
+        }, content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(int(response.cookies['movies_rw'].value),
+                         CatalogState.objects.current().version)
+        self.assertNotIn('movies_rw', self.client.get(reverse('movie-list')).cookies)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Backup API replicas are SQLite files')
+class ReplicaSyncTestCase(TransactionTestCase):
+    """
+    Test cases for refreshing SQLite replicas with the backup API.
+
+    A TransactionTestCase: the backup cannot read a source connection that
+    holds an open write transaction.
+    """
+
+    def test_sync_replica_copies_primary(self):
+        """
+        Test the backup API copies the primary into a replica file.
+        """
+        Movie.objects.create(title="Heat", director="Michael Mann", genre="Crime",
+                             year=1995, rating=8.3)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'replica.sqlite3')
+            replica = {**connection.settings_dict, 'NAME': path}
+            with mock.patch.dict(connections.settings, {'replica': replica}):
+                sync_replica('replica')
+            copy = sqlite3.connect(path)
+            try:
+                titles = copy.execute('SELECT title FROM movies_movie').fetchall()
+            finally:
+                copy.close()
+        self.assertEqual(titles, [('Heat',)])
+
+
+class ConditionalRequestTestCase(APITestCase):
+    """
+    Test cases for ETag / Last-Modified conditional GETs.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.movie = Movie.objects.create(
+            title="Heat", director="Michael Mann", genre="Crime", year=1995, rating=8.3
+        )
+
+    def test_list_not_modified(self):
+        """
+        Test a matching If-None-Match returns 304 without touching movies.
+        """
+        url = reverse('movie-list')
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(any('"movies_movie"' in q['sql'] for q in ctx.captured_queries))
+
+    def test_etag_covers_query(self):
+        """
+        Test one query's ETag does not validate another query or format.
+        """
+        for number in range(25):
+            Movie.objects.create(title=f"Movie {number}", director="D", genre="Drama",
+                                 year=2000, rating=5.0)
+        url = reverse('movie-list')
+        etag = self.client.get(url, {'page': 1})['ETag']
+
+        response = self.client.get(url, {'page': 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        response = self.client.get(reverse('movie-top-rated'), {'page': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Parameter order does not matter
+        etag = self.client.get(url, {'ordering': 'title', 'page': 2})['ETag']
+        response = self.client.get(f'{url}?page=2&ordering=title', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        export = reverse('movie-export')
+        etag = self.client.get(export, HTTP_ACCEPT='text/csv')['ETag']
+        self.assertNotEqual(self.client.get(export)['ETag'], etag)
+        self.assertNotEqual(self.client.get(export, HTTP_ACCEPT='text/csv',
+                                            HTTP_ACCEPT_ENCODING='gzip')['ETag'], etag)
+        response = self.client.get(export, HTTP_ACCEPT='text/csv', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_top_rated_etag_changes_on_write(self):
+        """
+        Test a write invalidates the collection ETag.
+        """
+        url = reverse('movie-top-rated')
+        etag = self.client.get(url)['ETag']
+        Movie.objects.create(title="Ronin", director="John Frankenheimer",
+                             genre="Action", year=1998, rating=8.1)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_retrieve_last_modified(self):
+        """
+        Test the detail endpoint honours If-Modified-Since from updated_at.
+        """
+        url = reverse('movie-detail', kwargs={'pk': self.movie.pk})
+        last_modified = self.client.get(url)['Last-Modified']
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_updated_at_maintained_on_writes(self):
+        """
+        Test updated_at moves on save and on upsert.
+        """
+        before = self.movie.updated_at
+        self.movie.rating = 8.4
+        self.movie.save(update_fields=['rating'])
+        self.movie.refresh_from_db()
+        self.assertGreater(self.movie.updated_at, before)
+
+        saved = self.movie.updated_at
+        Movie.objects.upsert([Movie(title="Heat", director="Michael Mann",
+                                    genre="Crime", year=1995, rating=8.5)])
+        self.movie.refresh_from_db()
+        self.assertGreater(self.movie.updated_at, saved)
+        self.assertEqual(self.movie.created_at.date(), before.date())
+
+
+@override_settings(ROOT_URLCONF='movie_api.asgi_urls')
+class AsyncViewsTestCase(TestCase):
+    """
+    Test cases for the async read views served by the ASGI application.
+    """
+    READ_PATHS = [
+        '/api/movies/',
+        '/api/movies/?count=none',
+        '/api/movies/?pagination=cursor',
+        '/api/movies/top-rated/?min_rating=8',
+        '/api/movies/?ordering=title',
+        '/api/movies/?ordering=-rating,title&count=none',
+        '/api/movies/?ordering=title&pagination=cursor',
+        '/api/movies/?ordering=bogus',
+        '/api/movies/top-rated/?year=x',
+        '/api/movies/?count=bogus',
+        '/api/movies/9999/',
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.movie = Movie.objects.create(title="Heat", director="Michael Mann", genre="Crime",
+                                          year=1995, rating=8.3, budget=60000000)
+        Movie.objects.create(title="Amélie", director="Jean-Pierre Jeunet",
+                             genre="Comedy, Romance", year=2001, rating=8.3)
+        Movie.objects.create(title="Ronin", director="John Frankenheimer", genre="Action",
+                             year=1998, rating=7.2)
+
+    def viewset_get(self, path):
+        with override_settings(ROOT_URLCONF='movie_api.urls'):
+            return self.client.get(path)
+
+    async def assert_matches_viewset(self, paths):
+        with mock.patch('movies.async_views.viewset_view') as fallback:
+            for path in paths:
+                await cache.aclear()
+                response = await self.async_client.get(path)
+                await cache.aclear()
+                expected = await sync_to_async(self.viewset_get)(path)
+
+                self.assertEqual(response.status_code, expected.status_code, path)
+                self.assertEqual(response.get('ETag'), expected.get('ETag'), path)
+                self.assertEqual(json.loads(response.content), json.loads(expected.content), path)
+        fallback.assert_not_called()
+
+    async def test_reads_match_viewset(self):
+        """
+        Test the async views return the ViewSet's responses.
+        """
+        await self.assert_matches_viewset(
+            self.READ_PATHS + [f'/api/movies/{self.movie.pk}/']
+        )
+
+    @override_settings(MOVIES={'FAST_SERIALIZATION': False})
+    async def test_reads_match_viewset_with_model_serializer(self):
+        """
+        Test the async views also match with MovieSerializer output.
+        """
+        await self.assert_matches_viewset(self.READ_PATHS[:4])
+
+    async def test_conditional_and_cached(self):
+        """
+        Test async reads answer If-None-Match and use the response cache.
+        """
+        first = await self.async_client.get('/api/movies/')
+        second = await self.async_client.get('/api/movies/')
+        response = await self.async_client.get(
+            '/api/movies/', headers={'if-none-match': first['ETag']}
+        )
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_export_streams(self):
+        """
+        Test the async export streams filtered CSV, gzipped on request.
+        """
+        url = '/api/movies/export/?output=csv&min_rating=8'
+        response = await self.async_client.get(url)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        compressed = await self.async_client.get(url, headers={'accept-encoding': 'gzip'})
+
+        rows = list(csv.reader(io.StringIO(body.decode('utf-8'))))
+        self.assertEqual([row[1] for row in rows[1:]], ['Heat', 'Amélie'])
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join([chunk async for chunk in compressed.streaming_content])), body
+        )
+
+    async def test_export_accept_header(self):
+        """
+        Test the async export negotiates the format from Accept like the ViewSet.
+        """
+        url = '/api/movies/export/'
+        response = await self.async_client.get(url, headers={'accept': 'text/csv'})
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertTrue(body.startswith(b'id,title,'))
+
+        response = await self.async_client.get(url, headers={'accept': 'application/x-ndjson'})
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(body.splitlines()), 3)
+
+        response = await self.async_client.get(url, headers={'accept': 'application/xml'})
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+    async def test_writes_and_browsable_api_use_viewset(self):
+        """
+        Test writes and HTML requests on async URLs reach the ViewSet.
+        """
+        response = await self.async_client.post(
+            '/api/movies/',
+            {'title': 'Ronin', 'director': 'John Frankenheimer', 'genre': 'Action',
+             'year': 1999, 'rating': 7.0},
+            content_type='application/json',
+        )
+        html = await self.async_client.get('/api/movies/', headers={'accept': 'text/html'})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(await Movie.objects.acount(), 4)
+        self.assertIn('text/html', html['Content-Type'])
+
+
+class RequestTimingTestCase(APITestCase):
+    """
+    Test cases for the Server-Timing middleware.
+    """
+
+    def setUp(self):
+        cache.clear()
+        Movie.objects.create(title="Heat", director="Michael Mann", genre="Crime",
+                             year=1995, rating=8.3)
+
+    def timings(self, response):
+        return {
+            metric.split(';')[0]: metric
+            for metric in response['Server-Timing'].split(', ')
+        }
+
+    @override_settings(MOVIES={'TIMING_SAMPLE_RATE': 1})
+    def test_sampled_request_reports_breakdown(self):
+        """
+        Test a sampled request reports queries, phases and a log line.
+        """
+        with self.assertLogs('movies.timing', 'INFO') as logs:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse('movie-list'))
+
+        timings = self.timings(response)
+        self.assertEqual(list(timings), ['db', 'serialize', 'render', 'total'])
+        self.assertIn(f'desc="{len(ctx.captured_queries)} queries"', timings['db'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['queries'], len(ctx.captured_queries))
+        self.assertEqual(record['status'], 200)
+        self.assertNotIn('slow', record)
+
+    @override_settings(MOVIES={'TIMING_SAMPLE_RATE': 0})
+    def test_unsampled_request_reports_total(self):
+        """
+        Test a request outside the sample only gets its total.
+        """
+        with self.assertNoLogs('movies.timing', 'INFO'):
+            response = self.client.get(reverse('movie-list'))
+        self.assertEqual(list(self.timings(response)), ['total'])
+
+    @override_settings(MOVIES={'TIMING_SAMPLE_RATE': 1, 'TIMING_SLOW_MS': 0})
+    def test_slow_request_logs_sql(self):
+        """
+        Test a slow request is logged at WARNING with its SQL.
+        """
+        with self.assertLogs('movies.timing', 'WARNING') as logs:
+            self.client.get(reverse('movie-top-rated'), {'year': 1995})
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertTrue(record['slow'])
+        self.assertTrue(any('"movies_movie"' in query['sql'] for query in record['sql']))
+
+    @override_settings(MOVIES={'TIMING_SAMPLE_RATE': 0, 'TIMING_SLOW_MS': 0,
+                               'TIMING_SLOW_SQL_LIMIT': 1})
+    def test_unsampled_slow_request_logs_sql(self):
+        """
+        Test a slow request outside the sample still logs its slowest SQL.
+        """
+        with self.assertLogs('movies.timing', 'WARNING') as logs:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse('movie-top-rated'), {'year': 1995})
+
+        self.assertEqual(list(self.timings(response)), ['total'])
+        self.assertGreater(len(ctx.captured_queries), 1)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertTrue(record['slow'])
+        self.assertEqual(len(record['sql']), 1)
+        self.assertIn('sql', record['sql'][0])
+
+    @override_settings(MOVIES={'TIMING_SAMPLE_RATE': 1}, ROOT_URLCONF='movie_api.asgi_urls')
+    async def test_async_view_queries_counted(self):
+        """
+        Test queries the async ORM runs in its thread are counted.
+        """
+        response = await self.async_client.get('/api/movies/')
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+
+class MetricsTestCase(APITestCase):
+    """
+    Test cases for the /metrics endpoint.
+    """
+
+    def setUp(self):
+        cache.clear()
+        Movie.objects.create(title="Heat", director="Michael Mann", genre="Crime",
+                             year=1995, rating=8.3)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        overrides = override_settings(MOVIES={'METRICS_DIR': self.directory})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def samples(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        return dict(
+            line.rsplit(' ', 1) for line in response.content.decode().splitlines()
+            if not line.startswith('#')
+        )
+
+    def test_request_and_query_metrics(self):
+        """
+        Test requests are counted per view with their latency and SQL.
+        """
+        self.client.get(reverse('movie-list'))
+        self.client.get(reverse('movie-list'))
+        self.client.get(reverse('movie-detail', args=[999999]))
+
+        samples = self.samples()
+        self.assertEqual(
+            samples['movies_http_requests_total{view="movie-list",method="GET",status="200"}'],
+            '2.0',
+        )
+        self.assertEqual(
+            samples['movies_http_requests_total{view="movie-detail",method="GET",status="404"}'],
+            '1.0',
+        )
+        self.assertEqual(
+            samples['movies_http_request_duration_seconds_bucket{view="movie-list",method="GET",le="+Inf"}'],
+            '2.0',
+        )
+        self.assertEqual(samples['movies_response_cache_total{view="movie-list",result="HIT"}'], '1.0')
+        self.assertGreater(float(samples['movies_http_request_queries_sum{view="movie-list"}']), 0)
+        self.assertGreater(float(samples['movies_db_query_duration_seconds_count{alias="default"}']), 0)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """
+        Test histogram buckets count every observation at or below them.
+        """
+        for value in (0.001, 0.02, 0.02, 30):
+            metrics.IMPORT_SECONDS.observe(value, mode='test')
+
+        samples = self.samples()
+        bucket = 'movies_import_duration_seconds_bucket{{mode="test",le="{}"}}'
+        self.assertEqual(samples[bucket.format('0.1')], '3.0')
+        self.assertEqual(samples[bucket.format('10.0')], '3.0')
+        self.assertEqual(samples[bucket.format('30.0')], '4.0')
+        self.assertEqual(samples[bucket.format('+Inf')], '4.0')
+        self.assertEqual(samples['movies_import_duration_seconds_count{mode="test"}'], '4.0')
+
+    def test_processes_are_summed(self):
+        """
+        Test /metrics adds up the samples of every worker process.
+        """
+        def work():
+            metrics.REQUESTS.inc(3, view='api-home', method='GET', status=200)
+
+        process = multiprocessing.get_context('fork').Process(target=work)
+        process.start()
+        process.join()
+        self.client.get(reverse('api-home'))
+
+        samples = self.samples()
+        self.assertEqual(
+            samples['movies_http_requests_total{view="api-home",method="GET",status="200"}'],
+            '4.0',
+        )
+
+    def test_import_throughput(self):
+        """
+        Test imports report their rows and run time.
+        """
+        BulkImporter().load([
+            {'title': f'Movie {i}', 'director': 'D', 'genre': 'Drama', 'year': 2000, 'rating': 7.0}
+            for i in range(3)
+        ])
+
+        samples = self.samples()
+        self.assertEqual(samples['movies_import_rows_total{mode="append"}'], '3.0')
+        self.assertEqual(samples['movies_import_duration_seconds_count{mode="append"}'], '1.0')
+
+    def test_disabled(self):
+        """
+        Test nothing is recorded with MOVIES['METRICS'] off.
+        """
+        with self.settings(MOVIES={'METRICS': False, 'METRICS_DIR': self.directory}):
+            self.client.get(reverse('movie-list'))
+            self.assertNotIn('movies_http_requests_total{', self.client.get('/metrics').content.decode())
+
+
+class SlowQueryLogTestCase(APITestCase):
+    """
+    Test cases for the slow query log.
+    """
+
+    def setUp(self):
+        cache.clear()
+        Movie.objects.create(title="Heat", director="Michael Mann", genre="Crime",
+                             year=1995, rating=8.3)
+        from django.contrib.auth.models import User
+        self.staff = User.objects.create(username='staff', is_staff=True)
+
+    def logged(self, **movies_settings):
+        """
+        Run a full-scan, sorted query with ``movies_settings`` and return the log.
+        """
+        with self.settings(MOVIES={'SLOW_QUERY_MS': 0, **movies_settings}):
+            list(Movie.objects.filter(director__icontains='mann').order_by('budget'))
+        slow_queries.flush()
+        return slow_queries.slow_queries()
+
+    def test_slow_query_logged_with_plan(self):
+        """
+        Test a slow query is logged with its parameters, call site and plan.
+        """
+        entry = next(entry for entry in self.logged() if 'ORDER BY' in entry['sql'])
+
+        self.assertEqual(entry['db'], 'default')
+        self.assertEqual(entry['params'], ['%mann%'])
+        self.assertIn('in logged', entry['call_site'][-1])
+        self.assertTrue(entry['call_site'][-1].startswith('movies/tests.py:'))
+        self.assertIn('movies_movie', '\n'.join(entry['plan']))
+        self.assertEqual(entry['flags'], ['full_scan', 'temp_sort'])
+
+    def test_fast_queries_not_logged(self):
+        """
+        Test queries under the threshold are not logged.
+        """
+        list(Movie.objects.filter(director__icontains='mann'))
+        slow_queries.flush()
+        self.assertEqual(slow_queries.slow_queries(), [])
+
+    def test_log_is_bounded(self):
+        """
+        Test the log keeps only the newest SLOW_QUERY_LOG_SIZE entries.
+        """
+        self.logged()
+        self.assertEqual(len(self.logged(SLOW_QUERY_LOG_SIZE=2)), 2)
+
+    def test_plan_flags(self):
+        """
+        Test full scans and sorts are flagged in SQLite and PostgreSQL plans.
+        """
+        self.assertEqual(slow_queries.plan_flags([
+            'SCAN movies_movie', 'USE TEMP B-TREE FOR ORDER BY',
+        ]), ['full_scan', 'temp_sort'])
+        self.assertEqual(slow_queries.plan_flags([
+            'SEARCH movies_movie USING INDEX movies_genre_idx (genre=?)',
+            'SCAN movies_movie USING INDEX movies_rating_idx',
+        ]), [])
+        self.assertEqual(slow_queries.plan_flags([
+            'Limit  (cost=30.2..30.3 rows=20 width=96)',
+            '  ->  Sort  (cost=30.2..30.9 rows=270 width=96)',
+            '        ->  Seq Scan on movies_movie  (cost=0.00..23.0 rows=270 width=96)',
+        ]), ['full_scan', 'temp_sort'])
+
+    def test_staff_only(self):
+        """
+        Test only staff can read and clear the log.
+        """
+        self.logged()
+        url = reverse('slow-queries')
+        self.assertIn(self.client.get(url).status_code,
+                      (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['threshold_ms'], 100)
+        self.assertTrue(response.data['results'])
+
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(url).data['results'], [])
+
+
+class BulkImporterTestCase(TestCase):
+    """
+    Test cases for the batched CSV bulk-load engine.
+    """
+
+    IMDB_CSV = (
+        "Rank,Title,Genre,Director,Year,Rating,Revenue (Millions)\n"
+        "1,Guardians of the Galaxy,\"Action,Adventure,Sci-Fi\",James Gunn,2014,8.1,333.13\n"
+        "2,Prometheus,\"Adventure,Mystery,Sci-Fi\",Ridley Scott,2012,7.0,nan\n"
+        "3,Broken Row,Drama,Someone,not-a-year,7.5,\n"
+        "4,Split,\"Horror,Thriller\",M. Night Shyamalan,2016,7.3,138.12\n"
+    )
+
+    def test_iter_csv_rows_parses_imdb_format(self):
+        """
+        Test rows are parsed and bad rows are counted, not raised.
+        """
+        stats = ImportStats()
+        rows = list(iter_csv_rows(io.StringIO(self.IMDB_CSV), stats=stats))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(stats.skipped, 1)
+        self.assertEqual(stats.errors[0][0], 4)
+        self.assertEqual(rows[0]['budget'], 333130000)
+        self.assertIsNone(rows[1]['budget'])
+        self.assertEqual(rows[0]['genre'], 'Action,Adventure,Sci-Fi')
+
+    def test_iter_csv_rows_rejects_unknown_format(self):
+        """
+        Test an unrecognized header raises ValueError.
+        """
+        with self.assertRaises(ValueError):
+            list(iter_csv_rows(io.StringIO("foo,bar\n1,2\n")))
+
+    def test_load_batches_rows(self):
+        """
+        Test rows are inserted in batches with progress callbacks.
+        """
+        if supports_copy(connection):
+            self.skipTest('PostgreSQL loads with COPY (see PostgresFastPathTestCase)')
+        progress = []
+        importer = BulkImporter(batch_size=2, progress=lambda s: progress.append(s.created))
+        rows = iter_csv_rows(io.StringIO(self.IMDB_CSV))
+
+        with CaptureQueriesContext(connection) as ctx:
+            stats = importer.load(rows)
+
+        movie_writes = [q for q in ctx.captured_queries
+                        if q['sql'].startswith('INSERT INTO "movies_movie"')]
+        self.assertEqual(len(movie_writes), 2)
+
+        self.assertEqual(stats.created, 3)
+        self.assertEqual(progress, [2, 3])
+        self.assertEqual(Movie.objects.count(), 3)
+        self.assertGreater(stats.rows_per_second, 0)
+
+    def test_load_replace_swaps_catalog(self):
+        """
+        Test replace mode deletes existing movies in the same transaction.
+        """
+        Movie.objects.create(title="Old", director="Someone", genre="Drama",
+                             year=2000, rating=5.0)
+        rows = iter_csv_rows(io.StringIO(self.IMDB_CSV))
+        BulkImporter().load(rows, mode='replace')
+
+        self.assertEqual(Movie.objects.count(), 3)
+        self.assertFalse(Movie.objects.filter(title="Old").exists())
+
+    def test_load_staged_swaps_catalog(self):
+        """
+        Test staged mode swaps in the new catalog and empties the staging table.
+        """
+        Movie.objects.create(title="Old", director="Someone", genre="Drama",
+                             year=2000, rating=5.0)
+        rows = iter_csv_rows(io.StringIO(self.IMDB_CSV))
+        stats = BulkImporter(batch_size=2).load(rows, mode='staged')
+
+        self.assertEqual(stats.created, 3)
+        self.assertIsNotNone(stats.swap_seconds)
+        self.assertEqual(
+            sorted(Movie.objects.values_list('title', flat=True)),
+            ['Guardians of the Galaxy', 'Prometheus', 'Split'],
+        )
+        self.assertEqual(StagedMovie.objects.count(), 0)
+        self.assertEqual(
+            sorted(Movie.objects.with_genre('sci-fi').values_list('title', flat=True)),
+            ['Guardians of the Galaxy', 'Prometheus'],
+        )
+
+    def test_load_staged_rejects_short_catalog(self):
+        """
+        Test a staged catalog below min_rows leaves the live catalog untouched.
+        """
+        Movie.objects.create(title="Old", director="Someone", genre="Drama",
+                             year=2000, rating=5.0)
+        rows = iter_csv_rows(io.StringIO(self.IMDB_CSV))
+
+        with self.assertRaises(StagingValidationError):
+            BulkImporter().load(rows, mode='staged', min_rows=10)
+
+        self.assertEqual(list(Movie.objects.values_list('title', flat=True)), ['Old'])
+        self.assertEqual(StagedMovie.objects.count(), 0)
+
+    def test_load_delta_writes_only_changes(self):
+        """
+        Test delta mode inserts new rows, updates changed rows and skips the rest.
+        """
+        rows = list(iter_csv_rows(io.StringIO(self.IMDB_CSV)))
+        BulkImporter().load(rows[:2])
+        unchanged = Movie.objects.get(title="Guardians of the Galaxy")
+        Movie.objects.filter(title="Prometheus").update(rating=1.0, fingerprint='stale')
+        Movie.objects.create(title="Gone", director="Someone", genre="Drama",
+                             year=2000, rating=5.0)
+
+        stats = BulkImporter().load(rows, mode='delta', prune=True)
+
+        self.assertEqual(
+            (stats.created, stats.updated, stats.unchanged, stats.deleted),
+            (1, 1, 1, 1),
+        )
+        self.assertEqual(Movie.objects.get(title="Prometheus").rating, 7.0)
+        self.assertEqual(Movie.objects.get(title="Guardians of the Galaxy").pk, unchanged.pk)
+        self.assertFalse(Movie.objects.filter(title="Gone").exists())
+
+    def test_load_delta_noop_when_unchanged(self):
+        """
+        Test a repeated delta import reads once and writes nothing.
+        """
+        rows = list(iter_csv_rows(io.StringIO(self.IMDB_CSV)))
+        BulkImporter().load(rows)
+
+        # savepoint + one bulk read + release
+        with self.assertNumQueries(3):
+            stats = BulkImporter().load(rows, mode='delta')
+
+        self.assertEqual(stats.unchanged, 3)
+        self.assertEqual(stats.created + stats.updated, 0)
+
+    def test_save_maintains_fingerprint(self):
+        """
+        Test Movie.save() keeps the fingerprint in sync with the content.
+        """
+        movie = Movie.objects.create(title="Fp", director="Someone", genre="Drama",
+                                     year=2000, rating=5.0)
+        original = movie.fingerprint
+        movie.rating = 6.0
+        movie.save(update_fields=['rating'])
+        movie.refresh_from_db()
+
+        self.assertEqual(len(original), 40)
+        self.assertNotEqual(movie.fingerprint, original)
+        self.assertEqual(movie.fingerprint, movie.compute_fingerprint())
+
+
+@unittest.skipUnless(supports_copy(connection), 'COPY fast path needs PostgreSQL with psycopg 3')
+class PostgresFastPathTestCase(TestCase):
+    """
+    Test cases for the PostgreSQL COPY import path and trigram indexes.
+    """
+
+    CSV = (
+        "title,director,genre,year,rating,budget\n"
+        "Heat,Michael Mann,Crime,1995,8.2,60000000\n"
+        "Ronin,John Frankenheimer,\"Action,Thriller\",1998,7.2,\n"
+        "Heat,Michael Mann,\"Crime,Drama\",1995,8.3,60000000\n"
+    )
+
+    def load(self, mode):
+        return BulkImporter(batch_size=2).load(iter_csv_rows(io.StringIO(self.CSV)), mode=mode)
+
+    def test_copy_upsert_last_row_wins(self):
+        """
+        Test COPY loads upsert by natural key and link genres.
+        """
+        Movie.objects.create(title="Ronin", director="Someone", genre="Drama", year=1998, rating=5.0)
+        with CaptureQueriesContext(connection) as ctx:
+            stats = self.load('append')
+
+        self.assertTrue(any('DISTINCT ON' in q['sql'] for q in ctx.captured_queries))
+        self.assertEqual(stats.created, 3)
+        heat = Movie.objects.get(title="Heat")
+        self.assertEqual(heat.rating, 8.3)
+        self.assertEqual(sorted(heat.genres.values_list('key', flat=True)), ['crime', 'drama'])
+        ronin = Movie.objects.get(title="Ronin")
+        self.assertEqual(ronin.director, "John Frankenheimer")
+        self.assertEqual(ronin.fingerprint, ronin.compute_fingerprint())
+        self.assertEqual(CatalogState.objects.current().row_count, 2)
+
+    def test_copy_staged_load(self):
+        """
+        Test staged mode COPYs into the staging table and swaps it in.
+        """
+        self.CSV = self.CSV.rsplit('Heat', 1)[0]
+        self.load('staged')
+        self.assertEqual(sorted(Movie.objects.values_list('title', flat=True)), ['Heat', 'Ronin'])
+        self.assertFalse(StagedMovie.objects.exists())
+
+    def test_trigram_indexes(self):
+        """
+        Test the icontains trigram indexes exist when pg_trgm is available.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                self.skipTest('pg_trgm not installed on this server')
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE indexname LIKE '%%_trgm'")
+            names = {row[0] for row in cursor.fetchall()}
+        self.assertEqual(names, {'movies_movie_title_trgm', 'movies_movie_director_trgm'})
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite-specific')
+class QueryPlanTestCase(APITestCase):
+    """
+    Test the hot endpoint queries are served by an index, not a sort.
+    """
+
+    def setUp(self):
+        Movie.objects.upsert([
+            Movie(title=f"Movie {i}", director="Director", genre="Drama",
+                  year=1950 + i % 70, rating=(i % 100) / 10)
+            for i in range(200)
+        ])
+
+    def explain_page_query(self, url, params=None):
+        """
+        Request ``url`` and return the query plan of its page SELECT.
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        page_queries = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "movies_movie"' in q['sql']
+            and 'ORDER BY' in q['sql']
+        ]
+        self.assertEqual(len(page_queries), 1, page_queries)
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + page_queries[0])
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexedWithoutSort(self, plan, index_name):
+        self.assertFalse(any('TEMP B-TREE' in step for step in plan), plan)
+        self.assertTrue(any(index_name in step for step in plan), plan)
+
+    def test_list_uses_year_rating_index(self):
+        plan = self.explain_page_query(reverse('movie-list'))
+        self.assertIndexedWithoutSort(plan, 'movies_year_rating_idx')
+
+    def test_top_rated_uses_rating_year_index(self):
+        plan = self.explain_page_query(reverse('movie-top-rated'), {'min_rating': 8.0})
+        self.assertIndexedWithoutSort(plan, 'movies_rating_year_idx')
+
+    def test_top_rated_year_filter_uses_index(self):
+        plan = self.explain_page_query(
+            reverse('movie-top-rated'), {'min_rating': 5.0, 'year': 1990}
+        )
+        self.assertIndexedWithoutSort(plan, 'movies_year_rating_idx')
+
+    def test_top_rated_genre_filter_uses_index(self):
+        plan = self.explain_page_query(
+            reverse('movie-top-rated'), {'min_rating': 8.0, 'genre': 'Drama'}
+        )
+        self.assertIndexedWithoutSort(plan, 'movies_rating_year_idx')
+        self.assertTrue(
+            any('movies_moviegenre' in step and 'INDEX' in step for step in plan), plan
+        )
+
+    def test_list_cursor_page_seeks_index(self):
+        first = self.client.get(reverse('movie-list'), {'pagination': 'cursor'})
+        plan = self.explain_page_query(first.data['next'])
+        self.assertIndexedWithoutSort(plan, 'movies_year_rating_idx')
+        self.assertTrue(any(step.startswith('SEARCH') for step in plan), plan)
+
+
+class PerformanceBudgetTestCase(APITestCase):
+    """
+    Test each endpoint stays within its SQL query and latency budget.
+
+    Budgets are (most SQL statements, median milliseconds) per request,
+    measured with an empty response cache against a catalog of
+    MOVIES_PERF_CATALOG_SIZE movies (2000). Latency is only checked with
+    MOVIES_PERF_LATENCY set, as wall-clock times depend on the machine;
+    MOVIES_PERF_LATENCY_SCALE multiplies the latency budgets for slower
+    ones. A request over budget fails with its SQL, statements past the
+    budget marked ``+``.
+    """
+    catalog_size = int(os.environ.get('MOVIES_PERF_CATALOG_SIZE', 2000))
+    check_latency = bool(os.environ.get('MOVIES_PERF_LATENCY'))
+    latency_scale = float(os.environ.get('MOVIES_PERF_LATENCY_SCALE', 1))
+    runs = 5
+
+    # Writes also keep MovieStat in step, with the same statements however
+    # many groups the movie is in: one upsert of the deltas, at most one
+    # delete of emptied groups and, when a removed rating was a group's
+    # minimum or maximum, one re-aggregation per dimension (four) and one
+    # upsert of the new extremes. The create budget allows for a new genre
+    # name, which takes two more statements.
+    budgets = {
+        'list': (3, 25),
+        'retrieve': (3, 20),
+        'create': (3 + 1 + 3 + 2, 40),
+        'update': (5 + 3 + 4 + 3, 80),
+        'destroy': (4 + 3 + 4, 60),
+        'top_rated': (4, 50),
+        'api_home': (4, 20),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        genres = ['Drama', 'Crime', 'Comedy', 'Action', 'Drama, Crime', 'Sci-Fi']
+        BulkImporter().load(
+            {'title': f'Movie {i}', 'director': f'Director {i % 97}',
+             'genre': genres[i % len(genres)], 'year': 1950 + i % 70,
+             'rating': (i * 37 % 100) / 10, 'budget': 1000000 + i}
+            for i in range(cls.catalog_size)
+        )
+        cls.movie_ids = list(Movie.objects.order_by('id').values_list('id', flat=True))
+
+    @staticmethod
+    def sql_shape(sql):
+        """
+        Return ``sql`` with its column list and literal values elided.
+        """
+        sql = re.sub(r'^SELECT .+? FROM ', 'SELECT ... FROM ', sql)
+        sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+        return re.sub(r'\b\d+(\.\d+)?\b', '?', sql)
+
+    def query_report(self, name, queries, max_queries):
+        shapes = [self.sql_shape(query['sql']) for query in queries]
+        lines = [f'{name}: {len(queries)} SQL statements, budget {max_queries}']
+        repeated = [(shape, shapes.count(shape)) for shape in dict.fromkeys(shapes)]
+        lines += [f'  {count}x {shape}' for shape, count in repeated if count > 1]
+        lines += [
+            f"{'+' if number > max_queries else ' '} {number:3}. ({query['time']}s) {query['sql']}"
+            for number, query in enumerate(queries, 1)
+        ]
+        return '\n'.join(lines)
+
+    def assertWithinBudget(self, name, request):
+        """
+        Run ``request(run)`` ``runs`` times after a warm-up and check the
+        query count of every run and the median latency.
+        """
+        max_queries, max_ms = self.budgets[name]
+        max_ms *= self.latency_scale
+        timings = []
+        for run in range(self.runs + 1):
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = request(run)
+                elapsed = (time.perf_counter() - started) * 1000
+            self.assertLess(response.status_code, 400, response.content[:500])
+            if run == 0:
+                continue
+            timings.append(elapsed)
+            self.assertLessEqual(
+                len(ctx.captured_queries), max_queries,
+                '\n' + self.query_report(name, ctx.captured_queries, max_queries),
+            )
+        if not self.check_latency:
+            return
+        median = sorted(timings)[len(timings) // 2]
+        self.assertLessEqual(
+            median, max_ms,
+            f'{name}: median {median:.1f} ms, budget {max_ms:.0f} ms '
+            f'({self.catalog_size} movies)\n'
+            + self.query_report(name, ctx.captured_queries, max_queries),
+        )
+
+    def movie_payload(self, run):
+        return {'title': f'Budget {run}', 'director': 'Director', 'genre': 'Drama',
+                'year': 2001, 'rating': 5 + run / 10, 'budget': 1000}
+
+    def test_list(self):
+        self.assertWithinBudget('list', lambda run: self.client.get(
+            reverse('movie-list'), {'page': run % 3 + 1}))
+
+    def test_retrieve(self):
+        self.assertWithinBudget('retrieve', lambda run: self.client.get(
+            reverse('movie-detail', args=[self.movie_ids[run * 7]])))
+
+    def test_create(self):
+        self.assertWithinBudget('create', lambda run: self.client.post(
+            reverse('movie-list'), self.movie_payload(run), format='json'))
+
+    def test_update(self):
+        self.assertWithinBudget('update', lambda run: self.client.put(
+            reverse('movie-detail', args=[self.movie_ids[0]]),
+            self.movie_payload(run), format='json'))
+
+    def test_destroy(self):
+        # Every sixth seeded movie has the one genre 'Crime'
+        self.assertWithinBudget('destroy', lambda run: self.client.delete(
+            reverse('movie-detail', args=[self.movie_ids[run * 6 + 1]])))
+
+    def test_top_rated(self):
+        self.assertWithinBudget('top_rated', lambda run: self.client.get(
+            reverse('movie-top-rated'), {'genre': 'Drama', 'min_rating': 5}))
+
+    def test_api_home(self):
+        self.assertWithinBudget('api_home', lambda run: self.client.get(reverse('api-home')))
@@ -0,0 +1,145 @@
+"""
+Per-request timing of SQL, serialization and rendering.
+
+RequestTimingMiddleware opens a RequestTimer for each sampled request,
+and a plain one (query count, SQL time and the few slowest statements)
+for the other requests. While it is open:
+
+- ``record_query``, an execute wrapper installed on every database
+  connection as it opens, records each statement and its duration
+- functions decorated with ``timed()`` (serializers, the JSON renderer)
+  add their time to a named phase, less any SQL they ran (detailed
+  timers only)
+
+The timer lives in a ContextVar, so it follows the request into async
+views and the threads they run ORM calls in. Outside a request the
+decorators cost one ContextVar lookup. The wrapper always times the
+statement, for the query histogram (movies/metrics.py) and the slow query
+log (movies/slow_queries.py).
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from heapq import heappush, heappushpop
+
+from . import metrics, slow_queries
+from .conf import get_setting
+
+
+SERIALIZE = 'serialize'
+RENDER = 'render'
+
+_timer = ContextVar('movies_request_timer', default=None)
+
+
+class RequestTimer:
+    """
+    Accumulates query and phase timings for one request.
+
+    A timer that is not ``detailed`` only counts queries and their time,
+    and keeps the ``keep`` slowest statements.
+    """
+
+    def __init__(self, detailed=True, keep=0):
+        self.detailed = detailed
+        self.keep = keep
+        self.queries = []   # (alias, sql, params, seconds)
+        self.slowest = []   # min-heap of (seconds, n, alias, sql, params)
+        self.query_count = 0
+        self.db_time = 0.0
+        self.phases = {}    # phase name -> seconds, excluding SQL
+
+    def add_query(self, alias, sql, params, seconds):
+        if self.detailed:
+            self.queries.append((alias, sql, params, seconds))
+        elif self.keep:
+            entry = (seconds, self.query_count, alias, sql, params)
+            if len(self.slowest) < self.keep:
+                heappush(self.slowest, entry)
+            elif seconds > self.slowest[0][0]:
+                heappushpop(self.slowest, entry)
+        self.query_count += 1
+        self.db_time += seconds
+
+    def slowest_queries(self, limit):
+        """
+        Return up to ``limit`` (alias, sql, params, seconds), slowest first.
+        """
+        if self.detailed:
+            queries = self.queries
+        else:
+            queries = [(alias, sql, params, seconds)
+                       for seconds, _, alias, sql, params in self.slowest]
+        return sorted(queries, key=lambda query: -query[3])[:limit]
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        db_before = self.db_time
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started - (self.db_time - db_before)
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+
+def current_timer():
+    return _timer.get()
+
+
+@contextmanager
+def timing_scope(detailed=True, keep=0):
+    """
+    Open a RequestTimer for the code run inside the block.
+    """
+    timer = RequestTimer(detailed, keep)
+    token = _timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _timer.reset(token)
+
+
+def timed(name):
+    """
+    Decorator adding the function's run time to the ``name`` phase.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timer = _timer.get()
+            if timer is None or not timer.detailed:
+                return func(*args, **kwargs)
+            with timer.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper recording the statement on the current timer, in the
+    query latency histogram and, when slow, in the slow query log.
+    """
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - started
+        connection = context['connection']
+        timer = _timer.get()
+        if timer is not None:
+            timer.add_query(connection.alias, sql, None if many else params, seconds)
+        if get_setting('METRICS'):
+            metrics.QUERY_SECONDS.observe(seconds, alias=connection.alias)
+        if slow_queries.is_slow(seconds):
+            slow_queries.capture(connection, sql, params, many, seconds)
+
+
+def install_query_timer(connection):
+    """
+    Add record_query to ``connection`` (once; it survives reconnects).
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -3,7 +3,7 @@ URL routing for movies app.
 """
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MovieViewSet
+from .views import MovieViewSet, SlowQueryView
 
 # Create router and register viewset
 router = DefaultRouter()
@@ -11,4 +11,5 @@ router.register(r'movies', MovieViewSet, basename='movie')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('slow-queries/', SlowQueryView.as_view(), name='slow-queries'),
 ]
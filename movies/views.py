@@ -3,18 +3,83 @@ ViewSet for Movie API endpoints.
 """
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.db import transaction
 from django.db.models import Q
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
-from .models import Movie
-from .serializers import MovieSerializer
+from .autocomplete import MAX_RESULTS as AUTOCOMPLETE_MAX_RESULTS
+from .autocomplete import autocomplete as autocomplete_service
+from .conditional import catalog_condition, export_condition, movie_condition
+from .conf import get_setting
+from .exports import EXPORT_FORMATS, NDJSON, accepts_gzip, export_format, stream_export
+from .models import STAT_FIELDS, Genre, Movie, MovieStat, bulk_catalog_write
+from .pagination import MoviePagination
+from .response_cache import cached_response
+from .search import search_movies
+from . import slow_queries
+from .renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer
+from .serializers import MovieRowSerializer, MovieSerializer, MovieStatSerializer, MovieUpsertSerializer
+
+
+# Renderers the export action negotiates with: ``Accept:
+# application/x-ndjson`` or ``text/csv`` pick the format when ?output= is
+# absent. Errors are rendered as JSON.
+EXPORT_RENDERERS = [FastJSONRenderer, NDJSONRenderer, CSVRenderer, BrowsableAPIRenderer]
+
+
+# Largest page the search endpoint returns
+SEARCH_MAX_LIMIT = 100
+
+# Largest page the stats endpoint returns
+STATS_MAX_LIMIT = 1000
+
+
+def filter_movies(params, default_min_rating=None):
+    """
+    Apply the min_rating, genre and year filters from ``params``.
+
+    Returns ``(queryset, None)``, or ``(None, message)`` when a parameter
+    is invalid.
+    """
+    # Get query parameters with defaults
+    min_rating = params.get('min_rating', default_min_rating)
+    genre = params.get('genre', None)
+    year = params.get('year', None)
+
+    queryset = Movie.objects.all()
+
+    # Filter by rating if a threshold applies
+    if min_rating is not None:
+        try:
+            min_rating = float(min_rating)
+        except (ValueError, TypeError):
+            return None, 'min_rating must be a valid number'
+        queryset = queryset.filter(rating__gte=min_rating)
+
+    # Apply genre filter if provided (case-insensitive genre match)
+    if genre:
+        queryset = queryset.with_genre(genre)
+
+    # Apply year filter if provided
+    if year:
+        try:
+            year = int(year)
+            queryset = queryset.filter(year=year)
+        except (ValueError, TypeError):
+            return None, 'year must be a valid integer'
+
+    return queryset, None
 
 
 @extend_schema_view(
     list=extend_schema(
         summary="List all movies",
-        description="Retrieve a paginated list of all movies in the database. Returns 20 movies per page.",
+        description="Retrieve a paginated list of all movies in the database. Returns 20 movies per page. "
+                    "Add ?pagination=cursor for keyset pagination and follow the next/previous links.",
         tags=["Movies"],
     ),
     retrieve=extend_schema(
@@ -73,6 +138,15 @@ class MovieViewSet(viewsets.ModelViewSet):
     """
     queryset = Movie.objects.all()
     serializer_class = MovieSerializer
+    pagination_class = MoviePagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    # Unique orderings used by ?pagination=cursor; each is served by a
+    # composite index scanned backwards (id is the implicit tiebreaker).
+    keyset_orderings = {
+        'list': ('-year', '-rating', '-id'),
+        'top_rated': ('-rating', '-year', '-id'),
+    }
 
     @extend_schema(
         summary="Get top-rated movies",
@@ -92,7 +166,7 @@ class MovieViewSet(viewsets.ModelViewSet):
                 name='genre',
                 type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description='Filter by genre (case-insensitive)',
+                description='Filter by genre name (case-insensitive exact match, e.g. Sci-Fi)',
                 required=False,
                 examples=[
                     OpenApiExample('Action', value='Action'),
@@ -133,53 +207,572 @@ class MovieViewSet(viewsets.ModelViewSet):
         ],
     )
     @action(detail=False, methods=['get'], url_path='top-rated')
+    @catalog_condition
+    @cached_response
     def top_rated(self, request):
         """
         Get top-rated movies with optional filters.
         """
-        # Get query parameters with defaults
-        min_rating = request.query_params.get('min_rating', 8.0)
-        genre = request.query_params.get('genre', None)
-        year = request.query_params.get('year', None)
+        queryset, error = self.filter_movies(request, default_min_rating=8.0)
+        if error is not None:
+            return error
+
+        # Order by rating (descending), then year (descending)
+        queryset = queryset.order_by('-rating', '-year')
+
+        return self.list_response(queryset)
+
+    @extend_schema(
+        summary="Search movies",
+        description="Full-text search over titles and directors. Every word must match, "
+                    "either whole or as a prefix. Results are ranked by relevance (BM25, "
+                    "with title matches weighted highest). Each result adds a score and a "
+                    "highlight object: HTML-escaped text with the matched words wrapped in <mark> tags.",
+        tags=["Movies"],
+        parameters=[
+            OpenApiParameter(
+                name='q',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Search text, e.g. "nolan dark"',
+                required=True,
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description=f'Number of results (1-{SEARCH_MAX_LIMIT})',
+                required=False,
+                default=20,
+            ),
+            OpenApiParameter(
+                name='offset',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Number of results to skip',
+                required=False,
+                default=0,
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(detail=False, methods=['get'], url_path='search')
+    @catalog_condition
+    @cached_response
+    def search(self, request):
+        """
+        Rank movies matching the search text.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': 'q is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Convert min_rating to float
         try:
-            min_rating = float(min_rating)
+            limit = int(request.query_params.get('limit', 20))
+            offset = int(request.query_params.get('offset', 0))
         except (ValueError, TypeError):
             return Response(
-                {'error': 'min_rating must be a valid number'},
+                {'error': 'limit and offset must be valid integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= limit <= SEARCH_MAX_LIMIT or offset < 0:
+            return Response(
+                {'error': f'limit must be between 1 and {SEARCH_MAX_LIMIT} and offset non-negative'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Start with base queryset filtered by rating
-        queryset = Movie.objects.filter(rating__gte=min_rating)
+        count, results = search_movies(query, limit=limit, offset=offset)
+        return Response({'count': count, 'results': results})
 
-        # Apply genre filter if provided (case-insensitive contains)
-        if genre:
-            queryset = queryset.filter(genre__icontains=genre)
+    @extend_schema(
+        summary="Autocomplete titles and directors",
+        description="Movies whose title or director starts with the prefix, best rated "
+                    "first. Served from an in-process index, with no database round trip "
+                    "per keystroke. Matching ignores case, accents and punctuation.",
+        tags=["Movies"],
+        parameters=[
+            OpenApiParameter(
+                name='prefix',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Typed prefix, e.g. "dark kn"',
+                required=True,
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description=f'Number of suggestions (1-{AUTOCOMPLETE_MAX_RESULTS})',
+                required=False,
+                default=10,
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(detail=False, methods=['get'], url_path='autocomplete')
+    def autocomplete(self, request):
+        """
+        Suggest movies for a typed prefix.
+        """
+        prefix = request.query_params.get('prefix', '')
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'limit must be a valid integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= limit <= AUTOCOMPLETE_MAX_RESULTS:
+            return Response(
+                {'error': f'limit must be between 1 and {AUTOCOMPLETE_MAX_RESULTS}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Apply year filter if provided
-        if year:
-            try:
-                year = int(year)
-                queryset = queryset.filter(year=year)
-            except (ValueError, TypeError):
-                return Response(
-                    {'error': 'year must be a valid integer'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        fields = ('id', 'title', 'director', 'year', 'rating')
+        return Response({'results': [
+            dict(zip(fields, row)) for row in autocomplete_service.search(prefix, limit)
+        ]})
 
-        # Order by rating (descending), then year (descending)
-        queryset = queryset.order_by('-rating', '-year')
+    @extend_schema(
+        summary="Catalog statistics",
+        description="Movie count, average/min/max rating and total budget per genre, year, "
+                    "decade or director. Read from a summary table maintained on every "
+                    "write, so no aggregation runs per request. Years and decades are "
+                    "ordered chronologically, genres and directors by movie count.",
+        tags=["Movies"],
+        parameters=[
+            OpenApiParameter(
+                name='dimension',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Grouping dimension',
+                required=False,
+                enum=[dimension for dimension, _ in MovieStat.DIMENSIONS],
+                default=MovieStat.GENRE,
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description=f'Number of groups to return (1-{STATS_MAX_LIMIT})',
+                required=False,
+                default=100,
+            ),
+            OpenApiParameter(
+                name='offset',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Number of groups to skip',
+                required=False,
+                default=0,
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(detail=False, methods=['get'], url_path='stats')
+    @catalog_condition
+    @cached_response
+    def stats(self, request):
+        """
+        Return precomputed aggregates for one dimension.
+        """
+        dimension = request.query_params.get('dimension', MovieStat.GENRE)
+        dimensions = [choice for choice, _ in MovieStat.DIMENSIONS]
+        if dimension not in dimensions:
+            return Response(
+                {'error': f'dimension must be one of: {", ".join(dimensions)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = int(request.query_params.get('limit', 100))
+            offset = int(request.query_params.get('offset', 0))
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'limit and offset must be valid integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= limit <= STATS_MAX_LIMIT or offset < 0:
+            return Response(
+                {'error': f'limit must be between 1 and {STATS_MAX_LIMIT} and offset non-negative'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = MovieStat.objects.filter(dimension=dimension)
+        if dimension in (MovieStat.YEAR, MovieStat.DECADE):
+            # Keys of one dimension have equal width, so text order is chronological
+            queryset = queryset.order_by('key')
+        else:
+            queryset = queryset.order_by('-count', 'key')
+        context = {}
+        if dimension == MovieStat.GENRE:
+            context['genre_names'] = dict(Genre.objects.values_list('key', 'name'))
+        serializer = MovieStatSerializer(queryset[offset:offset + limit], many=True, context=context)
+        return Response({
+            'dimension': dimension,
+            'count': queryset.count(),
+            'results': serializer.data,
+        })
+
+    @extend_schema(
+        summary="Export movies",
+        description="Stream the whole catalog, or the subset matching the filters, as "
+                    "NDJSON (one movie per line) or CSV. Rows use the same fields as the "
+                    "list endpoint and are ordered by id. Send Accept-Encoding: gzip for "
+                    "a compressed stream.",
+        tags=["Movies"],
+        parameters=[
+            OpenApiParameter(
+                name='output',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Export format',
+                required=False,
+                enum=list(EXPORT_FORMATS),
+                default=NDJSON,
+            ),
+            OpenApiParameter(
+                name='min_rating',
+                type=OpenApiTypes.FLOAT,
+                location=OpenApiParameter.QUERY,
+                description='Minimum rating threshold (0-10)',
+                required=False,
+            ),
+            OpenApiParameter(
+                name='genre',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Filter by genre name (case-insensitive exact match)',
+                required=False,
+            ),
+            OpenApiParameter(
+                name='year',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Filter by release year',
+                required=False,
+            ),
+        ],
+        responses={(200, 'application/x-ndjson'): OpenApiTypes.STR, (200, 'text/csv'): OpenApiTypes.STR},
+    )
+    @action(detail=False, methods=['get'], url_path='export', renderer_classes=EXPORT_RENDERERS)
+    @export_condition
+    def export(self, request):
+        """
+        Stream movies as NDJSON or CSV.
+        """
+        output = export_format(request.query_params.get('output'), request.accepted_renderer.format)
+        if output is None:
+            return Response(
+                {'error': f'output must be one of: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset, error = self.filter_movies(request)
+        if error is not None:
+            return error
 
-        # Paginate results
-        page = self.paginate_queryset(queryset)
+        return stream_export(queryset, output, gzip=accepts_gzip(request))
+
+    @extend_schema(
+        summary="Upsert movies",
+        description="Create or update many movies in one request. Movies are matched on "
+                    "(title, year): existing movies are updated, new ones are created. "
+                    "Accepts a JSON array of up to MOVIES['BULK_MAX_ITEMS'] movies.",
+        tags=["Movies"],
+        request=MovieUpsertSerializer(many=True),
+        responses={200: OpenApiTypes.OBJECT},
+        examples=[
+            OpenApiExample(
+                'Upsert Movies',
+                value=[
+                    {
+                        "title": "Inception",
+                        "director": "Christopher Nolan",
+                        "genre": "Sci-Fi",
+                        "year": 2010,
+                        "rating": 8.8,
+                        "budget": 160000000
+                    }
+                ],
+                request_only=True,
+            ),
+            OpenApiExample(
+                'Upsert Response',
+                value={"upserted": 1},
+                response_only=True,
+            ),
+        ],
+    )
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update movies by (title, year) in batched statements.
+        """
+        if not isinstance(request.data, list):
+            return Response(
+                {'error': 'Expected a list of movies'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_items = get_setting('BULK_MAX_ITEMS')
+        if len(request.data) > max_items:
+            return Response(
+                {'error': f'At most {max_items} movies can be upserted per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = MovieUpsertSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            movies = Movie.objects.upsert(
+                [Movie(**item) for item in serializer.validated_data],
+                batch_size=get_setting('IMPORT_BATCH_SIZE'),
+            )
+
+        return Response({'upserted': len(movies)}, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Bulk create, update or delete movies",
+        description="POST a JSON array of movies to create them, PATCH an array of partial "
+                    "movies (each with its id) to update them, or DELETE {\"ids\": [...]} to "
+                    "remove them. Every item is validated first. If any item fails, nothing "
+                    "is written and the per-item errors are returned. Otherwise the batch is "
+                    "applied in one transaction and the per-item results are returned. "
+                    "Batches are limited to MOVIES['BULK_MAX_ITEMS'] items.",
+        tags=["Movies"],
+        request=MovieUpsertSerializer(many=True),
+        responses={200: OpenApiTypes.OBJECT, 201: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+        examples=[
+            OpenApiExample(
+                'Bulk Response',
+                value={"results": [{"index": 0, "id": 12, "status": "created"}]},
+                response_only=True,
+            ),
+            OpenApiExample(
+                'Bulk Errors',
+                value={"errors": [{"index": 1, "errors": {"rating": ["Rating must be between 0 and 10."]}}]},
+                response_only=True,
+                status_codes=['400'],
+            ),
+        ],
+    )
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Apply a batch of creates, updates or deletes in one transaction.
+        """
+        items = request.data
+        if request.method == 'DELETE':
+            items = items.get('ids') if isinstance(items, dict) else None
+        if not isinstance(items, list):
+            return Response(
+                {'error': 'Expected a list of ids' if request.method == 'DELETE' else 'Expected a list of movies'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_items = get_setting('BULK_MAX_ITEMS')
+        if len(items) > max_items:
+            return Response(
+                {'error': f'At most {max_items} items can be sent per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.method == 'POST':
+            return self.bulk_create_items(items)
+        if request.method == 'PATCH':
+            return self.bulk_update_items(items)
+        return self.bulk_destroy_items(items)
+
+    def bulk_create_items(self, items):
+        serializer = MovieUpsertSerializer(data=items, many=True)
+        errors = self.item_errors(serializer)
+        movies = [Movie(**data) for data in serializer.validated_data] if not errors else []
+        errors += self.natural_key_errors(movies)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            Movie.objects.bulk_insert(movies, batch_size=get_setting('IMPORT_BATCH_SIZE'))
+
+        return Response({'results': [
+            {'index': index, 'id': movie.pk, 'status': 'created'}
+            for index, movie in enumerate(movies)
+        ]}, status=status.HTTP_201_CREATED)
+
+    def bulk_update_items(self, items):
+        ids, errors = self.item_ids(items, lambda item: item.get('id') if isinstance(item, dict) else None)
+        serializer = MovieUpsertSerializer(data=items, many=True, partial=True)
+        if errors:
+            errors = self.merge_errors(errors, self.item_errors(serializer))
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        instances = Movie.objects.in_bulk(ids)
+        errors = self.merge_errors(self.missing_errors(ids, instances), self.item_errors(serializer))
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        movies = []
+        fields = set()
+        for pk, data in zip(ids, serializer.validated_data):
+            movie = instances[pk]
+            for name, value in data.items():
+                setattr(movie, name, value)
+            fields.update(data)
+            movies.append(movie)
+
+        errors = self.natural_key_errors(movies, exclude=ids)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            Movie.objects.bulk_edit(movies, fields, batch_size=get_setting('IMPORT_BATCH_SIZE'))
+
+        return Response({'results': [
+            {'index': index, 'id': movie.pk, 'status': 'updated'}
+            for index, movie in enumerate(movies)
+        ]})
+
+    def bulk_destroy_items(self, items):
+        ids, errors = self.item_ids(items, lambda item: item)
+        if not errors:
+            errors = self.missing_errors(ids, Movie.objects.in_bulk(ids))
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic(), bulk_catalog_write() as write:
+            movies = Movie.objects.filter(pk__in=ids)
+            write.stats_changed(removed=movies.values(*STAT_FIELDS))
+            movies.delete()
+
+        return Response({'results': [
+            {'index': index, 'id': pk, 'status': 'deleted'}
+            for index, pk in enumerate(ids)
+        ]})
+
+    @staticmethod
+    def item_errors(serializer):
+        """
+        Return ``[{'index', 'errors'}]`` for the items that failed validation.
+        """
+        if serializer.is_valid():
+            return []
+        return [
+            {'index': index, 'errors': item}
+            for index, item in enumerate(serializer.errors) if item
+        ]
+
+    @staticmethod
+    def item_ids(items, get_id):
+        """
+        Return the unique integer ids of ``items`` and per-item id errors.
+
+        The ids line up with ``items`` only when there are no errors.
+        """
+        ids, errors, seen = [], [], set()
+        for index, item in enumerate(items):
+            pk = get_id(item)
+            if not isinstance(pk, int) or isinstance(pk, bool):
+                errors.append({'index': index, 'errors': {'id': ['A valid integer is required.']}})
+                continue
+            if pk in seen:
+                errors.append({'index': index, 'errors': {'id': ['Duplicate id in batch.']}})
+            seen.add(pk)
+            ids.append(pk)
+        return ids, errors
+
+    @staticmethod
+    def missing_errors(ids, instances):
+        return [
+            {'index': index, 'errors': {'id': ['Movie not found.']}}
+            for index, pk in enumerate(ids)
+            if pk not in instances
+        ]
+
+    @staticmethod
+    def merge_errors(*error_lists):
+        merged = {}
+        for errors in error_lists:
+            for error in errors:
+                merged.setdefault(error['index'], {}).update(error['errors'])
+        return [{'index': index, 'errors': merged[index]} for index in sorted(merged)]
+
+    @staticmethod
+    def natural_key_errors(movies, exclude=()):
+        """
+        Return errors for (title, year) keys repeated in the batch or taken
+        by another movie, checked with one query.
+        """
+        message = 'A movie with this title and year already exists.'
+        taken = set(
+            Movie.objects.filter(title__in={movie.title for movie in movies})
+            .exclude(pk__in=exclude)
+            .values_list('title', 'year')
+            .order_by()
+        ) if movies else set()
+
+        errors, seen = [], set()
+        for index, movie in enumerate(movies):
+            key = (movie.title, movie.year)
+            if key in taken or key in seen:
+                errors.append({'index': index, 'errors': {'non_field_errors': [message]}})
+            seen.add(key)
+        return errors
+
+    @catalog_condition
+    @cached_response
+    def list(self, request, *args, **kwargs):
+        """
+        List movies (cached per catalog version).
+        """
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def filter_movies(self, request, default_min_rating=None):
+        """
+        Apply the min_rating, genre and year query filters.
+
+        Returns ``(queryset, None)``, or ``(None, response)`` with a 400
+        response when a parameter is invalid.
+        """
+        queryset, error = filter_movies(request.query_params, default_min_rating)
+        if error is not None:
+            return None, Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        return queryset, None
+
+    def list_response(self, queryset):
+        """
+        Paginate and serialize ``queryset`` for a read-only list action.
+
+        With MOVIES['FAST_SERIALIZATION'] on, rows are read with
+        values_list() and converted by MovieRowSerializer instead of
+        building a model instance and running every serializer field.
+        """
+        if not get_setting('FAST_SERIALIZATION'):
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+
+        rows = queryset.values_list(*MovieRowSerializer.fields, named=True)
+        serializer = MovieRowSerializer()
+        page = self.paginate_queryset(rows)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(rows))
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+    @movie_condition
+    @cached_response
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve a movie (cached per catalog version).
+        """
+        return super().retrieve(request, *args, **kwargs)
 
     def create(self, request, *args, **kwargs):
         """
@@ -220,3 +813,24 @@ class MovieViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         self.perform_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@extend_schema(exclude=True)
+class SlowQueryView(APIView):
+    """
+    Staff-only view of the slow query log (see movies/slow_queries.py).
+
+    GET lists the logged statements, newest first, each with its plan and
+    flags (``full_scan``, ``temp_sort``); DELETE empties the log.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'threshold_ms': get_setting('SLOW_QUERY_MS'),
+            'results': slow_queries.slow_queries(),
+        })
+
+    def delete(self, request):
+        slow_queries.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -28,50 +28,20 @@ def import_data():
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movie_api.settings')
     django.setup()
 
-    from movies.models import Movie
-    import csv
+    from movies.importers import BulkImporter
 
     csv_file = 'imdb_full.csv'
     if not os.path.exists(csv_file):
         print(f"✗ CSV file not found: {csv_file}")
         return False
 
-    Movie.objects.all().delete()
-    movies_created = 0
-
-    with open(csv_file, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            try:
-                title = row['Title'].strip()
-                director = row['Director'].strip() if row['Director'] else 'Unknown'
-                genre = row['Genre'].strip()
-                year = int(row['Year'])
-                rating = float(row['Rating'])
-
-                revenue = row.get('Revenue (Millions)', '').strip()
-                budget = None
-                if revenue and revenue != 'nan':
-                    try:
-                        budget = int(float(revenue) * 1000000)
-                    except (ValueError, TypeError):
-                        pass
-
-                Movie.objects.create(
-                    title=title,
-                    director=director,
-                    genre=genre,
-                    year=year,
-                    rating=rating,
-                    budget=budget
-                )
-                movies_created += 1
-
-                if movies_created % 100 == 0:
-                    print(f"  Imported {movies_created} movies...")
-
-            except (ValueError, KeyError):
-                continue
+    importer = BulkImporter(
+        progress=lambda stats: print(
+            f"  Imported {stats.created} movies... ({stats.rows_per_second:,.0f} rows/s)"
+        ),
+    )
+    stats = importer.load_csv(csv_file, mode='replace')
+    movies_created = stats.created
 
     print(f"✓ Imported {movies_created} movies\n")
     return True